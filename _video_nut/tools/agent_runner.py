@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Async Agent Runner for VideoNut
+
+Runs agent CLI processes (claude, gemini, opencode, qwen) on a single asyncio
+event loop. Output is streamed line by line to the console and to a per-stage
+log file instead of being buffered until exit, and every run is bounded by a
+wall-clock timeout after which the agent's whole process group (the agent and
+any tools it spawned) is terminated gracefully (SIGTERM, then SIGKILL after a
+grace period).
+
+Usage:
+    # Python import (blocking call, safe from any thread)
+    from tools import agent_runner
+    result = agent_runner.get_default_runner().run(["claude", "-p", "..."], label="investigator",
+                                                   log_path="Projects/x/logs/investigator.log", timeout=1800)
+
+    # Command line usage
+    python agent_runner.py --label test --log run.log --timeout 60 -- claude -p "Run investigator"
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Seconds to wait after SIGTERM before escalating to SIGKILL
+KILL_GRACE_SECONDS = 10
+
+# Max bytes per streamed line; longer lines are split into pieces of this size
+STREAM_LINE_LIMIT = 1024 * 1024
+STREAM_READ_CHUNK = 64 * 1024
+
+_print_lock = threading.Lock()
+
+
+class AgentRunResult:
+    """Outcome of one agent process run."""
+    def __init__(self, returncode, timed_out, elapsed, log_path, error=""):
+        self.returncode = returncode
+        self.timed_out = timed_out
+        self.elapsed = elapsed
+        self.log_path = log_path
+        self.error = error
+
+    @property
+    def success(self):
+        return self.returncode == 0 and not self.timed_out
+
+    def __bool__(self):
+        return self.success
+
+
+def _emit_line(line, tag, log_file, is_stderr):
+    text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+    with _print_lock:
+        print(f"   [{tag}] {text}", flush=True)
+    log_file.write(("! " if is_stderr else "") + text + "\n")
+    log_file.flush()
+
+
+async def _pump_stream(stream, label, log_file, is_stderr):
+    """
+    Copies a process stream line by line to the console and the log file. Lines
+    are split from raw chunks here rather than with readline(), which discards its
+    buffer on an over-long line; a line over STREAM_LINE_LIMIT is emitted in pieces.
+    """
+    tag = f"{label} ERR" if is_stderr else label
+    pending = b""
+    while True:
+        chunk = await stream.read(STREAM_READ_CHUNK)
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        while len(pending) >= STREAM_LINE_LIMIT:
+            lines.append(pending[:STREAM_LINE_LIMIT])
+            pending = pending[STREAM_LINE_LIMIT:]
+        for line in lines:
+            _emit_line(line, tag, log_file, is_stderr)
+        if not chunk:
+            if pending:
+                _emit_line(pending, tag, log_file, is_stderr)
+            break
+
+
+def _process_group_options():
+    """Starts the agent in its own process group, so a timeout can stop the tools it spawned too."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _signal_group(proc, force):
+    """Sends terminate (or kill, when force is set) to the agent's whole process group."""
+    if os.name == "nt":
+        if force:
+            # taskkill /T walks the process tree; Windows has no group-wide kill
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+    else:
+        os.killpg(proc.pid, signal.SIGKILL if force else signal.SIGTERM)
+
+
+async def _terminate(proc, grace):
+    """Asks the process group to stop, then kills whatever is still alive after the grace period."""
+    try:
+        _signal_group(proc, force=False)
+    except ProcessLookupError:
+        return
+    try:
+        await asyncio.wait_for(proc.wait(), grace)
+    except asyncio.TimeoutError:
+        pass
+    # Children that outlive the agent would keep its output pipes open
+    try:
+        _signal_group(proc, force=True)
+    except ProcessLookupError:
+        pass
+    await proc.wait()
+
+
+async def run_agent_process(cmd_parts, label, log_path, cwd=None, timeout=None, kill_grace=KILL_GRACE_SECONDS):
+    """
+    Runs one agent command, streaming its output, and enforces the wall-clock timeout.
+
+    Returns:
+        AgentRunResult: Exit code, timeout flag, elapsed seconds and log location
+    """
+    started = time.monotonic()
+    log_dir = os.path.dirname(log_path)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    # Resolve the executable so Windows .cmd shims work without shell=True
+    executable = shutil.which(cmd_parts[0]) or cmd_parts[0]
+
+    with open(log_path, 'a', encoding='utf-8') as log_file:
+        log_file.write(f"\n===== {datetime.now().isoformat()} | {' '.join(cmd_parts)} =====\n")
+        log_file.flush()
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                executable, *cmd_parts[1:],
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                stdin=asyncio.subprocess.DEVNULL,
+                cwd=cwd,
+                **_process_group_options()
+            )
+        except OSError as e:
+            log_file.write(f"[FAIL] Could not start process: {e}\n")
+            return AgentRunResult(None, False, time.monotonic() - started, log_path, error=str(e))
+
+        pumps = [
+            asyncio.ensure_future(_pump_stream(proc.stdout, label, log_file, False)),
+            asyncio.ensure_future(_pump_stream(proc.stderr, label, log_file, True)),
+        ]
+        _, pending = await asyncio.wait([*pumps, asyncio.ensure_future(proc.wait())], timeout=timeout)
+        timed_out = bool(pending)
+        if timed_out:
+            log_file.write(f"[TIMEOUT] Exceeded {timeout}s wall-clock limit, terminating...\n")
+            await _terminate(proc, kill_grace)
+            # The pipes close once the group is gone; keep its last output unless something outside it holds them
+            _, stuck = await asyncio.wait(pumps, timeout=kill_grace)
+            for pump in stuck:
+                pump.cancel()
+
+        elapsed = time.monotonic() - started
+        log_file.write(f"===== exit code {proc.returncode} after {elapsed:.1f}s =====\n")
+
+    return AgentRunResult(proc.returncode, timed_out, elapsed, log_path)
+
+
+class AgentRunner:
+    """
+    Owns one event loop on a background thread. Any number of threads (stage
+    workers, batch projects) can call run() concurrently; all agent processes
+    are multiplexed on the same loop.
+    """
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="agent-runner", daemon=True)
+        self._thread.start()
+
+    def submit(self, cmd_parts, label, log_path, cwd=None, timeout=None):
+        """Schedules an agent run and returns a concurrent.futures.Future of AgentRunResult."""
+        return asyncio.run_coroutine_threadsafe(
+            run_agent_process(cmd_parts, label, log_path, cwd=cwd, timeout=timeout),
+            self._loop
+        )
+
+    def run(self, cmd_parts, label, log_path, cwd=None, timeout=None):
+        """Runs an agent and blocks the calling thread until it exits or times out."""
+        return self.submit(cmd_parts, label, log_path, cwd=cwd, timeout=timeout).result()
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+
+def get_default_runner():
+    """Returns the process-wide AgentRunner, starting its event loop on first use."""
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = AgentRunner()
+        return _default_runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an agent CLI with streamed output and a wall-clock timeout.")
+    parser.add_argument("--label", default="agent", help="Prefix for streamed console lines")
+    parser.add_argument("--log", required=True, help="Log file to append the agent output to")
+    parser.add_argument("--timeout", type=float, default=None, help="Wall-clock timeout in seconds")
+    parser.add_argument("--cwd", default=None, help="Working directory for the agent process")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Agent command (after --)")
+
+    args = parser.parse_args()
+    command = args.command[1:] if args.command and args.command[0] == "--" else args.command
+    if not command:
+        parser.error("an agent command is required after --")
+
+    result = asyncio.run(run_agent_process(command, args.label, args.log, cwd=args.cwd, timeout=args.timeout))
+    if result.timed_out:
+        print(f"[FAIL] Agent timed out after {result.elapsed:.1f}s. Log: {result.log_path}")
+    elif result.success:
+        print(f"[OK] Agent finished in {result.elapsed:.1f}s. Log: {result.log_path}")
+    else:
+        print(f"[FAIL] Agent exited with code {result.returncode}. Log: {result.log_path}")
+    sys.exit(0 if result.success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,13 +10,18 @@ USAGE:
   
   # Screenshot without highlighting
   python article_screenshotter.py --url "https://example.com" --quote "text" --no-highlight --output "quote.png"
+
+  # Many quotes at once: CSV with url,quote,output columns (each page is loaded once)
+  python article_screenshotter.py --batch quotes.csv --concurrency 3
 """
 
 import sys
 import os
 import argparse
-import time
-from random import uniform
+import csv
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
@@ -30,6 +35,37 @@ except ImportError:
     print("Error: Playwright not installed. Install with: pip install playwright && playwright install chromium")
     sys.exit(1)
 
+# Set path for importing the shared rate limiter
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net import rate_limiter
+from tools.downloaders import browser_service
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+# The page counts as settled once the DOM has not changed for QUIET_MS after load
+QUIET_MS = 500
+SETTLE_TIMEOUT_MS = 10000
+DEFAULT_CONCURRENCY = 3
+
+WAIT_FOR_QUIET_DOM_JS = '''([quietMs, maxMs]) => new Promise((resolve) => {
+    const started = performance.now();
+    let lastChange = started;
+    const observer = new MutationObserver(() => { lastChange = performance.now(); });
+    observer.observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+    const check = () => {
+        const now = performance.now();
+        const settled = document.readyState === 'complete' && now - lastChange >= quietMs;
+        if (settled || now - started >= maxMs) {
+            observer.disconnect();
+            resolve(Math.round(now - started));
+        } else {
+            setTimeout(check, 100);
+        }
+    };
+    setTimeout(check, 100);
+})'''
+
 
 def normalize_text(text):
     """Normalize text for comparison - remove extra spaces, newlines."""
@@ -37,6 +73,23 @@ def normalize_text(text):
     return re.sub(r'\s+', ' ', text.strip().lower())
 
 
+def wait_for_quiet_dom(page, quiet_ms=QUIET_MS, timeout_ms=SETTLE_TIMEOUT_MS):
+    """
+    Waits until the page has loaded and its DOM has stopped changing, instead of a
+    fixed sleep. Returns the milliseconds waited (capped at timeout_ms).
+    """
+    try:
+        return page.evaluate(WAIT_FOR_QUIET_DOM_JS, [quiet_ms, timeout_ms])
+    except Exception:
+        # Navigation or a closed page interrupted the wait; nothing left to wait for
+        return 0
+
+
+def wait_for_paint(page):
+    """Waits until style changes (scroll, highlight) have been rendered."""
+    page.evaluate("() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))")
+
+
 def find_quote_in_page(page, quote):
     """
     Find the specific element containing the quote using multiple strategies.
@@ -114,274 +167,391 @@ def find_quote_in_page(page, quote):
     return None
 
 
-def take_quote_screenshot(url, output_path, quote=None, highlight=True, width=1280, height=900):
+def open_article(page, url):
+    """Loads an article, waits for it to settle and clears popups and overlays."""
+    # Set headers to appear like real browser
+    page.set_extra_http_headers({
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+
+    print(f"[BROWSER] Navigating to {url}...")
+    page.goto(url, timeout=45000, wait_until='domcontentloaded')
+
+    # Wait for dynamic content: done as soon as the DOM stops changing, not after a fixed delay
+    print("  [WAIT] Waiting for dynamic content to settle...")
+    waited = wait_for_quiet_dom(page)
+    print(f"  [OK] Page settled after {waited} ms")
+
+    # Try to close cookie popups, modals, and ads
+    print("🧹 Closing popups...")
+    for selector in [
+        'button:has-text("Accept")',
+        'button:has-text("I Agree")',
+        'button:has-text("Got it")',
+        'button:has-text("Continue")',
+        '.close-button',
+        '[aria-label="Close"]',
+        '.modal-close',
+        '.popup-close',
+        '#close-btn'
+    ]:
+        try:
+            if page.locator(selector).count() > 0:
+                page.locator(selector).first.click(timeout=1000)
+                wait_for_quiet_dom(page, quiet_ms=200, timeout_ms=2000)
+        except:
+            pass
+
+    # Purge cookie/consent/paywall banners and overlays from DOM
+    print("🧹 Purging cookie banners, overlays, and ads from DOM...")
+    try:
+        page.evaluate('''() => {
+            const hideSelectors = [
+                // Cookie banners / consent
+                '[id*="cookie"]', '[class*="cookie"]', '[id*="consent"]', '[class*="consent"]',
+                '[id*="consent-banner"]', '[class*="consent-banner"]',
+                // Paywalls / newsletters / subscription modals
+                '[id*="paywall"]', '[class*="paywall"]', '[id*="gate"]', '[class*="gate"]',
+                '[id*="newsletter"]', '[class*="newsletter"]', '[id*="subscribe"]', '[class*="subscribe"]',
+                '[class*="modal-open"]', '[class*="modal-backdrop"]', '.modal', '.fade.show',
+                // Ads / overlays
+                'iframe[id*="google_ads"]', '.ad-container', '.advertisement', '#ad-slot',
+                // Fixed overlays that block view
+                '[style*="position: fixed"]', '[style*="position:absolute"]'
+            ];
+
+            // Hide matching elements
+            hideSelectors.forEach(selector => {
+                try {
+                    document.querySelectorAll(selector).forEach(el => {
+                        // Don't hide the main article or main content
+                        const tag = el.tagName.toLowerCase();
+                        if (tag !== 'article' && tag !== 'main' && !el.contains(document.querySelector('article'))) {
+                            el.style.setProperty('display', 'none', 'important');
+                        }
+                    });
+                } catch (e) {}
+            });
+
+            // Restore scrolling if blocked by overlay script
+            document.body.style.setProperty('overflow', 'auto', 'important');
+            document.documentElement.style.setProperty('overflow', 'auto', 'important');
+        }''')
+        wait_for_paint(page)
+    except Exception as purge_err:
+        print(f"  ⚠️ DOM purge warning: {purge_err}")
+
+
+def clear_highlights(page):
+    """Restores elements highlighted by an earlier capture on the same page."""
+    page.evaluate('''() => {
+        document.querySelectorAll('[data-original-style]').forEach(el => {
+            const style = el.getAttribute('data-original-style');
+            if (style) {
+                el.setAttribute('style', style);
+            } else {
+                el.removeAttribute('style');
+            }
+            el.removeAttribute('data-original-style');
+        });
+    }''')
+
+
+def capture_quote(page, output_path, quote=None, highlight=True):
     """
-    Take a screenshot of a webpage, focusing on a specific quote.
-    
-    Args:
-        url: URL of the article
-        output_path: Where to save the screenshot
-        quote: Text to find and focus on (REQUIRED for meaningful screenshot)
-        highlight: Whether to highlight the found text
-        width: Viewport width
-        height: Viewport height
-    
+    Screenshots a quote on an already opened article page (see open_article).
+
     Returns:
         Dict with success status and details
     """
-    # Rate limiting
-    delay = uniform(1, 2)
-    print(f"[WAIT] Rate limiting: Waiting {delay:.2f} seconds...")
-    time.sleep(delay)
-    
     result = {
         'success': False,
         'quote_found': False,
         'message': '',
         'output_path': output_path
     }
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            viewport={'width': width, 'height': height},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-        page = context.new_page()
-        
-        # Set headers to appear like real browser
-        page.set_extra_http_headers({
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-        })
-        
-        try:
-            print(f"[BROWSER] Navigating to {url}...")
-            # Use networkidle for better dynamic content handling
-            try:
-                page.goto(url, timeout=45000, wait_until='networkidle')
-            except:
-                # Fallback to domcontentloaded if networkidle times out
-                print("  ⚠️ networkidle timeout, using domcontentloaded...")
-                page.goto(url, timeout=30000, wait_until='domcontentloaded')
-            
-            # Wait for dynamic content (increased from 3s to 5s for JS-heavy sites)
-            print("  [WAIT] Waiting for dynamic content to load...")
-            page.wait_for_timeout(5000)
-            
-            # Try to close cookie popups, modals, and ads
-            print("🧹 Closing popups...")
-            for selector in [
-                'button:has-text("Accept")', 
-                'button:has-text("I Agree")', 
-                'button:has-text("Got it")',
-                'button:has-text("Continue")',
-                '.close-button', 
-                '[aria-label="Close"]', 
-                '.modal-close',
-                '.popup-close',
-                '#close-btn'
-            ]:
+
+    try:
+        if quote:
+            print(f"[SCAN] Searching for quote: '{quote[:60]}{'...' if len(quote) > 60 else ''}'")
+
+            # Find the quote element
+            element = find_quote_in_page(page, quote)
+
+            if element:
+                result['quote_found'] = True
+
+                # Step 1: Try multiple scroll methods (some sites block certain approaches)
+                print("[MATCH] Scrolling quote to center of viewport...")
+
+                # Method 1: scrollIntoView with block center (most reliable)
                 try:
-                    if page.locator(selector).count() > 0:
-                        page.locator(selector).first.click(timeout=1000)
-                        page.wait_for_timeout(500)
-                except:
-                    pass
-
-            # Purge cookie/consent/paywall banners and overlays from DOM
-            print("🧹 Purging cookie banners, overlays, and ads from DOM...")
-            try:
-                page.evaluate('''() => {
-                    const hideSelectors = [
-                        // Cookie banners / consent
-                        '[id*="cookie"]', '[class*="cookie"]', '[id*="consent"]', '[class*="consent"]',
-                        '[id*="consent-banner"]', '[class*="consent-banner"]',
-                        // Paywalls / newsletters / subscription modals
-                        '[id*="paywall"]', '[class*="paywall"]', '[id*="gate"]', '[class*="gate"]',
-                        '[id*="newsletter"]', '[class*="newsletter"]', '[id*="subscribe"]', '[class*="subscribe"]',
-                        '[class*="modal-open"]', '[class*="modal-backdrop"]', '.modal', '.fade.show',
-                        // Ads / overlays
-                        'iframe[id*="google_ads"]', '.ad-container', '.advertisement', '#ad-slot',
-                        // Fixed overlays that block view
-                        '[style*="position: fixed"]', '[style*="position:absolute"]'
-                    ];
-                    
-                    // Hide matching elements
-                    hideSelectors.forEach(selector => {
-                        try {
-                            document.querySelectorAll(selector).forEach(el => {
-                                // Don't hide the main article or main content
-                                const tag = el.tagName.toLowerCase();
-                                if (tag !== 'article' && tag !== 'main' && !el.contains(document.querySelector('article'))) {
-                                    el.style.setProperty('display', 'none', 'important');
-                                }
-                            });
-                        } catch (e) {}
-                    });
+                    page.evaluate('''(el) => {
+                        el.scrollIntoView({ behavior: 'instant', block: 'center', inline: 'nearest' });
+                    }''', element)
+                    wait_for_paint(page)
+                    print("  [OK] Scroll method 1 (scrollIntoView) succeeded")
+                except Exception as scroll_err:
+                    print(f"  ⚠️ Scroll method 1 failed: {scroll_err}")
 
-                    // Restore scrolling if blocked by overlay script
-                    document.body.style.setProperty('overflow', 'auto', 'important');
-                    document.documentElement.style.setProperty('overflow', 'auto', 'important');
-                }''')
-                page.wait_for_timeout(500)
-            except Exception as purge_err:
-                print(f"  ⚠️ DOM purge warning: {purge_err}")
-            
-            if quote:
-                print(f"[SCAN] Searching for quote: '{quote[:60]}{'...' if len(quote) > 60 else ''}'")
-                
-                # Find the quote element
-                element = find_quote_in_page(page, quote)
-                
-                if element:
-                    result['quote_found'] = True
-                    
-                    # Step 1: Try multiple scroll methods (some sites block certain approaches)
-                    print("[MATCH] Scrolling quote to center of viewport...")
-                    
-                    # Method 1: scrollIntoView with block center (most reliable)
+                    # Method 2: Manual scrollTo calculation as fallback
                     try:
                         page.evaluate('''(el) => {
-                            el.scrollIntoView({ behavior: 'instant', block: 'center', inline: 'nearest' });
+                            const rect = el.getBoundingClientRect();
+                            const scrollTop = window.pageYOffset + rect.top - (window.innerHeight / 2) + (rect.height / 2);
+                            window.scrollTo({ top: Math.max(0, scrollTop), behavior: 'instant' });
                         }''', element)
-                        page.wait_for_timeout(500)
-                        print("  [OK] Scroll method 1 (scrollIntoView) succeeded")
-                    except Exception as scroll_err:
-                        print(f"  ⚠️ Scroll method 1 failed: {scroll_err}")
-                        
-                        # Method 2: Manual scrollTo calculation as fallback
-                        try:
-                            page.evaluate('''(el) => {
-                                const rect = el.getBoundingClientRect();
-                                const scrollTop = window.pageYOffset + rect.top - (window.innerHeight / 2) + (rect.height / 2);
-                                window.scrollTo({ top: Math.max(0, scrollTop), behavior: 'instant' });
-                            }''', element)
-                            page.wait_for_timeout(500)
-                            print("  [OK] Scroll method 2 (scrollTo) succeeded")
-                        except Exception as scroll_err2:
-                            print(f"  ⚠️ Scroll method 2 also failed: {scroll_err2}")
-                    
-                    # Step 1.5: Verify element is now visible in viewport
-                    is_visible = page.evaluate('''(el) => {
-                        const rect = el.getBoundingClientRect();
-                        return rect.top >= 0 && rect.bottom <= window.innerHeight;
+                        wait_for_paint(page)
+                        print("  [OK] Scroll method 2 (scrollTo) succeeded")
+                    except Exception as scroll_err2:
+                        print(f"  ⚠️ Scroll method 2 also failed: {scroll_err2}")
+
+                # Step 1.5: Verify element is now visible in viewport
+                is_visible = page.evaluate('''(el) => {
+                    const rect = el.getBoundingClientRect();
+                    return rect.top >= 0 && rect.bottom <= window.innerHeight;
+                }''', element)
+
+                if not is_visible:
+                    print("  ⚠️ Element not fully visible, trying Playwright scroll...")
+                    try:
+                        element.scroll_into_view_if_needed()
+                        wait_for_paint(page)
+                    except:
+                        pass
+
+                # Step 2: Highlight the element
+                if highlight:
+                    print("[VISIONARY] Highlighting quote...")
+                    page.evaluate('''(el) => {
+                        // Save original styles
+                        el.setAttribute('data-original-style', el.getAttribute('style') || '');
+
+                        // Apply highlight styles with !important to override site CSS
+                        el.style.setProperty('background-color', '#ffff00', 'important');
+                        el.style.setProperty('color', '#000000', 'important');
+                        el.style.setProperty('padding', '10px', 'important');
+                        el.style.setProperty('border-radius', '4px', 'important');
+                        el.style.setProperty('border', '4px solid #ff6600', 'important');
+                        el.style.setProperty('box-shadow', '0 0 30px rgba(255, 102, 0, 0.8)', 'important');
+                        el.style.setProperty('position', 'relative', 'important');
+                        el.style.setProperty('z-index', '99999', 'important');
+                        el.style.setProperty('display', 'block', 'important');
                     }''', element)
-                    
-                    if not is_visible:
-                        print("  ⚠️ Element not fully visible, trying Playwright scroll...")
-                        try:
-                            element.scroll_into_view_if_needed()
-                            page.wait_for_timeout(500)
-                        except:
-                            pass
-                    
-                    # Step 2: Highlight the element
-                    if highlight:
-                        print("[VISIONARY] Highlighting quote...")
+                    print("  [OK] Quote highlighted with yellow background + orange border")
+
+                # Step 3: Wait for CSS to apply and re-render
+                wait_for_paint(page)
+
+                # Step 4: Take the screenshot
+                print("[SCREENSHOT] Taking screenshot...")
+                page.screenshot(path=output_path)
+                result['success'] = True
+                result['message'] = f"Quote found, centered, and captured: '{quote[:40]}...'"
+
+            else:
+                # Quote NOT found - try fuzzy fallback
+                print("⚠️ Exact quote not found. Trying fuzzy search...")
+
+                # Try with just the first 3 words
+                words = quote.split()
+                if len(words) >= 3:
+                    fuzzy_quote = ' '.join(words[:3])
+                    fuzzy_element = find_quote_in_page(page, fuzzy_quote)
+
+                    if fuzzy_element:
+                        print(f"  [OK] Found partial match with: '{fuzzy_quote}'")
+
+                        # Scroll and highlight
                         page.evaluate('''(el) => {
-                            // Save original styles
-                            el.setAttribute('data-original-style', el.getAttribute('style') || '');
-                            
-                            // Apply highlight styles with !important to override site CSS
-                            el.style.setProperty('background-color', '#ffff00', 'important');
-                            el.style.setProperty('color', '#000000', 'important');
-                            el.style.setProperty('padding', '10px', 'important');
-                            el.style.setProperty('border-radius', '4px', 'important');
-                            el.style.setProperty('border', '4px solid #ff6600', 'important');
-                            el.style.setProperty('box-shadow', '0 0 30px rgba(255, 102, 0, 0.8)', 'important');
-                            el.style.setProperty('position', 'relative', 'important');
-                            el.style.setProperty('z-index', '99999', 'important');
-                            el.style.setProperty('display', 'block', 'important');
-                        }''', element)
-                        print("  [OK] Quote highlighted with yellow background + orange border")
-                    
-                    # Step 3: Wait for CSS to apply and re-render
-                    page.wait_for_timeout(800)
-                    
-                    # Step 4: Take the screenshot
-                    print("[SCREENSHOT] Taking screenshot...")
-                    page.screenshot(path=output_path)
-                    result['success'] = True
-                    result['message'] = f"Quote found, centered, and captured: '{quote[:40]}...'"
-                    
-                else:
-                    # Quote NOT found - try fuzzy fallback
-                    print("⚠️ Exact quote not found. Trying fuzzy search...")
-                    
-                    # Try with just the first 3 words
-                    words = quote.split()
-                    if len(words) >= 3:
-                        fuzzy_quote = ' '.join(words[:3])
-                        fuzzy_element = find_quote_in_page(page, fuzzy_quote)
-                        
-                        if fuzzy_element:
-                            print(f"  [OK] Found partial match with: '{fuzzy_quote}'")
-                            
-                            # Scroll and highlight
+                            const rect = el.getBoundingClientRect();
+                            const scrollTop = window.pageYOffset + rect.top - (window.innerHeight / 2);
+                            window.scrollTo({ top: scrollTop, behavior: 'instant' });
+                        }''', fuzzy_element)
+
+                        if highlight:
                             page.evaluate('''(el) => {
-                                const rect = el.getBoundingClientRect();
-                                const scrollTop = window.pageYOffset + rect.top - (window.innerHeight / 2);
-                                window.scrollTo({ top: scrollTop, behavior: 'instant' });
+                                el.setAttribute('data-original-style', el.getAttribute('style') || '');
+                                el.style.backgroundColor = '#ffff00';
+                                el.style.border = '3px solid #ff6600';
+                                el.style.padding = '8px';
                             }''', fuzzy_element)
-                            
-                            if highlight:
-                                page.evaluate('''(el) => {
-                                    el.style.backgroundColor = '#ffff00';
-                                    el.style.border = '3px solid #ff6600';
-                                    el.style.padding = '8px';
-                                }''', fuzzy_element)
-                            
-                            page.wait_for_timeout(300)
-                            page.screenshot(path=output_path)
-                            result['success'] = True
-                            result['quote_found'] = True
-                            result['message'] = f"Partial match found: '{fuzzy_quote}'"
-                        else:
-                            # Complete failure
-                            result['success'] = False
-                            result['quote_found'] = False
-                            result['message'] = f"ERROR: Quote not found on page: '{quote[:50]}...'"
-                            print(f"  [FAIL] {result['message']}")
-                            # Don't take useless screenshot
+
+                        wait_for_paint(page)
+                        page.screenshot(path=output_path)
+                        result['success'] = True
+                        result['quote_found'] = True
+                        result['message'] = f"Partial match found: '{fuzzy_quote}'"
                     else:
+                        # Complete failure
                         result['success'] = False
-                        result['message'] = f"ERROR: Quote too short and not found: '{quote}'"
-            
-            else:
-                # No quote provided - just screenshot the article content
-                print("[SCREENSHOT] No quote specified. Taking article screenshot...")
-                
-                # Try to find and scroll to main article content
-                for selector in ['article', '.article-content', '.story-content', 
-                                '.post-content', 'main', '#content', '.entry-content']:
-                    if page.locator(selector).count() > 0:
-                        page.locator(selector).first.scroll_into_view_if_needed()
-                        break
-                
-                page.screenshot(path=output_path)
-                result['success'] = True
-                result['message'] = "Article screenshot captured (no specific quote)"
-            
-            # Validate file was created
-            if result['success'] and os.path.exists(output_path):
-                size = os.path.getsize(output_path)
-                if size > 0:
-                    print(f"[OK] Screenshot saved: {output_path} ({size:,} bytes)")
+                        result['quote_found'] = False
+                        result['message'] = f"ERROR: Quote not found on page: '{quote[:50]}...'"
+                        print(f"  [FAIL] {result['message']}")
+                        # Don't take useless screenshot
                 else:
                     result['success'] = False
-                    result['message'] = "Screenshot file is empty"
-                    
+                    result['message'] = f"ERROR: Quote too short and not found: '{quote}'"
+
+        else:
+            # No quote provided - just screenshot the article content
+            print("[SCREENSHOT] No quote specified. Taking article screenshot...")
+
+            # Try to find and scroll to main article content
+            for selector in ['article', '.article-content', '.story-content',
+                            '.post-content', 'main', '#content', '.entry-content']:
+                if page.locator(selector).count() > 0:
+                    page.locator(selector).first.scroll_into_view_if_needed()
+                    break
+
+            page.screenshot(path=output_path)
+            result['success'] = True
+            result['message'] = "Article screenshot captured (no specific quote)"
+
+        # Validate file was created
+        if result['success'] and os.path.exists(output_path):
+            size = os.path.getsize(output_path)
+            if size > 0:
+                print(f"[OK] Screenshot saved: {output_path} ({size:,} bytes)")
+            else:
+                result['success'] = False
+                result['message'] = "Screenshot file is empty"
+
+    except Exception as e:
+        result['message'] = f"Error: {str(e)}"
+        print(f"[FAIL] Error: {e}")
+
+    return result
+
+
+def take_quote_screenshot(url, output_path, quote=None, highlight=True, width=1280, height=900):
+    """
+    Take a screenshot of a webpage, focusing on a specific quote.
+
+    Args:
+        url: URL of the article
+        output_path: Where to save the screenshot
+        quote: Text to find and focus on (REQUIRED for meaningful screenshot)
+        highlight: Whether to highlight the found text
+        width: Viewport width
+        height: Viewport height
+
+    Returns:
+        Dict with success status and details
+    """
+    rate_limiter.wait_for(url)
+
+    # Uses the warm shared browser when browser_service.py is running
+    with sync_playwright() as p, browser_service.browser_context(
+        p,
+        viewport={'width': width, 'height': height},
+        user_agent=USER_AGENT
+    ) as context:
+        page = context.new_page()
+        try:
+            open_article(page, url)
         except Exception as e:
-            result['message'] = f"Error: {str(e)}"
             print(f"[FAIL] Error: {e}")
-            
-        finally:
-            browser.close()
-    
-    return result
+            return {'success': False, 'quote_found': False, 'message': f"Error: {str(e)}", 'output_path': output_path}
+        return capture_quote(page, output_path, quote, highlight)
+
+
+def load_batch(path):
+    """
+    Reads batch rows from a CSV file with a header row: url,quote,output
+    (quote may be empty for a plain article screenshot).
+    """
+    rows = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            url = (row.get('url') or '').strip()
+            output = (row.get('output') or '').strip()
+            if not url or not output:
+                print(f"⚠️ Skipping line {line_no} of {path}: url and output are required")
+                continue
+            rows.append({'url': url, 'quote': (row.get('quote') or '').strip() or None, 'output': output})
+    return rows
+
+
+def _screenshot_url(context, url, rows, highlight):
+    """Loads one article and captures every quote requested from it."""
+    rate_limiter.wait_for(url)
+    page = context.new_page()
+    try:
+        try:
+            open_article(page, url)
+        except Exception as e:
+            print(f"[FAIL] Error: {e}")
+            return [
+                {'success': False, 'quote_found': False, 'message': f"Error: {str(e)}", 'output_path': row['output']}
+                for row in rows
+            ]
+        results = []
+        for row in rows:
+            clear_highlights(page)
+            results.append(capture_quote(page, row['output'], row['quote'], highlight))
+        return results
+    finally:
+        page.close()
+
+
+def take_batch_screenshots(rows, concurrency=DEFAULT_CONCURRENCY, highlight=True, width=1280, height=900):
+    """
+    Screenshots many quotes. Rows for the same URL share one page load, and up to
+    `concurrency` articles are processed at the same time.
+
+    Args:
+        rows: [{"url", "quote", "output"}] as returned by load_batch()
+
+    Returns:
+        list: One result dict per row, in the same order
+    """
+    by_url = {}
+    for index, row in enumerate(rows):
+        by_url.setdefault(row['url'], []).append(index)
+        output_dir = os.path.dirname(row['output'])
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    pending = queue.SimpleQueue()
+    for item in by_url.items():
+        pending.put(item)
+    results = [None] * len(rows)
+
+    def worker():
+        # Sync Playwright objects belong to the thread that created them, so each
+        # worker drives its own context and pulls articles until none are left
+        try:
+            with sync_playwright() as p, browser_service.browser_context(
+                p,
+                viewport={'width': width, 'height': height},
+                user_agent=USER_AGENT
+            ) as context:
+                while True:
+                    try:
+                        url, indices = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    url_results = _screenshot_url(context, url, [rows[i] for i in indices], highlight)
+                    for index, result in zip(indices, url_results):
+                        results[index] = result
+        except Exception as e:
+            print(f"[FAIL] Browser worker stopped: {e}")
+
+    workers = max(1, min(concurrency, len(by_url)))
+    print(f"[SCAN] {len(rows)} screenshots from {len(by_url)} pages with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in range(workers):
+            executor.submit(worker)
+
+    return [
+        result or {'success': False, 'quote_found': False, 'message': "Error: no browser available",
+                   'output_path': row['output']}
+        for row, result in zip(rows, results)
+    ]
 
 
 def main():
@@ -399,19 +569,46 @@ Examples:
   # Just capture article (no specific quote)
   python article_screenshotter.py --url "https://example.com" --output "article.png"
 
+  # Batch: CSV with a header row url,quote,output; rows sharing a URL reuse one page load
+  python article_screenshotter.py --batch quotes.csv --concurrency 3
+
 NOTE: Always provide --quote for meaningful screenshots. Without it, you just get the page header.
         """
     )
     
-    parser.add_argument("--url", "-u", required=True, help="URL of the article")
-    parser.add_argument("--output", "-o", required=True, help="Output file path for screenshot")
+    parser.add_argument("--url", "-u", help="URL of the article")
+    parser.add_argument("--output", "-o", help="Output file path for screenshot")
     parser.add_argument("--quote", "-q", help="Specific quote/text to find, center, and highlight (REQUIRED for useful screenshots)")
     parser.add_argument("--no-highlight", action="store_true", help="Don't highlight the found text")
     parser.add_argument("--width", "-w", type=int, default=1280, help="Viewport width (default: 1280)")
     parser.add_argument("--height", "-H", type=int, default=900, help="Viewport height (default: 900)")
+    parser.add_argument("--batch", "-b", help="CSV file of url,quote,output rows to capture in one run")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Articles processed at the same time in batch mode (default: {DEFAULT_CONCURRENCY})")
     
     args = parser.parse_args()
     
+    if args.batch:
+        rows = load_batch(args.batch)
+        if not rows:
+            print(f"[FAIL] No rows to capture in {args.batch}")
+            sys.exit(1)
+        results = take_batch_screenshots(
+            rows,
+            concurrency=args.concurrency,
+            highlight=not args.no_highlight,
+            width=args.width,
+            height=args.height
+        )
+        failed = [r for r in results if not r['success']]
+        print(f"\n📋 Batch: {len(results) - len(failed)}/{len(results)} screenshots captured")
+        for r in failed:
+            print(f"  [FAIL] {r['output_path']}: {r['message']}")
+        sys.exit(1 if failed else 0)
+    
+    if not (args.url and args.output):
+        parser.error("--url and --output are required unless --batch is given")
+    
     # Warn if no quote provided
     if not args.quote:
         print("⚠️ WARNING: No --quote provided. Screenshot will just be the page header.")
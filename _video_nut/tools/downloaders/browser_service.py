@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Local Browser Service for VideoNut
+
+Keeps one headless Chromium warm for the Playwright-based tools (web_reader.py,
+screenshotter.py, article_screenshotter.py), so each screenshot or page read no
+longer pays the browser startup. Tools lease a slot from the service, connect to
+the warm browser over CDP and open their own browser context on it, so cookies,
+storage and cache stay isolated per call. When the service is not running, the
+tools launch a browser in-process exactly as before.
+
+The service bounds how many pages are open at once (--max-pages) and recycles
+the browser process after a number of leases (--recycle-after) to keep memory
+from creeping up on long research sessions. It listens on 127.0.0.1 and
+advertises its port in ~/.cache/videonut/browser_service.json, together with a
+random token every request must carry. The state file is readable by its owner
+only, so other local users cannot lease slots or stop the service, and the CDP
+URL is only handed out on an authenticated lease. Chromium's own debugging port
+cannot require a token, so the browser runs on a throwaway profile that holds no
+user data.
+
+Protocol: one JSON request line per connection, one JSON response line back.
+    {"cmd": "acquire", "token": "...", "timeout": 120}
+    -> {"ok": true, "cdp_url": "ws://127.0.0.1:.../devtools/browser/..."}
+The lease lasts until the client closes the connection (so a crashed client
+releases its slot automatically). While it is open the client sends a keepalive
+byte every few seconds; a lease that goes silent for LEASE_TIMEOUT is released.
+
+Usage:
+    python browser_service.py --serve --max-pages 4 --recycle-after 50
+    python browser_service.py --status
+    python browser_service.py --stop
+
+    from tools.downloaders import browser_service
+    with sync_playwright() as p, browser_service.browser_context(p, viewport=...) as context:
+        page = context.new_page()
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import hmac
+import json
+import re
+import secrets
+import shutil
+import socket
+import socketserver
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+
+CONNECT_TIMEOUT = 2.0
+# How long a client may wait for a free page slot
+ACQUIRE_TIMEOUT = 120.0
+# A lease whose client sends no keepalive for this long is assumed abandoned
+LEASE_TIMEOUT = 60.0
+LEASE_KEEPALIVE_INTERVAL = 15.0
+BROWSER_START_TIMEOUT = 30.0
+MAX_REQUEST_BYTES = 64 * 1024
+DEFAULT_MAX_PAGES = 4
+DEFAULT_RECYCLE_AFTER = 50
+
+DEVTOOLS_PATTERN = re.compile(r"DevTools listening on (ws://\S+)")
+
+
+def state_file_path():
+    return global_cache_root() / "browser_service.json"
+
+
+def _write_state(state_path, state):
+    """Writes the state file with owner-only permissions, since it holds the auth token."""
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = state_path.with_suffix(".tmp")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(temp_path, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_path, state_path)
+
+
+def chromium_executable():
+    """Path of the Chromium build installed by `playwright install chromium`."""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+class BrowserHost:
+    """One Chromium process exposed over CDP, with bounded concurrent leases and periodic recycling."""
+    def __init__(self, executable, max_pages=DEFAULT_MAX_PAGES, recycle_after=DEFAULT_RECYCLE_AFTER):
+        self.executable = executable
+        self.max_pages = max(1, max_pages)
+        self.recycle_after = max(1, recycle_after)
+        self.active = 0
+        self.served = 0
+        self.launches = 0
+        self.cdp_url = None
+        self._process = None
+        self._user_data_dir = None
+        self._cond = threading.Condition()
+
+    def _launch(self):
+        self._user_data_dir = tempfile.mkdtemp(prefix="videonut_browser_")
+        cmd = [
+            self.executable,
+            "--headless=new",
+            "--remote-debugging-address=127.0.0.1",
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-dev-shm-usage",
+            "about:blank",
+        ]
+        self._process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', errors='replace'
+        )
+
+        # Chromium prints its CDP endpoint on stderr once it is ready
+        deadline = time.time() + BROWSER_START_TIMEOUT
+        cdp_url = None
+        while time.time() < deadline:
+            line = self._process.stderr.readline()
+            if not line:
+                break
+            match = DEVTOOLS_PATTERN.search(line)
+            if match:
+                cdp_url = match.group(1)
+                break
+        if not cdp_url:
+            self._stop()
+            raise RuntimeError("Chromium did not report a DevTools endpoint")
+
+        # Keep draining stderr so a chatty browser never blocks on a full pipe
+        threading.Thread(target=self._process.stderr.read, daemon=True).start()
+        self.cdp_url = cdp_url
+        self.served = 0
+        self.launches += 1
+        print(f"[BROWSER] Chromium ready (launch #{self.launches}, pid {self._process.pid})")
+
+    def _stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        if self._user_data_dir:
+            shutil.rmtree(self._user_data_dir, ignore_errors=True)
+            self._user_data_dir = None
+        self.cdp_url = None
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        """Waits for a free page slot and returns the CDP URL, or None on timeout."""
+        with self._cond:
+            # Once the browser is due for recycling, new leases wait until the old ones finish
+            ready = self._cond.wait_for(
+                lambda: self.active < self.max_pages and (self.served < self.recycle_after or self.active == 0),
+                timeout=timeout
+            )
+            if not ready:
+                return None
+            if self.served >= self.recycle_after or self._process is None or self._process.poll() is not None:
+                if self._process is not None:
+                    print(f"[REWORK] Recycling browser after {self.served} leases")
+                self._stop()
+                self._launch()
+            self.active += 1
+            self.served += 1
+            return self.cdp_url
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._stop()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline(MAX_REQUEST_BYTES).decode('utf-8'))
+        except ValueError as e:
+            self._reply({"ok": False, "error": f"Bad request: {e}"})
+            return
+
+        if not hmac.compare_digest(str(request.get("token", "")), self.server.token):
+            self._reply({"ok": False, "error": "Invalid token"})
+            return
+
+        cmd = request.get("cmd", "acquire")
+        host = self.server.host
+        if cmd == "ping":
+            self._reply({"ok": True, "active": host.active, "max_pages": host.max_pages,
+                         "served": host.served, "recycle_after": host.recycle_after, "launches": host.launches})
+        elif cmd == "shutdown":
+            self._reply({"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif cmd == "acquire":
+            try:
+                cdp_url = host.acquire(timeout=float(request.get("timeout", ACQUIRE_TIMEOUT)))
+            except Exception as e:
+                self._reply({"ok": False, "error": f"Browser launch failed: {e}"})
+                return
+            if not cdp_url:
+                self._reply({"ok": False, "error": "Timed out waiting for a free browser page"})
+                return
+            try:
+                self._reply({"ok": True, "cdp_url": cdp_url})
+                # Hold the slot until the client hangs up or stops sending keepalives
+                self.connection.settimeout(LEASE_TIMEOUT)
+                while self.rfile.read(1):
+                    pass
+            except OSError:
+                pass
+            finally:
+                host.release()
+        else:
+            self._reply({"ok": False, "error": f"Unknown command: {cmd}"})
+
+    def _reply(self, payload):
+        self.wfile.write((json.dumps(payload) + "\n").encode('utf-8'))
+        self.wfile.flush()
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(max_pages=DEFAULT_MAX_PAGES, recycle_after=DEFAULT_RECYCLE_AFTER, port=0):
+    """Starts Chromium and serves leases until stopped."""
+    host = BrowserHost(chromium_executable(), max_pages, recycle_after)
+    with host._cond:
+        host._launch()
+    server = _ThreadingServer(("127.0.0.1", port), _RequestHandler)
+    server.host = host
+    server.token = secrets.token_hex(16)
+    bound_port = server.server_address[1]
+
+    state_path = state_file_path()
+    _write_state(state_path, {"pid": os.getpid(), "port": bound_port, "token": server.token})
+
+    print(f"[RUN] Browser service ready on 127.0.0.1:{bound_port} "
+          f"({max_pages} concurrent pages, recycle after {recycle_after} leases)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        host.close()
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                if json.load(f).get("pid") == os.getpid():
+                    state_path.unlink()
+        except (OSError, ValueError):
+            pass
+        print("[STOP] Browser service stopped.")
+
+
+def _service_address():
+    """(port, token) of the running service, or (None, None) if it is not advertised."""
+    try:
+        with open(state_file_path(), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return state["port"], state["token"]
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def _request(payload, timeout=CONNECT_TIMEOUT):
+    """Sends one request to the running service. Returns the response dict, or None if no service is reachable."""
+    port, token = _service_address()
+    if port is None:
+        return None
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=CONNECT_TIMEOUT) as sock:
+            sock.settimeout(timeout)
+            sock.sendall((json.dumps(dict(payload, token=token)) + "\n").encode('utf-8'))
+            with sock.makefile('rb') as stream:
+                line = stream.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    return json.loads(line.decode('utf-8'))
+
+
+class Lease:
+    """A page slot on the shared browser; kept alive in the background until close()."""
+    def __init__(self, sock, cdp_url):
+        self._sock = sock
+        self.cdp_url = cdp_url
+        self._closed = threading.Event()
+        threading.Thread(target=self._keepalive, daemon=True).start()
+
+    def _keepalive(self):
+        while not self._closed.wait(LEASE_KEEPALIVE_INTERVAL):
+            try:
+                self._sock.sendall(b".")
+            except OSError:
+                return
+
+    def close(self):
+        self._closed.set()
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+def acquire_lease(timeout=ACQUIRE_TIMEOUT):
+    """
+    Leases a page slot on the running service.
+
+    Returns:
+        Lease or None if the service is not running (or has no free slot in time)
+    """
+    port, token = _service_address()
+    if port is None:
+        return None
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=CONNECT_TIMEOUT)
+    except OSError:
+        return None
+    try:
+        sock.settimeout(timeout + CONNECT_TIMEOUT)
+        sock.sendall((json.dumps({"cmd": "acquire", "token": token, "timeout": timeout}) + "\n").encode('utf-8'))
+        line = b""
+        while not line.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            line += chunk
+        response = json.loads(line.decode('utf-8')) if line else None
+    except (OSError, ValueError):
+        response = None
+    if not response or not response.get("ok"):
+        sock.close()
+        if response:
+            print(f"⚠️ Browser service: {response.get('error')}. Launching a local browser...", file=sys.stderr)
+        return None
+    return Lease(sock, response["cdp_url"])
+
+
+@contextlib.contextmanager
+def browser_context(playwright, **context_options):
+    """
+    Yields a fresh, isolated BrowserContext: on the warm shared browser when the
+    service is running, otherwise on a browser launched for this call.
+    context_options are passed to browser.new_context() (viewport, user_agent, ...).
+    """
+    lease = acquire_lease()
+    browser = None
+    if lease:
+        try:
+            browser = playwright.chromium.connect_over_cdp(lease.cdp_url)
+        except Exception as e:
+            print(f"⚠️ Could not connect to browser service: {e}. Launching a local browser...", file=sys.stderr)
+            lease.close()
+            lease = None
+    if browser is None:
+        browser = playwright.chromium.launch(headless=True)
+
+    try:
+        context = browser.new_context(**context_options)
+        try:
+            yield context
+        finally:
+            context.close()
+    finally:
+        # For a CDP connection this only disconnects; the shared browser keeps running
+        browser.close()
+        if lease:
+            lease.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived local headless browser shared by VideoNut tools.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--serve", action="store_true", help="Start Chromium and serve leases")
+    group.add_argument("--status", action="store_true", help="Check whether the service is running")
+    group.add_argument("--stop", action="store_true", help="Stop the running service")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"Concurrent pages across all tools (default: {DEFAULT_MAX_PAGES})")
+    parser.add_argument("--recycle-after", type=int, default=DEFAULT_RECYCLE_AFTER,
+                        help=f"Restart the browser after this many leases (default: {DEFAULT_RECYCLE_AFTER})")
+    parser.add_argument("--port", type=int, default=0, help="TCP port on 127.0.0.1 (default: any free port)")
+
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.max_pages, args.recycle_after, args.port)
+    elif args.status:
+        response = _request({"cmd": "ping"})
+        if response and response.get("ok"):
+            print(f"[OK] Browser service running ({response['active']}/{response['max_pages']} pages in use, "
+                  f"{response['served']}/{response['recycle_after']} leases since launch #{response['launches']})")
+        else:
+            print("[FAIL] Browser service is not running")
+            sys.exit(1)
+    elif args.stop:
+        response = _request({"cmd": "shutdown"})
+        if response and response.get("ok"):
+            print("[OK] Browser service is shutting down")
+        else:
+            print("[FAIL] Browser service is not running")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,16 +10,21 @@ Usage:
     python caption_reader.py --url "https://youtube.com/watch?v=xxx"
     python caption_reader.py --url "https://youtube.com/watch?v=xxx" --timestamps
     python caption_reader.py --url "https://youtube.com/watch?v=xxx" --search "electoral bonds"
+
+Transcripts are cached on disk (see transcript_cache.py), so repeated lookups on
+the same video return without re-fetching or re-transcribing. Use --no-cache to bypass.
 """
 
 import sys
 import os
 import argparse
+import hashlib
 import json
 import re
 import time
 from random import uniform
 from pathlib import Path
+from types import SimpleNamespace
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
@@ -37,6 +42,36 @@ try:
 except ImportError:
     has_audit_logger = False
 
+try:
+    from tools.downloaders import transcript_cache
+    has_transcript_cache = True
+except ImportError:
+    has_transcript_cache = False
+
+try:
+    from tools.downloaders import whisper_service
+    has_whisper_service = True
+except ImportError:
+    has_whisper_service = False
+
+try:
+    from tools.downloaders import chunked_transcription
+    has_chunked_transcription = True
+except ImportError:
+    has_chunked_transcription = False
+
+try:
+    from tools.downloaders import source_index
+    has_source_index = True
+except ImportError:
+    has_source_index = False
+
+try:
+    from tools.downloaders.transcript_index import get_index
+    has_transcript_index = True
+except ImportError:
+    has_transcript_index = False
+
 # Try imports for fallback transcription
 try:
     from youtube_transcript_api import YouTubeTranscriptApi
@@ -138,7 +173,27 @@ def download_audio_stream(video_id, output_audio_path):
 
 
 def transcribe_audio_locally(audio_path) -> list[TranscriptEntry]:
-    """Transcribes local audio using faster-whisper or standard whisper."""
+    """
+    Transcribes local audio, preferring a running whisper_service.py (model already
+    loaded) and otherwise loading faster-whisper or standard whisper in-process.
+    Long audio is split on silences and transcribed in parallel chunks.
+    """
+    if has_chunked_transcription and chunked_transcription.should_chunk(audio_path):
+        try:
+            chunked_entries = chunked_transcription.transcribe_chunked(audio_path)
+            return [TranscriptEntry(text, start, duration) for text, start, duration in chunked_entries]
+        except Exception as e:
+            print(f"⚠️ Chunked transcription failed: {e}. Falling back to a single pass...")
+
+    if has_whisper_service:
+        try:
+            service_entries = whisper_service.transcribe_via_service(audio_path)
+            if service_entries is not None:
+                print("🎙️ Local transcript fallback: Transcribed via running whisper service")
+                return [TranscriptEntry(text, start, duration) for text, start, duration in service_entries]
+        except Exception as e:
+            print(f"⚠️ Whisper service transcription failed: {e}. Loading a model in-process...")
+
     # Try faster-whisper
     try:
         from faster_whisper import WhisperModel
@@ -201,13 +256,65 @@ def fetch_captions_via_transcription(video_id) -> list[TranscriptEntry]:
                 pass
 
 
-def get_youtube_captions(url, languages=None, with_timestamps=False, search_term=None, project_dir=None):
+def load_transcript(video_id, languages=None, project_dir=None, use_cache=True):
     """
-    Get YouTube video captions/transcript
+    Returns (transcript_entries, fetched_via) from the transcript cache, the YouTube
+    API, or local Whisper transcription, in that order. Fresh results are cached,
+    and every transcript is added to the project's full-text source index.
+    Raises RuntimeError with the accumulated error details if every source fails.
     """
-    if not project_dir:
-        project_dir = "."
+    entries, fetched_via = _load_transcript(video_id, languages, project_dir, use_cache)
+    if has_source_index and entries:
+        # Reloading an unchanged transcript leaves the index untouched
+        digest = hashlib.sha1("\n".join(entry.text for entry in entries).encode('utf-8')).hexdigest()
+        source_index.add_document(
+            f"https://www.youtube.com/watch?v={video_id}", "transcript",
+            source_index.transcript_chunks(entries), digest=digest, project_dir=project_dir
+        )
+    return entries, fetched_via
 
+
+def _load_transcript(video_id, languages=None, project_dir=None, use_cache=True):
+    if use_cache and has_transcript_cache:
+        hit = transcript_cache.lookup(video_id, languages, project_dir)
+        if hit:
+            entries, source, language = hit
+            print(f"[CACHE] Transcript loaded from cache ({source}, {language})", file=sys.stderr)
+            return entries, f"{source} (cached)"
+
+    error_details = ""
+    
+    # 1. Try to fetch from API
+    try:
+        if languages:
+            fetched = _fetch_with_retry(video_id, languages=languages)
+        else:
+            fetched = _fetch_with_retry(video_id)
+        language = getattr(fetched, 'language_code', None) or (languages[0] if languages else "unknown")
+        entries = [TranscriptEntry(s.text, s.start, getattr(s, 'duration', 0)) for s in fetched]
+        if use_cache and has_transcript_cache:
+            transcript_cache.store(video_id, language, transcript_cache.API_SOURCE, entries, project_dir)
+        return entries, "youtube-transcript-api"
+    except Exception as e:
+        print(f"⚠️ API transcript fetch failed: {e}. Attempting local Whisper transcription fallback...", file=sys.stderr)
+        error_details += f"API failed: {e}. "
+        
+    # 2. Try local transcription fallback
+    try:
+        entries = fetch_captions_via_transcription(video_id)
+    except Exception as e:
+        error_details += f"Local Whisper failed: {e}."
+        raise RuntimeError(error_details)
+    if use_cache and has_transcript_cache:
+        transcript_cache.store(video_id, "auto", transcript_cache.WHISPER_SOURCE, entries, project_dir)
+    return entries, "local-whisper-fallback"
+
+
+def get_youtube_captions(url, languages=None, with_timestamps=False, search_term=None, project_dir=None,
+                         use_cache=True):
+    """
+    Get YouTube video captions/transcript
+    """
     if languages is None:
         languages = ['en', 'en-US', 'en-GB', 'hi', 'te', 'ta', 'mr', 'es', 'fr', 'de']
     
@@ -217,36 +324,19 @@ def get_youtube_captions(url, languages=None, with_timestamps=False, search_term
         log_action_to_audit(project_dir, "Caption fetch failed: invalid URL", url=url, status="failed")
         sys.exit(1)
     
-    transcript_data = None
-    fetched_via = ""
-    error_details = ""
-    
-    # 1. Try to fetch from API
     try:
-        transcript_data = _fetch_with_retry(video_id, languages=languages)
-        fetched_via = "youtube-transcript-api"
-        print("[OK] Transcript retrieved successfully via YouTube API")
+        transcript_data, fetched_via = load_transcript(video_id, languages, project_dir, use_cache)
+        print(f"[OK] Transcript retrieved successfully via {fetched_via}")
     except Exception as e:
-        print(f"⚠️ API transcript fetch failed: {e}. Attempting local Whisper transcription fallback...", file=sys.stderr)
-        error_details += f"API failed: {e}. "
-        
-    # 2. Try local transcription fallback
-    if not transcript_data:
-        try:
-            transcript_data = fetch_captions_via_transcription(video_id)
-            fetched_via = "local-whisper-fallback"
-            print("[OK] Local transcription fallback succeeded")
-        except Exception as e:
-            print(f"[FAIL] Local transcription fallback failed: {e}", file=sys.stderr)
-            error_details += f"Local Whisper failed: {e}."
-            log_action_to_audit(
-                project_dir,
-                "Failed to retrieve captions",
-                url=url,
-                status="failed",
-                details=error_details
-            )
-            sys.exit(1)
+        print(f"[FAIL] Could not retrieve transcript: {e}", file=sys.stderr)
+        log_action_to_audit(
+            project_dir,
+            "Failed to retrieve captions",
+            url=url,
+            status="failed",
+            details=str(e)
+        )
+        sys.exit(1)
             
     # Format and search
     # If searching for a term, filter and return with timestamps
@@ -320,74 +410,93 @@ def get_youtube_captions(url, languages=None, with_timestamps=False, search_term
     return plain_text
 
 
-def find_timestamp_for_quote(url, quote, context_seconds=30, project_dir=None):
+def _quote_result(transcript_data, match, context_seconds):
+    """Builds the clip suggestion for a located quote (which may span several entries)."""
+    first = transcript_data[match.first_entry]
+    last = transcript_data[match.last_entry]
+    start_time = max(0, first.start - context_seconds)
+    duration = getattr(last, 'duration', 5)
+    end_time = last.start + duration + context_seconds
+
+    # Get surrounding context
+    context_entries = []
+    for j in range(max(0, match.first_entry - 3), min(len(transcript_data), match.last_entry + 4)):
+        context_entries.append({
+            'timestamp': format_timestamp(transcript_data[j].start),
+            'text': transcript_data[j].text
+        })
+
+    return {
+        'found': True,
+        'quote': " ".join(transcript_data[j].text.strip() for j in range(match.first_entry, match.last_entry + 1)),
+        'timestamp': format_timestamp(first.start),
+        'clip_start': format_timestamp(start_time),
+        'clip_end': format_timestamp(end_time),
+        'match': 'exact' if match.exact else f'fuzzy ({match.edits} word edits)',
+        'context': context_entries
+    }
+
+
+def _scan_for_quotes(transcript_data, quotes):
+    """Exact per-entry substring search, used when transcript_index is unavailable."""
+    lowered = [entry.text.lower() for entry in transcript_data]
+    matches = {}
+    for quote in quotes:
+        quote_lower = quote.lower()
+        idx = next((i for i, text in enumerate(lowered) if quote_lower in text), None)
+        matches[quote] = None if idx is None else SimpleNamespace(first_entry=idx, last_entry=idx, exact=True, edits=0)
+    return matches
+
+
+def find_timestamps_for_quotes(url, quotes, context_seconds=30, project_dir=None, use_cache=True, max_edits=0):
     """
-    Find the timestamp where a specific quote appears in the video.
+    Find the timestamps of many quotes in one video. The transcript is loaded and
+    indexed once; quotes may span caption entries and, with max_edits > 0, differ
+    from the transcript by up to that many words.
+
+    Returns:
+        list: One result dict per quote, in input order
     """
-    if not project_dir:
-        project_dir = "."
-        
     video_id = extract_video_id(url)
     if not video_id:
-        return {'found': False, 'message': f"Invalid video URL: {url}"}
-        
-    transcript_data = None
-    fetched_via = ""
-    
-    # Attempt API fetch
+        return [{'found': False, 'message': f"Invalid video URL: {url}"} for _ in quotes]
+
     try:
-        transcript_data = _fetch_with_retry(video_id)
-        fetched_via = "youtube-transcript-api"
-    except Exception:
-        # Fallback to local transcription
-        try:
-            transcript_data = fetch_captions_via_transcription(video_id)
-            fetched_via = "local-whisper-fallback"
-        except Exception as e:
-            return {'found': False, 'message': f"Failed to retrieve transcript: {e}"}
-            
-    quote_lower = quote.lower()
-    
-    for i, entry in enumerate(transcript_data):
-        if quote_lower in entry.text.lower():
-            # Found the quote
-            start_time = max(0, entry.start - context_seconds)
-            duration = getattr(entry, 'duration', 5)
-            end_time = entry.start + duration + context_seconds
-            
-            # Get surrounding context
-            context_entries = []
-            for j in range(max(0, i-3), min(len(transcript_data), i+4)):
-                context_entries.append({
-                    'timestamp': format_timestamp(transcript_data[j].start),
-                    'text': transcript_data[j].text
-                })
-            
-            log_action_to_audit(
-                project_dir,
-                f"Found quote timestamp",
-                url=url,
-                status="ok",
-                details=f"Quote: '{quote}'. Method: {fetched_via}"
-            )
-            
-            return {
-                'found': True,
-                'quote': entry.text,
-                'timestamp': format_timestamp(entry.start),
-                'clip_start': format_timestamp(start_time),
-                'clip_end': format_timestamp(end_time),
-                'context': context_entries
-            }
-            
+        transcript_data, fetched_via = load_transcript(video_id, project_dir=project_dir, use_cache=use_cache)
+    except Exception as e:
+        return [{'found': False, 'message': f"Failed to retrieve transcript: {e}"} for _ in quotes]
+
+    if has_transcript_index:
+        matches = get_index(video_id, transcript_data).find_many(quotes, max_edits=max_edits)
+    else:
+        matches = _scan_for_quotes(transcript_data, quotes)
+
+    results = []
+    for quote in quotes:
+        match = matches[quote]
+        if match:
+            results.append(_quote_result(transcript_data, match, context_seconds))
+        else:
+            results.append({'found': False, 'message': f"Quote not found: {quote}"})
+
+    found = sum(1 for r in results if r['found'])
     log_action_to_audit(
         project_dir,
-        f"Quote search returned 0 results",
+        f"Found quote timestamps ({found}/{len(quotes)})" if found else "Quote search returned 0 results",
         url=url,
-        status="skipped",
-        details=f"Quote: '{quote}'. Method: {fetched_via}"
+        status="ok" if found else "skipped",
+        details=f"Quotes: {'; '.join(repr(q) for q in quotes)}. Method: {fetched_via}"
     )
-    return {'found': False, 'message': f"Quote not found: {quote}"}
+    return results
+
+
+def find_timestamp_for_quote(url, quote, context_seconds=30, project_dir=None, use_cache=True, max_edits=0):
+    """
+    Find the timestamp where a specific quote appears in the video.
+    """
+    return find_timestamps_for_quotes(
+        url, [quote], context_seconds, project_dir=project_dir, use_cache=use_cache, max_edits=max_edits
+    )[0]
 
 
 def main():
@@ -404,6 +513,9 @@ Examples:
   
   # Search for specific term
   python caption_reader.py --url "https://youtube.com/watch?v=xxx" --search "electoral bonds"
+
+  # Find many quotes at once (one per line), tolerating one misheard word
+  python caption_reader.py --url "https://youtube.com/watch?v=xxx" --quotes-file quotes.txt --fuzzy 1
         """
     )
     
@@ -413,43 +525,57 @@ Examples:
     parser.add_argument("--timestamps", "-t", action="store_true",
                        help="Include timestamps with each line")
     parser.add_argument("--search", "-s", help="Search for specific term and show timestamps")
-    parser.add_argument("--find-quote", "-f", help="Find exact timestamp for a quote")
+    parser.add_argument("--find-quote", "-f", nargs="+", help="Find exact timestamp for one or more quotes")
+    parser.add_argument("--quotes-file", help="File with one quote per line to look up in a single pass")
+    parser.add_argument("--fuzzy", type=int, default=0,
+                       help="Allow up to N word insertions/deletions/substitutions per quote (default: 0)")
     parser.add_argument("--context", "-c", type=int, default=30,
                        help="Seconds of context around found quote (default: 30)")
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
     parser.add_argument("--project-dir", help="Project directory path for logging")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk transcript cache")
     
     args = parser.parse_args()
     
-    if args.find_quote:
-        result = find_timestamp_for_quote(
+    quotes = list(args.find_quote or [])
+    if args.quotes_file:
+        with open(args.quotes_file, 'r', encoding='utf-8') as f:
+            quotes.extend(line.strip() for line in f if line.strip())
+
+    if quotes:
+        results = find_timestamps_for_quotes(
             args.url, 
-            args.find_quote, 
+            quotes, 
             args.context, 
-            project_dir=args.project_dir
+            project_dir=args.project_dir,
+            use_cache=not args.no_cache,
+            max_edits=args.fuzzy
         )
         if args.json:
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            output = results[0] if len(results) == 1 else results
+            print(json.dumps(output, indent=2, ensure_ascii=False))
         else:
-            if result.get('found'):
-                print(f"\n[OK] Quote Found!")
-                print(f"   Timestamp: {result['timestamp']}")
-                print(f"   Text: {result['quote']}")
-                print(f"\n[WORKFLOW] Suggested Clip:")
-                print(f"   Start: {result['clip_start']}")
-                print(f"   End: {result['clip_end']}")
-                print(f"\n[DOC] Context:")
-                for entry in result['context']:
-                    print(f"   [{entry['timestamp']}] {entry['text']}")
-            else:
-                print(f"[FAIL] {result.get('message', 'Quote not found')}")
+            for quote, result in zip(quotes, results):
+                if result.get('found'):
+                    print(f"\n[OK] Quote Found! ({result['match']})")
+                    print(f"   Timestamp: {result['timestamp']}")
+                    print(f"   Text: {result['quote']}")
+                    print(f"\n[WORKFLOW] Suggested Clip:")
+                    print(f"   Start: {result['clip_start']}")
+                    print(f"   End: {result['clip_end']}")
+                    print(f"\n[DOC] Context:")
+                    for entry in result['context']:
+                        print(f"   [{entry['timestamp']}] {entry['text']}")
+                else:
+                    print(f"[FAIL] {result.get('message', 'Quote not found')}")
     else:
         captions = get_youtube_captions(
             args.url, 
             args.languages, 
             with_timestamps=args.timestamps,
             search_term=args.search,
-            project_dir=args.project_dir
+            project_dir=args.project_dir,
+            use_cache=not args.no_cache
         )
         print(captions)
 
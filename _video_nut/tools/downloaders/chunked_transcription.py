@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Chunked Parallel Transcription for VideoNut
+
+Splits long audio (e.g. a 2-hour hearing) into overlapping chunks cut on silence
+boundaries, transcribes the chunks across a process pool (or a running
+whisper_service.py), and merges the segments back into one timeline with global
+timestamps and de-duplicated overlaps. Used by caption_reader.py for long videos
+when it falls back to local transcription.
+
+Usage:
+    python chunked_transcription.py --audio "hearing.mp3" --workers 4
+    python chunked_transcription.py --audio "hearing.mp3" --workers 4 --benchmark
+"""
+
+import sys
+import os
+import argparse
+import concurrent.futures
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+try:
+    from tools.downloaders import whisper_service
+    has_whisper_service = True
+except ImportError:
+    has_whisper_service = False
+
+# Audio shorter than this is transcribed in a single pass
+MIN_CHUNKED_DURATION = 20 * 60
+CHUNK_SECONDS = 5 * 60
+OVERLAP_SECONDS = 2.0
+# How far from the ideal cut point we look for a silence to cut on
+SILENCE_SEARCH_WINDOW = 30.0
+SILENCE_NOISE_DB = -35
+SILENCE_MIN_SECONDS = 0.4
+
+# Per-process warm model for pool workers (loaded once by the initializer)
+_worker_model = None
+
+
+def probe_duration(audio_path, ffmpeg_path):
+    """Returns the audio duration in seconds by parsing ffmpeg's stream info."""
+    result = subprocess.run([ffmpeg_path, "-hide_banner", "-i", audio_path],
+                            capture_output=True, encoding='utf-8', errors='replace')
+    match = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        raise ValueError(f"Could not determine duration of {audio_path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def detect_silences(audio_path, ffmpeg_path, noise_db=SILENCE_NOISE_DB, min_silence=SILENCE_MIN_SECONDS):
+    """Returns the midpoints (seconds) of silent stretches found by ffmpeg's silencedetect."""
+    result = subprocess.run(
+        [ffmpeg_path, "-hide_banner", "-nostats", "-i", audio_path,
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}", "-f", "null", "-"],
+        capture_output=True, encoding='utf-8', errors='replace'
+    )
+    starts = [float(x) for x in re.findall(r"silence_start:\s*(-?\d+(?:\.\d+)?)", result.stderr)]
+    ends = [float(x) for x in re.findall(r"silence_end:\s*(-?\d+(?:\.\d+)?)", result.stderr)]
+    return [(max(0.0, s) + e) / 2 for s, e in zip(starts, ends)]
+
+
+def plan_chunks(duration, silences, chunk_seconds=CHUNK_SECONDS, overlap=OVERLAP_SECONDS,
+                search_window=SILENCE_SEARCH_WINDOW):
+    """
+    Picks cut points near every chunk_seconds, snapped to the nearest silence within
+    search_window. Each chunk owns [cut_i, cut_i+1) and is extracted with `overlap`
+    seconds of padding on both sides so words straddling a cut are heard whole.
+
+    Returns:
+        list: [(extract_start, extract_end, own_start, own_end), ...]
+    """
+    cuts = [0.0]
+    target = chunk_seconds
+    while target < duration - chunk_seconds / 4:
+        nearby = [s for s in silences if abs(s - target) <= search_window and s > cuts[-1]]
+        cut = min(nearby, key=lambda s: abs(s - target)) if nearby else target
+        cuts.append(cut)
+        target = cut + chunk_seconds
+    cuts.append(duration)
+
+    chunks = []
+    for own_start, own_end in zip(cuts, cuts[1:]):
+        chunks.append((max(0.0, own_start - overlap), min(duration, own_end + overlap), own_start, own_end))
+    return chunks
+
+
+def extract_chunk(audio_path, ffmpeg_path, start, end, output_path):
+    """Cuts [start, end) into a 16 kHz mono WAV, the format Whisper works on natively."""
+    subprocess.run(
+        [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y",
+         "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", audio_path,
+         "-ac", "1", "-ar", "16000", output_path],
+        check=True
+    )
+
+
+def load_model(model_size="tiny", cpu_threads=0):
+    """Loads a faster-whisper model, or an OpenAI whisper model if faster-whisper is missing."""
+    try:
+        from faster_whisper import WhisperModel
+        return ("faster-whisper", WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads))
+    except ImportError:
+        import whisper
+        return ("whisper", whisper.load_model(model_size))
+
+
+def transcribe_with_model(model, audio_path, beam_size=5):
+    """Returns [(text, start, duration), ...] for one audio file."""
+    engine, instance = model
+    if engine == "faster-whisper":
+        segments, _ = instance.transcribe(audio_path, beam_size=beam_size)
+        return [(seg.text, seg.start, seg.end - seg.start) for seg in segments]
+    result = instance.transcribe(audio_path)
+    return [(seg['text'], seg['start'], seg['end'] - seg['start']) for seg in result.get('segments', [])]
+
+
+def _init_worker(model_size, cpu_threads):
+    global _worker_model
+    _worker_model = load_model(model_size, cpu_threads)
+
+
+def _transcribe_chunk_in_worker(chunk_path):
+    return transcribe_with_model(_worker_model, chunk_path)
+
+
+def _transcribe_chunk_via_service(chunk_path, duration):
+    entries = whisper_service.transcribe_via_service(chunk_path, duration=duration)
+    if entries is None:
+        raise RuntimeError("Whisper service stopped during chunked transcription")
+    return entries
+
+
+def merge_chunk_segments(chunks, chunk_segments):
+    """
+    Shifts chunk-relative segments to global time and keeps each segment only in
+    the chunk that owns its start, dropping the duplicates produced by overlaps.
+    """
+    merged = []
+    for (extract_start, _, own_start, own_end), segments in zip(chunks, chunk_segments):
+        is_last = own_end == chunks[-1][3]
+        for text, start, duration in segments:
+            global_start = extract_start + start
+            if global_start < own_start or (global_start >= own_end and not is_last):
+                continue
+            text = text.strip()
+            # Guard against the same words landing just either side of a cut
+            if merged and text == merged[-1][0] and global_start - merged[-1][1] < OVERLAP_SECONDS * 2:
+                continue
+            merged.append((text, global_start, duration))
+    merged.sort(key=lambda seg: seg[1])
+    return merged
+
+
+def transcribe_chunked(audio_path, workers=None, model_size="tiny", ffmpeg_path=None, chunk_seconds=CHUNK_SECONDS):
+    """
+    Transcribes long audio as parallel overlapping chunks.
+
+    Returns:
+        list: [(text, start_seconds, duration_seconds), ...] in global time
+    """
+    # Imported here: clip_grabber pulls in yt_dlp and the source cache at load time
+    from tools.downloaders.clip_grabber import find_ffmpeg_executable
+    ffmpeg = find_ffmpeg_executable(ffmpeg_path)
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg is required for chunked transcription")
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+
+    duration = probe_duration(audio_path, ffmpeg)
+    silences = detect_silences(audio_path, ffmpeg)
+    chunks = plan_chunks(duration, silences, chunk_seconds=chunk_seconds)
+    print(f"🎙️ Chunked transcription: {duration / 60:.1f} min audio -> {len(chunks)} chunks, {workers} workers")
+
+    temp_dir = tempfile.mkdtemp(prefix="vn_chunks_")
+    try:
+        chunk_paths = []
+        for idx, (start, end, _, _) in enumerate(chunks):
+            chunk_path = os.path.join(temp_dir, f"chunk_{idx:04d}.wav")
+            extract_chunk(audio_path, ffmpeg, start, end, chunk_path)
+            chunk_paths.append(chunk_path)
+
+        if has_whisper_service and whisper_service.is_running():
+            # The service already holds a warm model and bounds its own concurrency
+            print("   Using running whisper service for chunks")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                durations = [end - start for start, end, _, _ in chunks]
+                chunk_segments = list(executor.map(_transcribe_chunk_via_service, chunk_paths, durations))
+        else:
+            cpu_threads = max(1, (os.cpu_count() or 2) // workers)
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(model_size, cpu_threads)
+            ) as executor:
+                chunk_segments = list(executor.map(_transcribe_chunk_in_worker, chunk_paths))
+
+        return merge_chunk_segments(chunks, chunk_segments)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def should_chunk(audio_path, ffmpeg_path=None):
+    """True if the audio is long enough to benefit from chunking and ffmpeg is available."""
+    from tools.downloaders.clip_grabber import find_ffmpeg_executable
+    ffmpeg = find_ffmpeg_executable(ffmpeg_path)
+    if not ffmpeg:
+        return False
+    try:
+        return probe_duration(audio_path, ffmpeg) >= MIN_CHUNKED_DURATION
+    except (ValueError, OSError):
+        return False
+
+
+def run_benchmark(audio_path, workers, model_size, chunk_seconds):
+    """Compares single-pass and chunked wall time on the same audio file."""
+    print(f"[BENCH] Single-pass transcription of {audio_path}...")
+    started = time.perf_counter()
+    model = load_model(model_size)
+    single = transcribe_with_model(model, audio_path)
+    single_secs = time.perf_counter() - started
+    del model
+
+    print(f"[BENCH] Chunked transcription with {workers} workers...")
+    started = time.perf_counter()
+    chunked = transcribe_chunked(audio_path, workers=workers, model_size=model_size, chunk_seconds=chunk_seconds)
+    chunked_secs = time.perf_counter() - started
+
+    print("\n📊 Transcription Benchmark")
+    print("=" * 50)
+    print(f"Single pass: {single_secs:8.1f}s ({len(single)} segments)")
+    print(f"Chunked:     {chunked_secs:8.1f}s ({len(chunked)} segments, {workers} workers)")
+    if chunked_secs > 0:
+        print(f"Speedup:     {single_secs / chunked_secs:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe long audio in parallel overlapping chunks.")
+    parser.add_argument("--audio", required=True, help="Local audio/video file")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel worker processes (default: half the CPUs)")
+    parser.add_argument("--model", default="tiny", help="Whisper model size (default: tiny)")
+    parser.add_argument("--chunk-seconds", type=int, default=CHUNK_SECONDS, help="Target chunk length in seconds")
+    parser.add_argument("--benchmark", action="store_true", help="Compare wall time against a single-pass transcription")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.audio):
+        print(f"Error: File not found: {args.audio}")
+        sys.exit(1)
+
+    workers = args.workers or max(1, (os.cpu_count() or 2) // 2)
+    if args.benchmark:
+        run_benchmark(args.audio, workers, args.model, args.chunk_seconds)
+        return
+
+    from tools.downloaders.caption_reader import format_timestamp
+    for text, start, _ in transcribe_chunked(args.audio, workers, args.model, chunk_seconds=args.chunk_seconds):
+        print(f"[{format_timestamp(start)}] {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,32 @@ Downloads specific clip segments from YouTube videos using the native yt-dlp Pyt
 Guarantees frame-accurate cuts using keyframe cutting and ffmpeg. Logs downloaded clips 
 to the audit log.
 
+Batch mode reads every video clip row from asset_manifest.md, groups the ranges
+by source video so each video's formats and metadata are resolved once, downloads
+the groups with bounded concurrency and prints a per-row report. A bad row is
+reported and skipped instead of aborting the batch.
+
+With the source cache (source_cache.py) a video is downloaded in full once and
+every clip from it is cut locally with ffmpeg. Local cuts default to smart
+cutting: only the partial GOPs at the clip boundaries are re-encoded and the
+rest is stream-copied (--cut-mode encode re-encodes the whole clip). By default ("auto") the cache is used when the source is
+already cached or when a batch cuts several clips from the same video.
+
 Usage:
     python clip_grabber.py --url "https://youtube.com/watch?v=xxx" --start 10 --end 30 --output "./Projects/test/assets/clips/scene1.mp4"
+    python clip_grabber.py --manifest "./Projects/test/asset_manifest.md" --workers 3
+    python clip_grabber.py --url "..." --start 10 --end 30 --output "scene1.mp4" --source-cache always
 """
 
 import os
 import sys
 import argparse
+import concurrent.futures
+import json
 import platform
+import re
 import shutil
+import tempfile
 from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
@@ -41,6 +58,8 @@ try:
 except ImportError:
     has_ytdlp = False
 
+from tools.downloaders import source_cache
+
 
 def log_action_to_audit(project_path, action, url="", local_path="", status="ok", details=""):
     """Wrapper for logging to audit trail if available."""
@@ -103,9 +122,55 @@ def find_ffmpeg_executable(ffmpeg_arg=None):
     return None
 
 
-def download_clip(url, start_time_str, end_time_str, output_path, ffmpeg_path=None, project_dir=None):
+# Manifest rows whose Type matches this are treated as clips
+CLIP_TYPE_PATTERN = re.compile(r'clip|video', re.IGNORECASE)
+TIME_VALUE = r'\d+(?::\d{1,2}){0,2}(?:\.\d+)?'
+TIMESTAMP_RANGE_PATTERN = re.compile(rf'({TIME_VALUE})\s*[-–—]\s*({TIME_VALUE})')
+# Timestamps meaning "do not cut a clip from this row"
+NON_CLIP_TIMESTAMPS = ("FULL", "TRANSCRIPT_ONLY")
+# Length downloaded when a row has no timestamp (see archivist Step D)
+PREVIEW_SECONDS = 30
+DEFAULT_BATCH_WORKERS = 3
+# Format used for range downloads and for cached full sources. H.264 is preferred
+# because smart cutting can re-encode its boundary GOPs and copy the rest.
+CLIP_FORMAT = 'bestvideo[height<=1080][vcodec^=avc1]+bestaudio[ext=m4a]/bestvideo[height<=1080]+bestaudio/best'
+# auto: use a cached source if present (batch: also fetch it for 2+ clips per video)
+# always: fetch the full source for any clip; never: yt-dlp range downloads only
+SOURCE_CACHE_MODES = ["auto", "always", "never"]
+
+
+class ClipRow:
+    """One video clip row from asset_manifest.md and its batch outcome."""
+    def __init__(self, line_no, scene, description, url, timestamp):
+        self.line_no = line_no
+        self.scene = scene
+        self.description = description
+        self.url = url
+        self.timestamp = timestamp
+        self.start = None
+        self.end = None
+        self.output_path = None
+        # pending -> ok | failed | skipped
+        self.status = "pending"
+        self.message = ""
+
+    def to_dict(self):
+        return {
+            "line": self.line_no,
+            "scene": self.scene,
+            "url": self.url,
+            "timestamp": self.timestamp,
+            "output": str(self.output_path) if self.output_path else None,
+            "status": self.status,
+            "message": self.message,
+        }
+
+
+def download_clip(url, start_time_str, end_time_str, output_path, ffmpeg_path=None, project_dir=None,
+                  source_cache_mode="auto", cut_mode="smart"):
     """
-    Downloads a precise segment of a video using native yt_dlp API.
+    Downloads a precise segment of a video, cutting it from the local source
+    cache when possible and otherwise using the native yt_dlp API.
     """
     if not project_dir:
         project_dir = str(Path(output_path).parent.parent)
@@ -142,13 +207,34 @@ def download_clip(url, start_time_str, end_time_str, output_path, ffmpeg_path=No
     out_file = Path(output_path)
     out_file.parent.mkdir(parents=True, exist_ok=True)
 
+    if resolved_ffmpeg and source_cache_mode != "never":
+        cache = source_cache.SourceCache()
+        try:
+            with cache.lease(url, CLIP_FORMAT, resolved_ffmpeg, download=source_cache_mode == "always") as entry:
+                if entry:
+                    method = source_cache.cut_from_source(entry, start_secs, end_secs, out_file, resolved_ffmpeg,
+                                                          mode=cut_mode)
+                    file_size = out_file.stat().st_size
+                    print(f"[OK] Cut from cached source ({method}). File saved to {out_file} ({file_size:,} bytes)")
+                    log_action_to_audit(
+                        project_dir,
+                        f"Downloaded video clip [{start_time_str} to {end_time_str}]",
+                        url=url,
+                        local_path=str(out_file),
+                        status="ok",
+                        details=f"Cut locally from cached source ({method})"
+                    )
+                    return
+        except Exception as e:
+            print(f"⚠️ Local cut from cached source failed: {e}. Falling back to range download...")
+
     # Use a temporary file path then rename on success (atomic download)
     temp_output = out_file.with_suffix(".tmp.mp4")
 
     # Native yt-dlp Options
     ydl_opts = {
         # Format: best video that is <= 1080p, merged with best audio, or fallback to best
-        'format': 'bestvideo[height<=1080]+bestaudio/best',
+        'format': CLIP_FORMAT,
         # Slicing ranges configuration
         'download_ranges': download_range_func(None, [(start_secs, end_secs)]),
         'force_keyframes_at_cuts': True,
@@ -204,24 +290,326 @@ def download_clip(url, start_time_str, end_time_str, output_path, ffmpeg_path=No
         sys.exit(1)
 
 
+def parse_manifest_clips(manifest_path):
+    """
+    Reads every markdown table row in asset_manifest.md whose Type looks like a
+    video clip and that carries a URL. Columns are located by header name.
+
+    Returns:
+        list: ClipRow objects in manifest order
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    rows = []
+    header = None
+    for line_no, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped.startswith('|'):
+            header = None
+            continue
+        cells = [c.strip() for c in stripped.strip('|').split('|')]
+        if all(re.fullmatch(r':?-+:?', c) for c in cells if c):
+            continue
+        if header is None:
+            header = [c.lower() for c in cells]
+            continue
+
+        record = dict(zip(header, cells))
+        url_match = re.search(r'https?://[^\s|\])>]+', record.get('url', ''))
+        if not url_match or not CLIP_TYPE_PATTERN.search(record.get('type', '')):
+            continue
+        rows.append(ClipRow(
+            line_no,
+            record.get('scene', ''),
+            record.get('description', ''),
+            url_match.group(0),
+            record.get('timestamp', '')
+        ))
+    return rows
+
+
+def _slugify(text, max_len=40):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower()
+    return slug[:max_len].rstrip('_') or "clip"
+
+
+def _plan_row(row, output_dir):
+    """Resolves a row's time range and output path, or marks it skipped/failed."""
+    timestamp = row.timestamp.strip()
+    if timestamp.upper() in NON_CLIP_TIMESTAMPS:
+        row.status = "skipped"
+        row.message = f"Timestamp is {timestamp.upper()}, no clip to cut"
+        return
+
+    match = TIMESTAMP_RANGE_PATTERN.search(timestamp)
+    try:
+        if match:
+            row.start = parse_time_to_seconds(match.group(1))
+            row.end = parse_time_to_seconds(match.group(2))
+        elif not timestamp or timestamp.upper() == "N/A":
+            row.start, row.end = 0.0, float(PREVIEW_SECONDS)
+            row.message = f"No timestamp in manifest - {PREVIEW_SECONDS}s preview only"
+        else:
+            raise ValueError(f"Invalid timestamp range: {timestamp}")
+    except ValueError as e:
+        row.status = "failed"
+        row.message = str(e)
+        return
+
+    if row.start >= row.end:
+        row.status = "failed"
+        row.message = f"Start time ({row.start}s) must be less than end time ({row.end}s)"
+        return
+
+    scene = _slugify(row.scene, 10) if row.scene else f"line{row.line_no}"
+    name = f"scene{scene}_{_slugify(row.description)}_{int(row.start)}-{int(row.end)}.mp4"
+    row.output_path = Path(output_dir) / name
+    if row.output_path.exists() and row.output_path.stat().st_size > 0:
+        row.status = "ok"
+        row.message = "Already downloaded"
+
+
+def _cut_group_from_source(url, rows, ffmpeg_path, project_dir, source_cache_mode, cut_mode):
+    """
+    Cuts a video's rows locally from the source cache, fetching the full source
+    first if the mode calls for it.
+
+    Returns:
+        list: Rows that still need a yt-dlp range download
+    """
+    if not ffmpeg_path or source_cache_mode == "never":
+        return rows
+
+    cache = source_cache.SourceCache()
+    download = source_cache_mode == "always" or len(rows) > 1
+    try:
+        # The lease keeps the source from being evicted by other runs while its rows are cut
+        with cache.lease(url, CLIP_FORMAT, ffmpeg_path, download=download) as entry:
+            if not entry:
+                return rows
+            return _cut_rows_from_source(entry, url, rows, ffmpeg_path, project_dir, cut_mode)
+    except Exception as e:
+        print(f"⚠️ Could not cache source {url}: {e}. Falling back to range downloads...")
+        return rows
+
+
+def _cut_rows_from_source(entry, url, rows, ffmpeg_path, project_dir, cut_mode):
+    """Cuts each row from a leased source. Returns the rows that failed."""
+    remaining = []
+    for row in rows:
+        try:
+            method = source_cache.cut_from_source(entry, row.start, row.end, row.output_path, ffmpeg_path,
+                                                  mode=cut_mode)
+        except Exception as e:
+            print(f"⚠️ Local cut failed for manifest line {row.line_no}: {e}")
+            remaining.append(row)
+            continue
+        row.status = "ok"
+        row.message = row.message or f"Cut from cached source ({method})"
+        log_action_to_audit(
+            project_dir,
+            f"Downloaded video clip [{row.start}s to {row.end}s]",
+            url=url,
+            local_path=str(row.output_path),
+            status="ok",
+            details=f"Batch from manifest line {row.line_no}, cut locally ({method})"
+        )
+    return remaining
+
+
+def _download_video_group(url, rows, ffmpeg_path, project_dir, source_cache_mode="auto", cut_mode="smart"):
+    """
+    Cuts a video's rows from the source cache where possible, then downloads any
+    remaining ranges with a single yt-dlp run, so the video's metadata and
+    formats are resolved only once.
+    """
+    rows = _cut_group_from_source(url, rows, ffmpeg_path, project_dir, source_cache_mode, cut_mode)
+    if not rows:
+        return
+
+    out_dir = rows[0].output_path.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+    temp_dir = Path(tempfile.mkdtemp(prefix=".clips_", dir=out_dir))
+
+    ranges = sorted({(row.start, row.end) for row in rows})
+    ydl_opts = {
+        'format': CLIP_FORMAT,
+        'download_ranges': download_range_func(None, ranges),
+        'force_keyframes_at_cuts': True,
+        'merge_output_format': 'mp4',
+        'outtmpl': str(temp_dir / 'clip_%(section_start)s-%(section_end)s.%(ext)s'),
+        # Several videos download at once, so keep per-fragment progress off the console
+        'quiet': True,
+        'noprogress': True,
+        'no_warnings': True,
+    }
+    if ffmpeg_path:
+        ydl_opts['ffmpeg_location'] = ffmpeg_path
+
+    try:
+        error = ""
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+        except Exception as e:
+            error = str(e)
+
+        produced = {}
+        for path in temp_dir.iterdir():
+            match = re.match(r'clip_([\d.]+)-([\d.]+)\.', path.name)
+            if match and path.stat().st_size > 0:
+                produced[(float(match.group(1)), float(match.group(2)))] = path
+
+        for row in rows:
+            clip = next((path for (start, end), path in produced.items()
+                         if abs(start - row.start) < 0.01 and abs(end - row.end) < 0.01), None)
+            if clip is None:
+                row.status = "failed"
+                row.message = error or "yt-dlp did not produce this clip"
+                log_action_to_audit(project_dir, f"Failed to download video clip: {row.message}",
+                                    url=url, status="failed", details=f"Manifest line {row.line_no}")
+                continue
+            # Rows sharing a range each get their own copy
+            temp_output = row.output_path.with_suffix(".tmp.mp4")
+            shutil.copyfile(clip, temp_output)
+            temp_output.replace(row.output_path)
+            row.status = "ok"
+            row.message = row.message or f"{row.output_path.stat().st_size:,} bytes"
+            log_action_to_audit(
+                project_dir,
+                f"Downloaded video clip [{row.start}s to {row.end}s]",
+                url=url,
+                local_path=str(row.output_path),
+                status="ok",
+                details=f"Batch from manifest line {row.line_no}"
+            )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def download_manifest_clips(manifest_path, project_dir=None, output_dir=None, ffmpeg_path=None,
+                            workers=DEFAULT_BATCH_WORKERS, source_cache_mode="auto", cut_mode="smart"):
+    """
+    Downloads every clip listed in asset_manifest.md. Rows are grouped by source
+    video and the groups run on a bounded thread pool; a failing row or video is
+    recorded in its rows' status instead of stopping the batch.
+
+    Returns:
+        list: ClipRow objects with status/message/output_path filled in
+    """
+    if not project_dir:
+        project_dir = str(Path(manifest_path).parent)
+    if not output_dir:
+        output_dir = str(Path(project_dir) / "assets")
+
+    rows = parse_manifest_clips(manifest_path)
+    for row in rows:
+        _plan_row(row, output_dir)
+
+    pending = [row for row in rows if row.status == "pending"]
+    if pending and not has_ytdlp:
+        for row in pending:
+            row.status = "failed"
+            row.message = "yt-dlp is not installed"
+        return rows
+
+    resolved_ffmpeg = find_ffmpeg_executable(ffmpeg_path)
+    if pending and not resolved_ffmpeg:
+        print("⚠️ Warning: ffmpeg not found. Keyframe cuts and format merging might fail.")
+
+    groups = {}
+    for row in pending:
+        groups.setdefault(row.url, []).append(row)
+
+    print(f"📥 {len(rows)} clip rows, {len(pending)} to download from {len(groups)} videos ({workers} at a time)")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(_download_video_group, url, group, resolved_ffmpeg, project_dir,
+                            source_cache_mode, cut_mode): url
+            for url, group in groups.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            url = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                for row in groups[url]:
+                    if row.status == "pending":
+                        row.status = "failed"
+                        row.message = str(e)
+            done = sum(1 for row in groups[url] if row.status == "ok")
+            print(f"   {'[OK]' if done == len(groups[url]) else '[FAIL]'} {url}: {done}/{len(groups[url])} clips")
+
+    return rows
+
+
+def print_batch_report(rows):
+    print("\n📋 Clip Batch Report")
+    print("=" * 60)
+    for row in rows:
+        tag = {"ok": "[OK]", "failed": "[FAIL]"}.get(row.status, "[SKIP]")
+        target = row.output_path.name if row.output_path else row.url
+        print(f"{tag} line {row.line_no} (scene {row.scene or '?'}): {target}")
+        if row.message:
+            print(f"      {row.message}")
+    counts = {status: sum(1 for row in rows if row.status == status) for status in ("ok", "skipped", "failed")}
+    print(f"\nTotal: {len(rows)} | OK: {counts['ok']} | Skipped: {counts['skipped']} | Failed: {counts['failed']}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download a video clip segment from YouTube using native yt-dlp API.")
-    parser.add_argument("--url", required=True, help="Video URL")
-    parser.add_argument("--start", required=True, help="Start time (e.g. 10 or 00:00:10)")
-    parser.add_argument("--end", required=True, help="End time (e.g. 30 or 00:00:30)")
-    parser.add_argument("--output", required=True, help="Output file path")
+    parser.add_argument("--url", help="Video URL")
+    parser.add_argument("--start", help="Start time (e.g. 10 or 00:00:10)")
+    parser.add_argument("--end", help="End time (e.g. 30 or 00:00:30)")
+    parser.add_argument("--output", help="Output file path")
+    parser.add_argument("--manifest", help="Download every clip row listed in this asset_manifest.md")
+    parser.add_argument("--output-dir", help="Folder for batch clips (default: <project>/assets)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS,
+                        help=f"Videos downloaded concurrently in batch mode (default: {DEFAULT_BATCH_WORKERS})")
+    parser.add_argument("--json", action="store_true", help="Print the batch report as JSON")
+    parser.add_argument("--source-cache", choices=SOURCE_CACHE_MODES, default="auto",
+                        help="Cut clips locally from a cached full download (default: auto)")
+    parser.add_argument("--cut-mode", choices=source_cache.CUT_MODES, default="smart",
+                        help="Local cuts: re-encode only boundary GOPs (smart) or the whole clip (encode)")
     parser.add_argument("--ffmpeg", help="Path to ffmpeg executable")
     parser.add_argument("--project-dir", help="Project directory path for logging")
 
     args = parser.parse_args()
 
+    if args.manifest:
+        if not os.path.exists(args.manifest):
+            print(f"Error: Manifest not found: {args.manifest}")
+            sys.exit(1)
+        rows = download_manifest_clips(
+            args.manifest,
+            project_dir=args.project_dir,
+            output_dir=args.output_dir,
+            ffmpeg_path=args.ffmpeg,
+            workers=args.workers,
+            source_cache_mode=args.source_cache,
+            cut_mode=args.cut_mode
+        )
+        if args.json:
+            print(json.dumps([row.to_dict() for row in rows], indent=2, ensure_ascii=False))
+        else:
+            print_batch_report(rows)
+        sys.exit(1 if any(row.status == "failed" for row in rows) else 0)
+
+    missing = [flag for flag, value in (("--url", args.url), ("--start", args.start),
+                                        ("--end", args.end), ("--output", args.output)) if not value]
+    if missing:
+        parser.error(f"the following arguments are required without --manifest: {', '.join(missing)}")
+
     download_clip(
         url=args.url,
         start_time_str=args.start,
         end_time_str=args.end,
         output_path=args.output,
         ffmpeg_path=args.ffmpeg,
-        project_dir=args.project_dir
+        project_dir=args.project_dir,
+        source_cache_mode=args.source_cache,
+        cut_mode=args.cut_mode
     )
 
 
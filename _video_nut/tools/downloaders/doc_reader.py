@@ -15,10 +15,8 @@ Usage:
 import sys
 import os
 import argparse
-import requests
+import hashlib
 import io
-import time
-from random import uniform
 import zipfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
@@ -39,6 +37,14 @@ try:
 except ImportError:
     has_audit_logger = False
 
+try:
+    from tools.downloaders import source_index
+    has_source_index = True
+except ImportError:
+    has_source_index = False
+
+from tools.net import http_cache
+
 # Try to import python-docx
 try:
     import docx
@@ -150,17 +156,9 @@ def download_and_read_docx(url=None, file_path=None, search_term=None, output_pa
     # 1. Download file from URL if provided
     if url:
         source_desc = url
-        # Add rate limiting wait delay
-        delay = uniform(1, 2)
-        print(f"Waiting {delay:.2f} seconds before downloading {url}...")
-        time.sleep(delay)
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            # Served from the shared HTTP cache when unchanged (rate-limited only on network access)
+            response = http_cache.get(url, timeout=30)
             response.raise_for_status()
             doc_data = io.BytesIO(response.content)
             
@@ -199,6 +197,14 @@ def download_and_read_docx(url=None, file_path=None, search_term=None, output_pa
         full_text, tables, engine = extract_docx_text(doc_data)
         lines = full_text.split("\n")
         print(f"[DOC] DOCX loaded using {engine}: {len(lines)} lines found")
+
+        # Feed the project's full-text index (replaced if the document changed)
+        if has_source_index:
+            source_index.add_document(
+                url or str(Path(file_path).resolve()), "docx", source_index.line_chunks(full_text),
+                title=Path((url or file_path).split("?")[0]).name,
+                digest=hashlib.sha256(full_text.encode('utf-8')).hexdigest(), project_dir=project_dir
+            )
         
         # 4. Search keyword if specified
         if search_term:
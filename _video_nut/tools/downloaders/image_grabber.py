@@ -1,8 +1,8 @@
 import os
 import sys
-import requests
 import argparse
 import mimetypes
+from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
@@ -11,6 +11,12 @@ if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8')
 from urllib.parse import urlparse
 
+# Set path for importing the shared HTTP client
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net import http_client
+
 def is_safe_image_type(content_type, url):
     """
     Check if the content type is a safe image type.
@@ -52,16 +58,12 @@ def download_image(url, output_path):
     if dir_name:
         os.makedirs(dir_name, exist_ok=True)
 
-    # Use standard Chrome User-Agent to bypass security filters (e.g. Wikimedia 403 blocks)
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    }
-
     try:
         print(f"Downloading image from: {url}")
 
         # Perform stream-based GET request directly to avoid double requests (HEAD + GET)
-        response = requests.get(url, headers=headers, stream=True, timeout=15)
+        # The shared client sends a standard Chrome User-Agent (avoids e.g. Wikimedia 403 blocks)
+        response = http_client.get(url, stream=True, timeout=15)
         response.raise_for_status()
 
         # Validate content type from headers
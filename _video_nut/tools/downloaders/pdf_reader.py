@@ -2,24 +2,28 @@
 """
 PDF Document Reader and Searcher for VideoNut
 
-Downloads and parses PDF files from URLs, with layout-aware column parsing and 
-table extraction using pdfplumber, falling back to pypdf if pdfplumber is not 
-installed. Logs all reads to the audit trail.
+Downloads and parses PDF files from URLs. Bulk reads and searches use fast pypdf
+extraction, sharded across a process pool for large documents; single pages (and
+--layout) use layout-aware column parsing and table extraction with pdfplumber.
+Either engine falls back to the other if it is missing or fails. Logs all reads
+to the audit trail.
 
 Usage:
     python pdf_reader.py --url "https://example.com/report.pdf"
     python pdf_reader.py --url "https://example.com/report.pdf" --search "electoral bonds"
+    python pdf_reader.py --url "https://example.com/report.pdf" --page 12
     python pdf_reader.py --url "https://example.com/report.pdf" --output "./Projects/my_project/assets/documents/report.pdf"
 """
 
 import sys
 import requests
 import io
-import time
-from random import uniform
 import argparse
-import re
 import os
+import collections
+import contextlib
+import concurrent.futures
+import tempfile
 from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
@@ -38,6 +42,15 @@ try:
 except ImportError:
     has_audit_logger = False
 
+try:
+    from tools.downloaders import source_index
+    has_source_index = True
+except ImportError:
+    has_source_index = False
+
+from tools.net import http_cache
+from tools.downloaders.pdf_text_cache import PdfTextCache
+
 # Try to import pdfplumber
 try:
     import pdfplumber
@@ -52,6 +65,9 @@ try:
 except ImportError:
     has_pypdf = False
 
+# Extracted page text, shared across projects and keyed by PDF digest
+text_cache = PdfTextCache()
+
 
 def log_action_to_audit(project_path, action, url="", local_path="", status="ok", details=""):
     """Wrapper for logging to audit trail if available."""
@@ -67,79 +83,270 @@ def log_action_to_audit(project_path, action, url="", local_path="", status="ok"
         )
 
 
-def extract_pdf_pages_pdfplumber(pdf_bytes, page_number=None) -> tuple[list[str], str]:
-    """Extract page text using pdfplumber with column/layout awareness."""
-    pages_text = []
-    engine_desc = "pdfplumber"
-    
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        total_pages = len(pdf.pages)
-        
-        if page_number:
-            if 1 <= page_number <= total_pages:
-                page = pdf.pages[page_number - 1]
-                # extract_text(layout=True) helps preserve column structures
-                text = page.extract_text(layout=True) or ""
-                pages_text.append(text)
-            else:
-                raise IndexError(f"Page {page_number} out of range (1-{total_pages})")
-        else:
-            # Smart page selection if full read
-            MAX_PAGES = 15
-            if total_pages <= MAX_PAGES:
-                pages_to_read = list(range(total_pages))
-            else:
-                first_pages = list(range(min(7, total_pages)))
-                last_pages = list(range(max(0, total_pages - 4), total_pages))
-                pages_to_read = sorted(set(first_pages + last_pages))
-                print(f"[DOC] PDF has {total_pages} pages. Reading pages {[p+1 for p in pages_to_read]} (pdfplumber smart selection)")
-                engine_desc = f"pdfplumber (smart selection: {len(pages_to_read)}/{total_pages} pages)"
-                
-            for idx in pages_to_read:
-                page = pdf.pages[idx]
-                text = page.extract_text(layout=True) or ""
-                pages_text.append(f"\n--- Page {idx+1} ---\n" + text)
-                
-    return pages_text, engine_desc
-
-
-def extract_pdf_pages_pypdf(pdf_bytes, page_number=None) -> tuple[list[str], str]:
-    """Fallback page text extractor using pypdf."""
-    pages_text = []
-    engine_desc = "pypdf"
-    
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    total_pages = len(reader.pages)
-    
+# Full reads of long PDFs only extract the first and last pages (searches read every page)
+MAX_PAGES = 15
+# Below this many pages to extract, a process pool costs more than it saves
+PARALLEL_MIN_PAGES = 24
+MAX_WORKERS = 8
+MAX_SHARD_PAGES = 16
+# Extracted pages are written to the text cache in batches of this size
+CACHE_BATCH_PAGES = 32
+DEFAULT_MAX_MATCHES = 10
+
+
+def select_pages(total_pages, page_number=None, all_pages=False) -> list[int]:
+    """0-based page indices to read: the requested page, every page, or a smart selection for full reads."""
     if page_number:
         if 1 <= page_number <= total_pages:
-            page = reader.pages[page_number - 1]
-            text = page.extract_text() or ""
-            pages_text.append(text)
-        else:
-            raise IndexError(f"Page {page_number} out of range (1-{total_pages})")
-    else:
-        MAX_PAGES = 15
-        if total_pages <= MAX_PAGES:
-            pages_to_read = list(range(total_pages))
-        else:
-            first_pages = list(range(min(7, total_pages)))
-            last_pages = list(range(max(0, total_pages - 4), total_pages))
-            pages_to_read = sorted(set(first_pages + last_pages))
-            print(f"[DOC] PDF has {total_pages} pages. Reading pages {[p+1 for p in pages_to_read]} (pypdf smart selection)")
-            engine_desc = f"pypdf (smart selection: {len(pages_to_read)}/{total_pages} pages)"
-            
-        for idx in pages_to_read:
-            page = reader.pages[idx]
-            text = page.extract_text() or ""
-            pages_text.append(f"\n--- Page {idx+1} ---\n" + text)
-            
-    return pages_text, engine_desc
-
-
-def read_pdf(url, search_term=None, page_number=None, output_path=None, project_dir=None):
+            return [page_number - 1]
+        raise IndexError(f"Page {page_number} out of range (1-{total_pages})")
+    if all_pages or total_pages <= MAX_PAGES:
+        return list(range(total_pages))
+    first_pages = list(range(min(7, total_pages)))
+    last_pages = list(range(max(0, total_pages - 4), total_pages))
+    return sorted(set(first_pages + last_pages))
+
+
+def engine_order(layout=False) -> list[str]:
+    """
+    Extraction engines to try, in order. pypdf is much faster and is used for bulk
+    reads; pdfplumber's layout-aware text (columns, tables) is preferred when a
+    single page is read or --layout is given.
+    """
+    engines = []
+    if has_pypdf:
+        engines.append("pypdf")
+    if has_pdfplumber:
+        engines.insert(0 if layout else len(engines), "pdfplumber")
+    if not engines:
+        raise ImportError("Neither pdfplumber nor pypdf is installed to parse PDF content.")
+    return engines
+
+
+def _open_document(source, engine):
+    """Opens a PDF (bytes or file path) with the given engine."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if engine == "pdfplumber":
+        return pdfplumber.open(source)
+    return PdfReader(source)
+
+
+def _page_count(doc):
+    return len(doc.pages)
+
+
+def _page_text(doc, engine, idx):
+    if engine == "pdfplumber":
+        # extract_text(layout=True) helps preserve column structures
+        return doc.pages[idx].extract_text(layout=True) or ""
+    return doc.pages[idx].extract_text() or ""
+
+
+def _close_document(doc, engine):
+    if engine == "pdfplumber":
+        doc.close()
+
+
+def count_pages(pdf_bytes, engine) -> int:
+    doc = _open_document(pdf_bytes, engine)
+    try:
+        return _page_count(doc)
+    finally:
+        _close_document(doc, engine)
+
+
+# Per-process document for pool workers (opened once by the initializer)
+_worker_doc = None
+_worker_engine = None
+
+
+def _init_worker(pdf_path, engine):
+    global _worker_doc, _worker_engine
+    _worker_doc = _open_document(pdf_path, engine)
+    _worker_engine = engine
+
+
+def _extract_shard_in_worker(page_indices):
+    return [(idx, _page_text(_worker_doc, _worker_engine, idx)) for idx in page_indices]
+
+
+def extract_pages(pdf_bytes, page_indices, engine, workers=None):
+    """
+    Yields (page_index, text) in page order. Large extractions are sharded into
+    contiguous page ranges across a process pool, each worker opening the
+    document once; shards are submitted a few at a time ahead of the consumer
+    so memory stays bounded and an early stop cancels the rest.
+    """
+    workers = workers or min(MAX_WORKERS, os.cpu_count() or 1)
+    if workers <= 1 or len(page_indices) < PARALLEL_MIN_PAGES:
+        doc = _open_document(pdf_bytes, engine)
+        try:
+            for idx in page_indices:
+                yield idx, _page_text(doc, engine, idx)
+        finally:
+            _close_document(doc, engine)
+        return
+
+    # Several small shards per worker keep cores busy when some pages are much
+    # heavier, and limit wasted work when the consumer stops early
+    shard_size = min(MAX_SHARD_PAGES, max(4, -(-len(page_indices) // (workers * 4))))
+    shards = [page_indices[i:i + shard_size] for i in range(0, len(page_indices), shard_size)]
+
+    # Workers open their own copy from disk instead of receiving the bytes per shard
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf", prefix="videonut_pdf_")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(pdf_bytes)
+
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(shards)),
+        initializer=_init_worker,
+        initargs=(pdf_path, engine)
+    )
+    try:
+        pending = collections.deque()
+        next_shard = 0
+        while next_shard < len(shards) or pending:
+            while next_shard < len(shards) and len(pending) < workers * 2:
+                pending.append(executor.submit(_extract_shard_in_worker, shards[next_shard]))
+                next_shard += 1
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            os.remove(pdf_path)
+        except OSError:
+            pass
+
+
+def cached_engine(digest, page_indices, engines):
+    """First engine whose text for every requested page is already cached, or None."""
+    for engine in engines:
+        if all(text_cache.has_page(digest, engine, idx) for idx in page_indices):
+            return engine
+    return None
+
+
+def download_pdf(url):
+    """PDF bytes, served from the shared HTTP cache when unchanged."""
+    response = http_cache.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+def iter_page_texts(digest, page_indices, engines, pdf_bytes=None, workers=None, load_pdf=None):
+    """
+    Yields (page_index, text, engine) in page order. Cached pages are read from
+    the text cache; the rest are extracted from pdf_bytes and cached. If the
+    first engine fails before producing any page, the next one is tried.
+
+    Args:
+        load_pdf: Called for the PDF bytes when pdf_bytes is None and a page has
+                  to be extracted after all (e.g. evicted by another process)
+    """
+    def document_bytes():
+        nonlocal pdf_bytes
+        if pdf_bytes is None:
+            if load_pdf is None:
+                raise ValueError("PDF bytes are required to extract pages missing from the cache")
+            pdf_bytes = load_pdf()
+        return pdf_bytes
+
+    for attempt, engine in enumerate(engines):
+        # Cached pages are read lazily so only one page is held in memory at a time
+        missing = [idx for idx in page_indices if not text_cache.has_page(digest, engine, idx)]
+        missing_set = set(missing)
+
+        extracted = extract_pages(document_bytes(), missing, engine, workers) if missing else None
+        to_cache = {}
+        cached_any = False
+        produced = False
+        try:
+            for idx in page_indices:
+                text = None if idx in missing_set else text_cache.get_page(digest, engine, idx)
+                if text is None:
+                    try:
+                        if idx in missing_set:
+                            _, text = next(extracted)
+                        else:
+                            # Evicted by another process since has_page(): extract just this page
+                            _, text = next(extract_pages(document_bytes(), [idx], engine, workers=1))
+                    except Exception as e:
+                        if produced or attempt + 1 >= len(engines):
+                            raise
+                        print(f"⚠️ {engine} failed: {e}. Falling back to {engines[attempt + 1]}...")
+                        break
+                    to_cache[idx] = text
+                    if len(to_cache) >= CACHE_BATCH_PAGES:
+                        text_cache.put_pages(digest, engine, to_cache)
+                        cached_any = True
+                        to_cache = {}
+                produced = True
+                yield idx, text, engine
+            else:
+                return
+        finally:
+            if extracted is not None:
+                extracted.close()
+            if to_cache:
+                text_cache.put_pages(digest, engine, to_cache)
+                cached_any = True
+            # One eviction pass per document, not per cached batch
+            if cached_any:
+                text_cache.evict(keep=digest)
+
+
+def index_pages(pages, url, digest, project_dir, batch_size=CACHE_BATCH_PAGES):
+    """Passes (page_index, text, engine) through, adding the pages to the full-text index in batches."""
+    batch = {}
+    try:
+        for idx, text, engine in pages:
+            batch[idx] = text
+            if len(batch) >= batch_size:
+                source_index.add_document(url, "pdf", source_index.pdf_page_chunks(batch),
+                                          title=Path(url.split("?")[0]).name, digest=digest, project_dir=project_dir)
+                batch = {}
+            yield idx, text, engine
+    finally:
+        # Same digest: only pages not indexed yet are added
+        if batch:
+            source_index.add_document(url, "pdf", source_index.pdf_page_chunks(batch),
+                                      title=Path(url.split("?")[0]).name, digest=digest, project_dir=project_dir)
+        pages.close()
+
+
+def search_pages(pages, search_term, context_lines=2):
     """
-    Read a PDF from URL with optional search and page selection.
+    Yields a match dict for every line containing search_term, page by page as
+    (page_index, text, engine) items arrive, so only one page is held at a time.
+    """
+    search_lower = search_term.lower()
+    for idx, text, engine in pages:
+        if search_lower not in text.lower():
+            continue
+        lines = text.split('\n')
+        for line_idx, line in enumerate(lines):
+            if search_lower in line.lower():
+                context_start = max(0, line_idx - context_lines)
+                context_end = min(len(lines), line_idx + context_lines + 1)
+                yield {
+                    'page': idx + 1,
+                    'line': line.strip(),
+                    'context': '\n'.join(lines[context_start:context_end]),
+                    'engine': engine,
+                }
+
+
+def read_pdf(url, search_term=None, page_number=None, output_path=None, project_dir=None, layout=False, workers=None,
+             max_matches=DEFAULT_MAX_MATCHES):
+    """
+    Read a PDF from URL with optional search and page selection. A page_number
+    takes precedence: that page is printed and search_term is ignored.
+
+    Args:
+        layout: Extract every page with layout-aware pdfplumber instead of fast pypdf
+        workers: Processes used to extract large page ranges (default: CPU count, max 8)
+        max_matches: Stop searching once this many matches are found
     """
     if not project_dir:
         if output_path:
@@ -147,118 +354,84 @@ def read_pdf(url, search_term=None, page_number=None, output_path=None, project_
         else:
             project_dir = "."
 
-    # Rate limiting delay
-    delay = uniform(1, 2)
-    print(f"Rate limiting: Waiting {delay:.2f} seconds before accessing {url}")
-    time.sleep(delay)
+    try:
+        # Bulk reads use the fast engine; a single page gets the layout-aware one
+        engines = engine_order(layout=layout or bool(page_number))
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    }
+        # Repeat reads of a known URL use the cached page text without downloading
+        pdf_bytes = None
+        engine = None
+        digest = None if output_path else text_cache.digest_for_url(url)
+        total_pages = text_cache.total_pages(digest) if digest else None
+        if total_pages is not None:
+            page_indices = select_pages(total_pages, page_number, all_pages=bool(search_term))
+            engine = cached_engine(digest, page_indices, engines[:1] if (layout or page_number) else engines)
+            if engine:
+                print(f"[CACHE] Using cached page text (sha256 {digest[:12]})")
 
-    try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        pdf_bytes = response.content
+        if engine is None:
+            pdf_bytes = download_pdf(url)
+            digest = text_cache.remember_url(url, pdf_bytes)
 
-        # Save local copy if output_path is provided
-        if output_path:
-            out_path = Path(output_path)
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Write to temp file then rename (atomic)
-            temp_path = out_path.with_suffix(".tmp")
-            with open(temp_path, 'wb') as f:
-                f.write(pdf_bytes)
-            if temp_path.stat().st_size == 0:
-                raise IOError("Downloaded PDF file is 0 bytes")
-            temp_path.replace(out_path)
-            
-            print(f"[SAVE] Raw PDF downloaded and saved to: {out_path}")
-            log_action_to_audit(project_dir, "Downloaded PDF file", url=url, local_path=str(out_path), status="ok")
-
-        # Select parser engine
-        engine = "none"
-        pages_text = []
-        
-        if has_pdfplumber:
-            try:
-                pages_text, engine = extract_pdf_pages_pdfplumber(pdf_bytes, page_number)
-            except Exception as e:
-                print(f"⚠️ pdfplumber failed: {e}. Falling back to pypdf...")
-                if has_pypdf:
-                    pages_text, engine = extract_pdf_pages_pypdf(pdf_bytes, page_number)
-                else:
-                    raise e
-        elif has_pypdf:
-            pages_text, engine = extract_pdf_pages_pypdf(pdf_bytes, page_number)
+            # Save local copy if output_path is provided
+            if output_path:
+                out_path = Path(output_path)
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+
+                # Write to temp file then rename (atomic)
+                temp_path = out_path.with_suffix(".tmp")
+                with open(temp_path, 'wb') as f:
+                    f.write(pdf_bytes)
+                if temp_path.stat().st_size == 0:
+                    raise IOError("Downloaded PDF file is 0 bytes")
+                temp_path.replace(out_path)
+
+                print(f"[SAVE] Raw PDF downloaded and saved to: {out_path}")
+                log_action_to_audit(project_dir, "Downloaded PDF file", url=url, local_path=str(out_path), status="ok")
+
+            total_pages = text_cache.total_pages(digest)
+            if total_pages is None:
+                total_pages = count_pages(pdf_bytes, engines[-1])
+                text_cache.set_total_pages(digest, total_pages)
+            page_indices = select_pages(total_pages, page_number, all_pages=bool(search_term))
         else:
-            raise ImportError("Neither pdfplumber nor pypdf is installed to parse PDF content.")
+            engines = [engine]
 
-        total_content = "\n".join(pages_text)
+        pages = iter_page_texts(digest, page_indices, engines, pdf_bytes, workers,
+                                load_pdf=lambda: download_pdf(url))
+        if has_source_index:
+            pages = index_pages(pages, url, digest, project_dir)
 
-        # 1. If specific page requested
-        if page_number:
-            print(f"\n--- Page {page_number} extracted via {engine} ---")
-            print(total_content)
-            log_action_to_audit(
-                project_dir,
-                f"Read PDF page {page_number}",
-                url=url,
-                local_path=output_path or "",
-                status="ok",
-                details=f"Engine: {engine}"
-            )
-            return
-            
-        # 2. If search term provided
-        if search_term:
+        # 1. If search term provided (and no single page): stream pages and stop at the match limit
+        if search_term and not page_number:
             print(f"[SCAN] Searching for: '{search_term}'")
-            search_lower = search_term.lower()
             matches = []
-            
-            # Reparse page-by-page to know exactly which page the match occurred on
-            # We can map each page_text element
-            for idx, p_text in enumerate(pages_text):
-                # Clean header lines
-                p_text_clean = re.sub(r"^--- Page \d+ ---\n", "", p_text)
-                if search_lower in p_text_clean.lower():
-                    lines = p_text_clean.split('\n')
-                    for line_idx, line in enumerate(lines):
-                        if search_lower in line.lower():
-                            context_start = max(0, line_idx - 2)
-                            context_end = min(len(lines), line_idx + 3)
-                            context = '\n'.join(lines[context_start:context_end])
-                            
-                            # Deduce page index
-                            # Note: if smart selection is on, page labels are explicitly written
-                            page_label_match = re.search(r"^--- Page (\d+) ---", p_text)
-                            page_lbl = int(page_label_match.group(1)) if page_label_match else (idx + 1)
-                            
-                            matches.append({
-                                'page': page_lbl,
-                                'line': line.strip(),
-                                'context': context
-                            })
-
-            if matches:
-                print(f"\n[OK] Found {len(matches)} matches for '{search_term}':\n")
-                for match_idx, match in enumerate(matches[:10]):
+            with contextlib.closing(pages):
+                for match in search_pages(pages, search_term):
+                    engine = match['engine']
+                    matches.append(match)
                     print(f"{'='*60}")
-                    print(f"[MATCH] Match {match_idx+1} - Page {match['page']}")
+                    print(f"[MATCH] Match {len(matches)} - Page {match['page']}")
                     print(f"{'='*60}")
                     print(f"Line: {match['line']}")
                     print(f"\nContext:")
                     print(match['context'])
                     print()
-                
-                if len(matches) > 10:
-                    print(f"... and {len(matches) - 10} more matches")
-                
+                    if len(matches) >= max_matches:
+                        break
+            # Closing the stream cancels extraction of the remaining pages
+
+            if matches:
+                if len(matches) >= max_matches:
+                    print(f"[OK] Stopped after {len(matches)} matches for '{search_term}' "
+                          f"(page {matches[-1]['page']} of {total_pages}; raise --max-matches for more)")
+                else:
+                    print(f"[OK] Found {len(matches)} matches for '{search_term}' in {total_pages} pages")
+
                 best_page = matches[0]['page']
                 print(f"\n[SCREENSHOT] Suggested page for screenshot: Page {best_page}")
                 print(f"   Use: python pdf_reader.py --url \"{url}\" --page {best_page}")
-                
+
                 log_action_to_audit(
                     project_dir,
                     f"Searched PDF for '{search_term}' (Found {len(matches)} matches)",
@@ -278,6 +451,35 @@ def read_pdf(url, search_term=None, page_number=None, output_path=None, project_
                 )
             return
 
+        # Single pages and smart selections are small enough to hold in memory
+        page_texts = {}
+        for idx, text, engine in pages:
+            page_texts[idx] = text
+
+        if page_number:
+            pages_text = [page_texts[page_indices[0]]]
+        else:
+            if len(page_indices) < total_pages:
+                print(f"[DOC] PDF has {total_pages} pages. Reading pages {[p+1 for p in page_indices]} ({engine} smart selection)")
+                engine = f"{engine} (smart selection: {len(page_indices)}/{total_pages} pages)"
+            pages_text = [f"\n--- Page {idx+1} ---\n" + page_texts[idx] for idx in page_indices]
+
+        total_content = "\n".join(pages_text)
+
+        # 2. If specific page requested
+        if page_number:
+            print(f"\n--- Page {page_number} extracted via {engine} ---")
+            print(total_content)
+            log_action_to_audit(
+                project_dir,
+                f"Read PDF page {page_number}",
+                url=url,
+                local_path=output_path or "",
+                status="ok",
+                details=f"Engine: {engine}"
+            )
+            return
+
         # 3. Default: Print truncated full text
         MAX_CHARS = 20000
         if len(total_content) > MAX_CHARS:
@@ -336,6 +538,10 @@ Examples:
     parser.add_argument("--page", "-p", type=int, help="Read specific page number (1-indexed)")
     parser.add_argument("--output", "-o", help="Path to save the raw downloaded PDF file")
     parser.add_argument("--project-dir", help="Project directory path for logging")
+    parser.add_argument("--layout", action="store_true", help="Use layout-aware pdfplumber for every page (slower)")
+    parser.add_argument("--max-matches", type=int, default=DEFAULT_MAX_MATCHES,
+                        help=f"Stop searching after this many matches (default: {DEFAULT_MAX_MATCHES})")
+    parser.add_argument("--workers", type=int, help="Processes for parallel page extraction (default: CPU count, max 8)")
     
     args = parser.parse_args()
     read_pdf(
@@ -343,7 +549,10 @@ Examples:
         search_term=args.search, 
         page_number=args.page, 
         output_path=args.output,
-        project_dir=args.project_dir
+        project_dir=args.project_dir,
+        layout=args.layout,
+        workers=args.workers,
+        max_matches=args.max_matches
     )
 
 
@@ -2,81 +2,131 @@
 """
 PDF Page Screenshotter for VideoNut
 Takes screenshots of specific PDF pages, optionally highlighting search terms.
-Uses Playwright to render PDFs in browser for high-quality screenshots.
+Uses PyMuPDF (fitz) to render pages to high-quality images.
+
+The PDF is downloaded once (through the shared HTTP cache) and its page text
+indexed in a single pass; with --all, every page containing the search term is
+rendered, in parallel worker processes for larger batches. Images are scaled to
+fit --width x --height, or rendered at a fixed --dpi.
 
 USAGE:
   # Screenshot specific page from PDF
   python pdf_screenshotter.py --url "https://example.com/report.pdf" --page 3 --output "page3.png"
-  
+
   # Search for term and screenshot the page where it's found
   python pdf_screenshotter.py --url "https://example.com/report.pdf" --search "Prime Minister" --output "pm_quote.png"
+
+  # Screenshot every page containing the term (pm_quote_p004.png, pm_quote_p017.png, ...)
+  python pdf_screenshotter.py --url "https://example.com/report.pdf" --search "Prime Minister" --all --output "pm_quote.png"
 """
 
 import sys
 import os
 import argparse
-import requests
+import concurrent.futures
+import tempfile
+from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
     sys.stdout.reconfigure(encoding='utf-8')
 if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8')
-import io
-import time
-from random import uniform
 try:
     import fitz
 except ImportError:
     print("Error: PyMuPDF (fitz) not installed. Install with: pip install pymupdf")
     sys.exit(1)
 
+# Set path for importing the shared HTTP client
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net import http_cache
+from tools.downloaders.pdf_text_cache import PdfTextCache, pdf_digest
+
+DEFAULT_WIDTH = 1280
+DEFAULT_HEIGHT = 1600
+# Cap on pages rendered by --all, so a common word does not produce hundreds of images
+DEFAULT_MAX_SHOTS = 20
+# Rendering fewer pages than this in a process pool costs more than it saves
+PARALLEL_MIN_PAGES = 3
+MAX_WORKERS = 8
+# Page text index entries are shared with pdf_reader's cache under their own engine name
+TEXT_ENGINE = "pymupdf"
+
+text_cache = PdfTextCache()
+
+
+def download_pdf(url):
+    """Downloads a PDF (served from the shared HTTP cache when unchanged). Returns its bytes."""
+    # Rate-limited per host only when the network is actually hit
+    response = http_cache.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
 
 def download_pdf_to_temp(url, temp_path):
     """Download PDF to a temporary file."""
-    delay = uniform(1, 2)
-    print(f"[WAIT] Rate limiting: Waiting {delay:.2f} seconds...")
-    time.sleep(delay)
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    }
-    
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
-    
     with open(temp_path, 'wb') as f:
-        f.write(response.content)
-    
+        f.write(download_pdf(url))
+
     return temp_path
 
 
+def build_page_index(doc, digest=None):
+    """
+    Text of every page, extracted in one pass over an open document. Pages already
+    in the PDF text cache (same document digest) are not extracted again.
+    """
+    texts = []
+    extracted = {}
+    for i in range(len(doc)):
+        text = text_cache.get_page(digest, TEXT_ENGINE, i) if digest else None
+        if text is None:
+            text = doc.load_page(i).get_text() or ""
+            extracted[i] = text
+        texts.append(text)
+    if digest and extracted:
+        text_cache.set_total_pages(digest, len(doc))
+        text_cache.put_pages(digest, TEXT_ENGINE, extracted)
+        text_cache.evict(keep=digest)
+    return texts
+
+
+def find_pages_with_term(page_texts, search_term):
+    """1-indexed numbers of every page whose text contains the search term."""
+    search_lower = search_term.lower()
+    return [i + 1 for i, text in enumerate(page_texts) if search_lower in text.lower()]
+
+
 def find_page_with_term(pdf_path, search_term):
     """Find the first page containing the search term."""
     doc = fitz.open(pdf_path)
-    search_lower = search_term.lower()
-    
-    for i in range(len(doc)):
-        page = doc.load_page(i)
-        page_text = page.get_text()
-        if page_text and search_lower in page_text.lower():
-            return i + 1  # Return 1-indexed page number
-    
-    return None
+    try:
+        pages = find_pages_with_term(build_page_index(doc), search_term)
+    finally:
+        doc.close()
+    return pages[0] if pages else None
 
 
-def screenshot_pdf_page(pdf_path, page_number, output_path, search_term=None, width=1280, height=1600):
-    """
-    Take a screenshot of a specific PDF page using PyMuPDF (fitz) rendering.
-    
-    Args:
-        pdf_path: Local path to PDF file
-        page_number: Page to screenshot (1-indexed)
-        output_path: Where to save the screenshot
-        search_term: Optional term to highlight on the page
-        width: Viewport width (unused in fitz, kept for compatibility)
-        height: Viewport height (unused in fitz, kept for compatibility)
-    """
+def output_path_for_page(output_path, page_number):
+    """report.png -> report_p012.png, for one image per page."""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_p{page_number:03d}{path.suffix or '.png'}"))
+
+
+def render_zoom(page, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, dpi=None):
+    """Scale factor for rendering: a fixed DPI, or the largest that fits width x height."""
+    if dpi:
+        return dpi / 72.0
+    rect = page.rect
+    return min(width / rect.width, height / rect.height)
+
+
+def _render_page(doc, page_number, output_path, search_term=None, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT,
+                 dpi=None):
+    """Highlights and renders one page of an open document. Returns a result dict."""
     result = {
         'success': False,
         'page': page_number,
@@ -84,26 +134,23 @@ def screenshot_pdf_page(pdf_path, page_number, output_path, search_term=None, wi
         'message': '',
         'output_path': output_path
     }
-    
+
     try:
-        # Open the PDF document
-        doc = fitz.open(pdf_path)
         total_pages = len(doc)
-        
+
         if page_number < 1 or page_number > total_pages:
             result['message'] = f"Page {page_number} not found. PDF has {total_pages} pages."
             return result
-        
+
         # Load the specific page (0-indexed in PyMuPDF)
         page = doc.load_page(page_number - 1)
-        
+
         # If search term provided, search and highlight it
         if search_term:
-            print(f"[SCAN] Searching for '{search_term}' using PyMuPDF...")
             text_instances = page.search_for(search_term)
-            
+
             if text_instances:
-                print(f"[OK] Found {len(text_instances)} instances of '{search_term}'. Highlighting...")
+                print(f"[OK] Page {page_number}: {len(text_instances)} instances of '{search_term}'. Highlighting...")
                 for inst in text_instances:
                     annot = page.add_highlight_annot(inst)
                     # Use standard yellow highlight
@@ -112,31 +159,96 @@ def screenshot_pdf_page(pdf_path, page_number, output_path, search_term=None, wi
                 result['search_found'] = True
             else:
                 print(f"⚠️ '{search_term}' not found on page {page_number}")
-        
-        # Render the page to a high-quality image (DPI=150 is approx 2x zoom)
-        zoom = 2.0
+
+        zoom = render_zoom(page, width, height, dpi)
         mat = fitz.Matrix(zoom, zoom)
-        
-        print(f"[SCREENSHOT] Rendering page {page_number}...")
+
+        print(f"[SCREENSHOT] Rendering page {page_number} at {zoom * 72:.0f} DPI...")
         pix = page.get_pixmap(matrix=mat)
-        
+
         # Save output image
         pix.save(output_path)
-        
+
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             result['success'] = True
-            result['message'] = f"Screenshot saved: {output_path}"
+            result['message'] = f"Screenshot saved: {output_path} ({pix.width}x{pix.height})"
             print(f"[OK] {result['message']}")
         else:
             result['message'] = "Screenshot file is empty or not created"
-            
+
     except Exception as e:
         result['message'] = f"Error: {str(e)}"
         print(f"[FAIL] {result['message']}")
-        
+
     return result
 
 
+def screenshot_pdf_page(pdf_path, page_number, output_path, search_term=None, width=DEFAULT_WIDTH,
+                        height=DEFAULT_HEIGHT, dpi=None):
+    """
+    Take a screenshot of a specific PDF page using PyMuPDF (fitz) rendering.
+
+    Args:
+        pdf_path: Local path to PDF file
+        page_number: Page to screenshot (1-indexed)
+        output_path: Where to save the screenshot
+        search_term: Optional term to highlight on the page
+        width: Maximum image width; the page is scaled to fit width x height
+        height: Maximum image height
+        dpi: Render at this fixed resolution instead of fitting width x height
+    """
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception as e:
+        print(f"[FAIL] Error: {e}")
+        return {'success': False, 'page': page_number, 'search_found': False,
+                'message': f"Error: {str(e)}", 'output_path': output_path}
+    try:
+        return _render_page(doc, page_number, output_path, search_term, width, height, dpi)
+    finally:
+        doc.close()
+
+
+# Per-process document for pool workers (opened once by the initializer)
+_worker_doc = None
+
+
+def _init_worker(pdf_path):
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _render_in_worker(page_number, output_path, search_term, width, height, dpi):
+    return _render_page(_worker_doc, page_number, output_path, search_term, width, height, dpi)
+
+
+def screenshot_pdf_pages(pdf_path, page_numbers, output_path, search_term=None, width=DEFAULT_WIDTH,
+                         height=DEFAULT_HEIGHT, dpi=None, workers=None):
+    """
+    Renders several pages of one PDF, one image per page named after output_path
+    (see output_path_for_page). Larger batches are spread across worker processes,
+    each opening the document once.
+
+    Returns:
+        list: One result dict per page, in page order
+    """
+    jobs = [(n, output_path_for_page(output_path, n)) for n in page_numbers]
+    workers = min(workers or min(MAX_WORKERS, os.cpu_count() or 1), len(jobs))
+
+    if workers <= 1 or len(jobs) < PARALLEL_MIN_PAGES:
+        doc = fitz.open(pdf_path)
+        try:
+            return [_render_page(doc, n, out, search_term, width, height, dpi) for n, out in jobs]
+        finally:
+            doc.close()
+
+    print(f"[SCREENSHOT] Rendering {len(jobs)} pages with {workers} workers...")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(pdf_path,)) as executor:
+        futures = [executor.submit(_render_in_worker, n, out, search_term, width, height, dpi) for n, out in jobs]
+        return [future.result() for future in futures]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Screenshot specific pages from PDF documents.",
@@ -145,84 +257,128 @@ def main():
 Examples:
   # Screenshot specific page
   python pdf_screenshotter.py --url "https://example.com/report.pdf" --page 3 --output "page3.png"
-  
+
   # Auto-find page with search term and screenshot
   python pdf_screenshotter.py --url "https://example.com/report.pdf" --search "Prime Minister" --output "pm_quote.png"
-  
+
+  # Screenshot every page with the term, at 200 DPI
+  python pdf_screenshotter.py --url "https://example.com/report.pdf" --search "Prime Minister" --all --dpi 200 --output "pm_quote.png"
+
   # Screenshot local PDF file
   python pdf_screenshotter.py --file "report.pdf" --page 5 --output "page5.png"
         """
     )
-    
+
     parser.add_argument("--url", "-u", help="URL of the PDF document")
     parser.add_argument("--file", "-f", help="Local path to PDF file")
     parser.add_argument("--page", "-p", type=int, help="Page number to screenshot (1-indexed)")
     parser.add_argument("--search", "-s", help="Search for term and screenshot that page")
+    parser.add_argument("--all", action="store_true",
+                        help="With --search, screenshot every matching page (output gets a _pNNN suffix)")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_SHOTS,
+                        help=f"Most pages rendered by --all (default: {DEFAULT_MAX_SHOTS})")
     parser.add_argument("--output", "-o", required=True, help="Output file path for screenshot")
-    parser.add_argument("--width", type=int, default=1280, help="Viewport width (default: 1280)")
-    parser.add_argument("--height", type=int, default=1600, help="Viewport height (default: 1600)")
-    
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH,
+                        help=f"Maximum image width; the page is scaled to fit (default: {DEFAULT_WIDTH})")
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT,
+                        help=f"Maximum image height (default: {DEFAULT_HEIGHT})")
+    parser.add_argument("--dpi", type=int, help="Render at a fixed resolution instead of fitting --width/--height")
+    parser.add_argument("--workers", type=int, help="Processes used to render several pages (default: CPU count, max 8)")
+
     args = parser.parse_args()
-    
+
     # Validate inputs
     if not args.url and not args.file:
         print("Error: Either --url or --file must be provided")
         sys.exit(1)
-    
+
     if not args.page and not args.search:
         print("Error: Either --page or --search must be provided")
         sys.exit(1)
-    
+
     # Ensure output directory exists
     output_dir = os.path.dirname(args.output)
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
-    
+
     # Get PDF file (download if URL provided)
+    temp_path = None
     if args.url:
-        temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.temp')
-        os.makedirs(temp_dir, exist_ok=True)
-        pdf_path = os.path.join(temp_dir, 'temp_pdf.pdf')
-        
         print(f"📥 Downloading PDF from {args.url}...")
         try:
-            download_pdf_to_temp(args.url, pdf_path)
+            pdf_bytes = download_pdf(args.url)
             print(f"[OK] PDF downloaded")
         except Exception as e:
             print(f"[FAIL] Failed to download PDF: {e}")
             sys.exit(1)
+        # Unique per run, so parallel screenshotters never overwrite each other's download
+        fd, temp_path = tempfile.mkstemp(suffix=".pdf", prefix="videonut_pdf_")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_bytes)
+        pdf_path = temp_path
     else:
         pdf_path = args.file
         if not os.path.exists(pdf_path):
             print(f"Error: File not found: {pdf_path}")
             sys.exit(1)
-    
-    # Determine page number
-    page_number = args.page
-    if args.search:
-        print(f"[SCAN] Searching for '{args.search}' in PDF...")
-        found_page = find_page_with_term(pdf_path, args.search)
-        if found_page:
-            page_number = found_page
-            print(f"[OK] Found '{args.search}' on page {page_number}")
+        with open(pdf_path, 'rb') as f:
+            pdf_bytes = f.read()
+
+    try:
+        # Determine page numbers
+        page_numbers = [args.page] if args.page else []
+        if args.search:
+            print(f"[SCAN] Searching for '{args.search}' in PDF...")
+            with fitz.open(pdf_path) as doc:
+                found_pages = find_pages_with_term(build_page_index(doc, pdf_digest(pdf_bytes)), args.search)
+            if not found_pages:
+                print(f"[FAIL] '{args.search}' not found in PDF")
+                sys.exit(1)
+            print(f"[OK] Found '{args.search}' on page(s) {', '.join(map(str, found_pages))}")
+            if args.all:
+                if len(found_pages) > args.max_pages:
+                    print(f"⚠️ Rendering the first {args.max_pages} of {len(found_pages)} pages (raise --max-pages for more)")
+                page_numbers = found_pages[:args.max_pages]
+            else:
+                page_numbers = found_pages[:1]
+
+        # Take screenshots
+        if len(page_numbers) == 1 and not args.all:
+            results = [screenshot_pdf_page(
+                pdf_path,
+                page_numbers[0],
+                args.output,
+                search_term=args.search,
+                width=args.width,
+                height=args.height,
+                dpi=args.dpi
+            )]
         else:
-            print(f"[FAIL] '{args.search}' not found in PDF")
-            sys.exit(1)
-    
-    # Take screenshot
-    result = screenshot_pdf_page(
-        pdf_path, 
-        page_number, 
-        args.output,
-        search_term=args.search,
-        width=args.width,
-        height=args.height
-    )
-    
-    if result['success']:
+            results = screenshot_pdf_pages(
+                pdf_path,
+                page_numbers,
+                args.output,
+                search_term=args.search,
+                width=args.width,
+                height=args.height,
+                dpi=args.dpi,
+                workers=args.workers
+            )
+    finally:
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    failed = [r for r in results if not r['success']]
+    if len(results) > 1:
+        print(f"\n📋 {len(results) - len(failed)}/{len(results)} pages captured")
+    if not failed:
         sys.exit(0)
     else:
-        print(f"[FAIL] Failed: {result['message']}")
+        for r in failed:
+            print(f"[FAIL] Failed: {r['message']}")
         sys.exit(1)
 
 
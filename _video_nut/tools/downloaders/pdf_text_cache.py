@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+PDF Text Cache for VideoNut
+
+On-disk cache of extracted PDF page text used by pdf_reader.py, so repeated
+--search / --page reads of the same report skip both the download and the
+(slow) pdfplumber/pypdf extraction. Documents are keyed by the SHA-256 of the
+PDF bytes, so the same file reached through different URLs is extracted once,
+and a changed file at the same URL gets a new entry.
+
+Layout (~/.cache/videonut/pdf_text, or $VIDEONUT_CACHE_DIR/pdf_text):
+    <sha256>/meta.json             total page count
+    <sha256>/<engine>/0001.txt     text of page 1 as extracted by <engine>
+    urls/<sha256 of url>.json      last digest seen for a URL
+
+Pages are stored individually as they are extracted, so a smart-selection read
+followed by --page 40 only extracts page 40. The cache is bounded in size with
+least-recently-used eviction of whole documents.
+
+Usage:
+    python pdf_text_cache.py --stats
+    python pdf_text_cache.py --clear
+"""
+
+import sys
+import os
+import argparse
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+
+MAX_CACHE_BYTES = 500 * 1024 * 1024
+# How long a URL is trusted to still serve the same PDF without re-downloading it
+URL_TTL_SECONDS = 7 * 24 * 3600
+
+
+def pdf_digest(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _write_atomic(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    temp_path.replace(path)
+
+
+class PdfTextCache:
+    """One cache directory of per-page text files keyed by PDF digest."""
+    def __init__(self, cache_dir=None, max_bytes=MAX_CACHE_BYTES, url_ttl_seconds=URL_TTL_SECONDS):
+        self.cache_dir = Path(cache_dir) if cache_dir else global_cache_root() / "pdf_text"
+        self.max_bytes = max_bytes
+        self.url_ttl_seconds = url_ttl_seconds
+
+    def _url_path(self, url):
+        return self.cache_dir / "urls" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _doc_dir(self, digest):
+        return self.cache_dir / digest
+
+    def _page_path(self, digest, engine, page_index):
+        return self._doc_dir(digest) / engine / f"{page_index + 1:04d}.txt"
+
+    def digest_for_url(self, url):
+        """Digest of the PDF last downloaded from this URL, or None if unknown or too old."""
+        try:
+            with open(self._url_path(url), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get("fetched_at", 0) > self.url_ttl_seconds:
+            return None
+        if not (self._doc_dir(data["digest"]) / "meta.json").exists():
+            return None
+        return data["digest"]
+
+    def remember_url(self, url, pdf_bytes):
+        """Records which document a URL served. Returns its digest."""
+        digest = pdf_digest(pdf_bytes)
+        try:
+            _write_atomic(self._url_path(url), json.dumps({"url": url, "digest": digest, "fetched_at": time.time()}))
+        except OSError as e:
+            print(f"⚠️ Could not write PDF text cache: {e}", file=sys.stderr)
+        return digest
+
+    def total_pages(self, digest):
+        meta_path = self._doc_dir(digest) / "meta.json"
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                total = json.load(f)["total_pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+        # Bump mtime so eviction treats this document as recently used
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+        return total
+
+    def set_total_pages(self, digest, total_pages):
+        try:
+            _write_atomic(self._doc_dir(digest) / "meta.json", json.dumps({"total_pages": total_pages}))
+        except OSError as e:
+            print(f"⚠️ Could not write PDF text cache: {e}", file=sys.stderr)
+
+    def has_page(self, digest, engine, page_index):
+        return self._page_path(digest, engine, page_index).is_file()
+
+    def get_page(self, digest, engine, page_index):
+        try:
+            return self._page_path(digest, engine, page_index).read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def put_pages(self, digest, engine, pages):
+        """
+        Stores {page_index: text} for one engine. Eviction walks the whole cache, so
+        it is not done here: call evict(keep=digest) once the document is finished.
+        """
+        try:
+            for page_index, text in pages.items():
+                _write_atomic(self._page_path(digest, engine, page_index), text)
+        except OSError as e:
+            print(f"⚠️ Could not write PDF text cache: {e}", file=sys.stderr)
+
+    def _documents(self):
+        if not self.cache_dir.is_dir():
+            return []
+        return [p for p in self.cache_dir.iterdir() if p.is_dir() and p.name != "urls"]
+
+    def _document_size(self, doc_dir):
+        return sum(p.stat().st_size for p in doc_dir.rglob("*") if p.is_file())
+
+    def evict(self, keep=None):
+        """Removes least-recently-used documents until the cache fits in max_bytes."""
+        docs = []
+        for doc_dir in self._documents():
+            try:
+                mtime = (doc_dir / "meta.json").stat().st_mtime
+            except OSError:
+                mtime = 0
+            docs.append((mtime, self._document_size(doc_dir), doc_dir))
+        total = sum(size for _, size, _ in docs)
+        for _, size, doc_dir in sorted(docs, key=lambda d: d[0]):
+            if total <= self.max_bytes:
+                break
+            if doc_dir.name == keep:
+                continue
+            shutil.rmtree(doc_dir, ignore_errors=True)
+            total -= size
+
+    def stats(self):
+        docs = self._documents()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "documents": len(docs),
+            "bytes": sum(self._document_size(d) for d in docs),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        if self.cache_dir.is_dir():
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the VideoNut PDF text cache.")
+    parser.add_argument("--stats", action="store_true", help="Show cache size and document count")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached page text")
+    args = parser.parse_args()
+
+    cache = PdfTextCache()
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cleared {cache.cache_dir}")
+    else:
+        st = cache.stats()
+        print(f"[CACHE] {st['cache_dir']}: {st['documents']} documents, "
+              f"{st['bytes'] / 1024 / 1024:.1f} / {st['max_bytes'] / 1024 / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,6 @@ Usage:
 import sys
 import os
 import argparse
-import time
-from random import uniform
 from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
@@ -33,6 +31,9 @@ try:
 except ImportError:
     has_audit_logger = False
 
+from tools.net import rate_limiter
+from tools.downloaders import browser_service
+
 try:
     from playwright.sync_api import sync_playwright
     has_playwright = True
@@ -80,10 +81,7 @@ def take_screenshot(url, output_path, project_path=None):
         log_action_to_audit(project_path, "Screenshot failed: Playwright missing", url=url, status="failed")
         sys.exit(1)
 
-    # 1. Enforce rate limit delay
-    delay = uniform(1, 2)
-    print(f"Waiting {delay:.2f} seconds before capturing screenshot...")
-    time.sleep(delay)
+    rate_limiter.wait_for(url)
 
     # Ensure output directory exists
     out_file = Path(output_path)
@@ -100,12 +98,12 @@ def take_screenshot(url, output_path, project_path=None):
     # Try downloading with temporary output to avoid leaving partial/empty files
     temp_output = out_file.with_suffix(".tmp.png")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        context = browser.new_context(
-            viewport={"width": 1280, "height": 800},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
+    # Uses the warm shared browser when browser_service.py is running
+    with sync_playwright() as p, browser_service.browser_context(
+        p,
+        viewport={"width": 1280, "height": 800},
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ) as context:
         page = context.new_page()
 
         success = False
@@ -145,8 +143,6 @@ def take_screenshot(url, output_path, project_path=None):
                     except Exception:
                         pass
 
-        browser.close()
-
         if success:
             # Move temp file to correct location (atomic)
             if out_file.exists():
@@ -16,11 +16,8 @@ import os
 import argparse
 import json
 import re
-import time
 import urllib.parse
-from random import uniform
 from pathlib import Path
-import requests
 from bs4 import BeautifulSoup
 
 # Enforce UTF-8 output encoding for Windows terminal safety
@@ -39,6 +36,8 @@ try:
 except ImportError:
     has_audit_logger = False
 
+from tools.net import http_client, rate_limiter
+
 # Try to import ntscraper
 try:
     from ntscraper import Nitter as NTNitter
@@ -69,10 +68,6 @@ def log_action_to_audit(project_path, action, url="", local_path="", status="ok"
 
 def read_tweet_html(url) -> dict:
     """Fallback scraping method parsing Nitter HTML directly using requests."""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    }
-    
     last_err = None
     for mirror in NITTER_MIRRORS:
         # Resolve target Nitter URL
@@ -82,7 +77,8 @@ def read_tweet_html(url) -> dict:
             
         try:
             print(f"[INVESTIGATOR] Requesting Nitter mirror: {nitter_url}")
-            res = requests.get(nitter_url, headers=headers, timeout=15)
+            rate_limiter.wait_for(nitter_url)
+            res = http_client.get(nitter_url, timeout=15)
             res.raise_for_status()
             
             soup = BeautifulSoup(res.text, 'html.parser')
@@ -158,6 +154,7 @@ def read_tweet_ntscraper(url) -> dict:
     print(f"[INVESTIGATOR] Scraping tweet ID {tweet_id} via ntscraper...")
     
     # ntscraper get_tweets with user mode and limit=1
+    rate_limiter.wait_for("nitter")
     tweets = nitter.get_tweets(username, mode='user', number=5)
     for tweet in tweets.get('tweets', []):
         # Find matching tweet ID
@@ -182,10 +179,6 @@ def read_tweet(url, project_path=None) -> dict:
     """Fetches a single tweet using ntscraper or HTML fallback."""
     if not project_path:
         project_path = "."
-        
-    delay = uniform(1, 2)
-    print(f"Waiting {delay:.2f} seconds before accessing social post...")
-    time.sleep(delay)
 
     scraped_data = None
     
@@ -217,15 +210,7 @@ def search_tweets(query, max_results=10, project_path=None) -> list[dict]:
     """Searches Nitter mirrors for tweets matching a query."""
     if not project_path:
         project_path = "."
-        
-    delay = uniform(1, 2)
-    print(f"Waiting {delay:.2f} seconds before searching tweets...")
-    time.sleep(delay)
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    }
-    
     encoded_query = urllib.parse.quote(query)
     results = []
     
@@ -233,7 +218,8 @@ def search_tweets(query, max_results=10, project_path=None) -> list[dict]:
         search_url = f"https://{mirror}/search?f=tweets&q={encoded_query}"
         try:
             print(f"[INVESTIGATOR] Searching Nitter mirror: https://{mirror}")
-            res = requests.get(search_url, headers=headers, timeout=15)
+            rate_limiter.wait_for(search_url)
+            res = http_client.get(search_url, timeout=15)
             res.raise_for_status()
             
             soup = BeautifulSoup(res.text, 'html.parser')
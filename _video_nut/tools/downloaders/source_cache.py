@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Source Media Cache for VideoNut
+
+Download-once, cut-many cache used by clip_grabber.py. The full source video is
+fetched once per (video id, format) into ~/.cache/videonut/sources (or
+$VIDEONUT_CACHE_DIR/sources), its keyframe timestamps are probed once and
+stored next to it, and every later clip from that source is cut locally with
+ffmpeg. The cache is bounded by a disk budget with least-recently-used
+eviction. Callers cut inside SourceCache.lease(), which drops a lease file in the
+entry; eviction (in any process) skips sources that hold a live lease.
+
+Cuts default to "smart" mode: only the partial GOPs at the start and end of the
+clip are re-encoded and the whole GOPs in between are stream-copied, which is
+frame-accurate at a fraction of the CPU cost of re-encoding the whole clip.
+"encode" mode re-encodes everything.
+
+Usage:
+    python source_cache.py --stats
+    python source_cache.py --clear
+    python source_cache.py --benchmark sample.mp4 --start 12.5 --end 95
+"""
+
+import sys
+import os
+import argparse
+import bisect
+import contextlib
+import hashlib
+import json
+import re
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+
+try:
+    import yt_dlp
+    has_ytdlp = True
+except ImportError:
+    has_ytdlp = False
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024 * 1024
+META_FILE = "meta.json"
+LEASES_DIR = "leases"
+LOCK_FILE = ".lock"
+LOCK_TIMEOUT = 30
+# Leases left behind by a crashed process stop pinning their source after this long
+LEASE_MAX_AGE_SECONDS = 6 * 3600
+# A clip start this close to a keyframe can be stream-copied without visible drift
+KEYFRAME_TOLERANCE = 0.05
+
+# Stream-copy seeks land on the keyframe at or before -ss, so seek just past the
+# keyframe to keep float rounding from selecting the previous GOP
+KEYFRAME_SEEK_EPSILON = 0.001
+
+CUT_MODES = ["smart", "encode"]
+# Source codecs smart cut can re-encode boundary GOPs for. Segments are joined as
+# MPEG-TS so each one carries its own parameter sets in-band.
+SMART_CUT_ENCODERS = {"h264": ("libx264", "h264_mp4toannexb"), "hevc": ("libx265", "hevc_mp4toannexb")}
+ENCODE_ARGS = ["-preset", "veryfast", "-crf", "18"]
+
+YOUTUBE_ID_PATTERN = re.compile(r'(?:v=|youtu\.be/|embed/|shorts/|live/)([A-Za-z0-9_-]{11})')
+
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+
+def source_cache_root():
+    return global_cache_root() / "sources"
+
+
+def source_key(url, format_selector):
+    """Cache key: YouTube video id (or a hash of the URL) plus a hash of the format selector."""
+    match = YOUTUBE_ID_PATTERN.search(url)
+    video_key = match.group(1) if match else "url_" + hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return f"{video_key}__{hashlib.sha1(format_selector.encode('utf-8')).hexdigest()[:10]}"
+
+
+def _lock_for(key):
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _lease_alive(lease_path):
+    """A lease pins its source until released, its process exits, or it goes stale."""
+    try:
+        age = time.time() - lease_path.stat().st_mtime
+    except OSError:
+        return False
+    if age > LEASE_MAX_AGE_SECONDS:
+        return False
+    # Signal 0 only probes for the process on POSIX; on Windows os.kill terminates it
+    if os.name == "posix":
+        try:
+            os.kill(int(lease_path.name.split("_", 1)[0]), 0)
+        except ProcessLookupError:
+            return False
+        except (ValueError, OSError):
+            pass
+    return True
+
+
+def find_ffprobe_executable(ffmpeg_path):
+    """ffprobe next to the resolved ffmpeg, or on PATH."""
+    if ffmpeg_path:
+        sibling = Path(ffmpeg_path).with_name(Path(ffmpeg_path).name.replace("ffmpeg", "ffprobe"))
+        if sibling.exists():
+            return str(sibling)
+    return shutil.which("ffprobe")
+
+
+def probe_keyframes(media_path, ffprobe_path):
+    """Returns the sorted presentation times (seconds) of the video keyframes."""
+    result = subprocess.run(
+        [ffprobe_path, "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+         "-show_entries", "frame=pts_time", "-of", "csv=p=0", str(media_path)],
+        capture_output=True, encoding='utf-8', errors='replace', check=True
+    )
+    times = []
+    for line in result.stdout.splitlines():
+        try:
+            times.append(float(line.strip().strip(',')))
+        except ValueError:
+            continue
+    return sorted(times)
+
+
+def probe_video_stream(media_path, ffprobe_path):
+    """Codec name, size and pixel format of the first video stream."""
+    result = subprocess.run(
+        [ffprobe_path, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=codec_name,width,height,pix_fmt", "-of", "json", str(media_path)],
+        capture_output=True, encoding='utf-8', errors='replace', check=True
+    )
+    streams = json.loads(result.stdout or "{}").get("streams") or [{}]
+    return streams[0]
+
+
+def local_source_entry(media_path, ffmpeg_path):
+    """Wraps a local media file (not stored in the cache) so it can be cut like a cached source."""
+    media_path = Path(media_path).resolve()
+    ffprobe = find_ffprobe_executable(ffmpeg_path)
+    if not ffprobe:
+        raise RuntimeError("ffprobe is required to index keyframes")
+    meta = {
+        "url": str(media_path),
+        "file": media_path.name,
+        "keyframes": probe_keyframes(media_path, ffprobe),
+        "video": probe_video_stream(media_path, ffprobe),
+    }
+    return SourceEntry(media_path.parent, meta)
+
+
+class SourceEntry:
+    """One cached source video: media file plus metadata (keyframes, url, format)."""
+    def __init__(self, entry_dir, meta):
+        self.entry_dir = Path(entry_dir)
+        self.meta = meta
+
+    @property
+    def media_path(self):
+        return self.entry_dir / self.meta["file"]
+
+    @property
+    def keyframes(self):
+        return self.meta.get("keyframes") or []
+
+    @property
+    def video_codec(self):
+        return (self.meta.get("video") or {}).get("codec_name")
+
+    def keyframe_at_or_before(self, seconds):
+        idx = bisect.bisect_right(self.keyframes, seconds + KEYFRAME_TOLERANCE) - 1
+        return self.keyframes[idx] if idx >= 0 else None
+
+    def keyframe_after(self, seconds):
+        idx = bisect.bisect_right(self.keyframes, seconds + KEYFRAME_TOLERANCE)
+        return self.keyframes[idx] if idx < len(self.keyframes) else None
+
+    def starts_on_keyframe(self, seconds):
+        keyframe = self.keyframe_at_or_before(seconds)
+        return keyframe is not None and abs(keyframe - seconds) <= KEYFRAME_TOLERANCE
+
+
+class SourceCache:
+    """Directory of <key>/{source.<ext>, meta.json} entries with an LRU disk budget."""
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else source_cache_root()
+        self.max_bytes = max_bytes
+
+    def _load(self, entry_dir):
+        try:
+            with open(entry_dir / META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        entry = SourceEntry(entry_dir, meta)
+        if not entry.media_path.is_file():
+            return None
+        # Bump mtime so eviction treats this entry as recently used
+        try:
+            os.utime(entry_dir / META_FILE, None)
+        except OSError:
+            pass
+        return entry
+
+    @contextlib.contextmanager
+    def _cache_lock(self):
+        """
+        Cross-process lock over the cache directory, held while an entry is pinned
+        and while evict() deletes, so a source cannot vanish between the two.
+        SQLite's write lock is released automatically if the holder dies.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.cache_dir / LOCK_FILE), timeout=LOCK_TIMEOUT, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            finally:
+                conn.execute("ROLLBACK")
+        finally:
+            conn.close()
+
+    def _new_lease(self, entry_dir):
+        leases = entry_dir / LEASES_DIR
+        leases.mkdir(exist_ok=True)
+        fd, lease_path = tempfile.mkstemp(prefix=f"{os.getpid()}_", dir=leases)
+        os.close(fd)
+        return Path(lease_path)
+
+    def _is_leased(self, entry_dir):
+        leased = False
+        leases = entry_dir / LEASES_DIR
+        if leases.is_dir():
+            for lease_path in leases.iterdir():
+                if _lease_alive(lease_path):
+                    leased = True
+                else:
+                    lease_path.unlink(missing_ok=True)
+        return leased
+
+    def _pin(self, key):
+        """Loads an entry and leases it in one step. Returns (entry, lease path), or (None, None) on a miss."""
+        with self._cache_lock():
+            entry = self._load(self.cache_dir / key)
+            if entry is None:
+                return None, None
+            return entry, self._new_lease(entry.entry_dir)
+
+    @contextlib.contextmanager
+    def lease(self, url, format_selector, ffmpeg_path=None, download=True):
+        """
+        Yields the SourceEntry for a video, pinned against eviction until the block
+        exits. On a miss the full source is downloaded, or None is yielded when
+        download is False. Concurrent callers for the same source wait for a
+        single download.
+        """
+        key = source_key(url, format_selector)
+        downloaded = False
+        with _lock_for(key):
+            entry, lease_path = self._pin(key)
+            if entry:
+                print(f"[CACHE] Using cached source for {url}")
+            elif download:
+                if not has_ytdlp:
+                    raise RuntimeError("yt-dlp is not installed")
+                entry, lease_path = self._download(url, format_selector, key, ffmpeg_path)
+                downloaded = True
+        try:
+            if downloaded:
+                self.evict()
+            yield entry
+        finally:
+            if lease_path:
+                lease_path.unlink(missing_ok=True)
+
+    def _download(self, url, format_selector, key, ffmpeg_path):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(prefix=f".{key}_", dir=self.cache_dir))
+        try:
+            # Leased from the start, so the lease moves with the directory when it is published
+            lease_name = self._new_lease(temp_dir).name
+            ydl_opts = {
+                'format': format_selector,
+                'merge_output_format': 'mp4',
+                'outtmpl': str(temp_dir / 'source.%(ext)s'),
+                'quiet': True,
+                'noprogress': True,
+                'no_warnings': True,
+            }
+            if ffmpeg_path:
+                ydl_opts['ffmpeg_location'] = ffmpeg_path
+            print(f"📥 Downloading full source once for local cutting: {url}")
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=True)
+
+            media = [p for p in temp_dir.iterdir() if p.name.startswith("source.") and p.stat().st_size > 0]
+            if not media:
+                raise IOError("yt-dlp did not produce a source file")
+
+            ffprobe = find_ffprobe_executable(ffmpeg_path)
+            keyframes = probe_keyframes(media[0], ffprobe) if ffprobe else []
+            video = probe_video_stream(media[0], ffprobe) if ffprobe else {}
+            meta = {
+                "url": url,
+                "video_id": (info or {}).get("id"),
+                "format": format_selector,
+                "file": media[0].name,
+                "size": media[0].stat().st_size,
+                "keyframes": keyframes,
+                "video": video,
+                "fetched_at": time.time(),
+            }
+            with open(temp_dir / META_FILE, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+            entry_dir = self.cache_dir / key
+            with self._cache_lock():
+                if entry_dir.exists():
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                temp_dir.replace(entry_dir)
+            return SourceEntry(entry_dir, meta), entry_dir / LEASES_DIR / lease_name
+        finally:
+            if temp_dir.exists():
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _entries(self):
+        if not self.cache_dir.is_dir():
+            return []
+        return [p for p in self.cache_dir.iterdir() if p.is_dir() and (p / META_FILE).is_file()]
+
+    def _entry_size(self, entry_dir):
+        return sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file())
+
+    def evict(self):
+        """Removes least-recently-used sources until the cache fits in max_bytes, skipping leased ones."""
+        if not self.cache_dir.is_dir():
+            return
+        with self._cache_lock():
+            entries = []
+            for entry_dir in self._entries():
+                try:
+                    entries.append(((entry_dir / META_FILE).stat().st_mtime, self._entry_size(entry_dir), entry_dir))
+                except OSError:
+                    continue
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry_dir in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                if self._is_leased(entry_dir):
+                    continue
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "entries": len(entries),
+            "bytes": sum(self._entry_size(e) for e in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """Deletes every source not currently leased. Returns the number of leased sources kept."""
+        if not self.cache_dir.is_dir():
+            return 0
+        kept = 0
+        with self._cache_lock():
+            for entry_dir in self._entries():
+                if self._is_leased(entry_dir):
+                    kept += 1
+                    continue
+                shutil.rmtree(entry_dir, ignore_errors=True)
+        return kept
+
+
+def _run_ffmpeg(ffmpeg_path, args):
+    subprocess.run([ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y", *args], check=True)
+
+
+def plan_smart_cut(entry, start, end):
+    """
+    Splits [start, end) into (kind, seg_start, seg_end) pieces: "encode" for the
+    partial GOP before the first keyframe and after the last one, "copy" for the
+    whole GOPs in between.
+
+    Returns:
+        list: Segments, or None if the clip holds no complete GOP to copy
+    """
+    first = entry.keyframe_at_or_before(start) if entry.starts_on_keyframe(start) else entry.keyframe_after(start)
+    last = entry.keyframe_at_or_before(end)
+    if first is None or last is None or last - first <= KEYFRAME_TOLERANCE:
+        return None
+
+    segments = []
+    if first - start > KEYFRAME_TOLERANCE:
+        segments.append(("encode", start, first))
+    segments.append(("copy", first, last))
+    if end - last > KEYFRAME_TOLERANCE:
+        segments.append(("encode", last, end))
+    return segments
+
+
+def _smart_cut(entry, segments, start, end, temp_output, ffmpeg_path):
+    encoder, annexb_filter = SMART_CUT_ENCODERS[entry.video_codec]
+    pix_fmt = (entry.meta.get("video") or {}).get("pix_fmt")
+    work_dir = Path(tempfile.mkdtemp(prefix=".smartcut_", dir=temp_output.parent))
+    try:
+        parts = []
+        for idx, (kind, seg_start, seg_end) in enumerate(segments):
+            part = work_dir / f"part_{idx}.ts"
+            seek = seg_start
+            if kind == "copy":
+                seek += KEYFRAME_SEEK_EPSILON
+                codec_args = ["-c:v", "copy", "-bsf:v", annexb_filter]
+            else:
+                codec_args = ["-c:v", encoder, *ENCODE_ARGS]
+                if pix_fmt:
+                    codec_args += ["-pix_fmt", pix_fmt]
+            _run_ffmpeg(ffmpeg_path, [
+                "-ss", f"{seek:.6f}", "-i", str(entry.media_path), "-t", f"{seg_end - seek:.6f}",
+                "-an", *codec_args, "-f", "mpegts", str(part)
+            ])
+            parts.append(part)
+
+        # Audio has no GOP constraint, so it is cut in one piece to avoid seams
+        audio = work_dir / "audio.m4a"
+        _run_ffmpeg(ffmpeg_path, [
+            "-ss", f"{start:.3f}", "-i", str(entry.media_path), "-t", f"{end - start:.3f}",
+            "-vn", "-c:a", "aac", str(audio)
+        ])
+
+        concat_list = work_dir / "parts.txt"
+        concat_list.write_text("".join(f"file '{p.name}'\n" for p in parts), encoding='utf-8')
+        _run_ffmpeg(ffmpeg_path, [
+            "-f", "concat", "-safe", "0", "-i", str(concat_list), "-i", str(audio),
+            "-map", "0:v", "-map", "1:a?", "-c", "copy", "-movflags", "+faststart", str(temp_output)
+        ])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def cut_from_source(entry, start, end, output_path, ffmpeg_path, mode="smart"):
+    """
+    Cuts [start, end) from a cached source into output_path.
+
+    smart: stream copy when the clip starts on a keyframe and ends near one;
+    otherwise re-encode only the boundary GOPs (H.264/HEVC sources) and copy the
+    rest. Falls back to a full re-encode when no complete GOP fits in the clip or
+    the codec is not supported. encode: always re-encode the whole clip.
+
+    Returns:
+        str: "copy", "smart" or "encode", the method used
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_output = output_path.with_suffix(".tmp.mp4")
+
+    segments = plan_smart_cut(entry, start, end) if mode == "smart" else None
+    if segments and all(kind == "copy" for kind, _, _ in segments):
+        method = "copy"
+    elif segments and entry.video_codec in SMART_CUT_ENCODERS:
+        method = "smart"
+    elif mode == "smart" and entry.starts_on_keyframe(start) and entry.video_codec not in SMART_CUT_ENCODERS:
+        # No boundary encoder for this codec; a keyframe-aligned start still copies cleanly
+        method = "copy"
+    else:
+        method = "encode"
+
+    if method == "smart":
+        _smart_cut(entry, segments, start, end, temp_output, ffmpeg_path)
+    else:
+        seek = start
+        if method == "copy":
+            seek = entry.keyframe_at_or_before(start) + KEYFRAME_SEEK_EPSILON
+            codec_args = ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+        else:
+            codec_args = ["-c:v", "libx264", *ENCODE_ARGS, "-c:a", "aac"]
+        _run_ffmpeg(ffmpeg_path, [
+            "-ss", f"{seek:.6f}", "-i", str(entry.media_path), "-t", f"{end - seek:.6f}",
+            *codec_args, "-movflags", "+faststart", str(temp_output)
+        ])
+
+    if not temp_output.exists() or temp_output.stat().st_size == 0:
+        raise IOError("ffmpeg produced an empty clip")
+    temp_output.replace(output_path)
+    return method
+
+
+def run_benchmark(media_path, start, end, ffmpeg_path, output_dir):
+    """Times full re-encode against smart cut on a local file and reports encode seconds per clip-minute."""
+    entry = local_source_entry(media_path, ffmpeg_path)
+    clip_minutes = (end - start) / 60
+    segments = plan_smart_cut(entry, start, end)
+    print(f"[BENCH] {media_path}: {entry.video_codec}, {len(entry.keyframes)} keyframes, "
+          f"clip {start:.2f}-{end:.2f}s")
+    if segments:
+        encoded = sum(seg_end - seg_start for kind, seg_start, seg_end in segments if kind == "encode")
+        print(f"        smart plan: {len(segments)} segments, {encoded:.2f}s of {end - start:.2f}s re-encoded")
+
+    print("\n📊 Cut Benchmark")
+    print("=" * 50)
+    for mode in CUT_MODES:
+        output = Path(output_dir) / f"bench_{mode}.mp4"
+        started = time.perf_counter()
+        method = cut_from_source(entry, start, end, output, ffmpeg_path, mode=mode)
+        elapsed = time.perf_counter() - started
+        print(f"{mode:7s} ({method:6s}): {elapsed:7.2f}s total, {elapsed / clip_minutes:7.2f}s per clip-minute, "
+              f"{output.stat().st_size / 1024 / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the VideoNut source media cache.")
+    parser.add_argument("--stats", action="store_true", help="Show cache size and entry count")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached source videos")
+    parser.add_argument("--max-gb", type=float, default=DEFAULT_MAX_BYTES / 1024 ** 3,
+                        help="Disk budget in GB used for eviction (default: 10)")
+    parser.add_argument("--benchmark", metavar="MEDIA", help="Compare encode vs smart cut on a local media file")
+    parser.add_argument("--start", type=float, default=10.0, help="Benchmark clip start in seconds")
+    parser.add_argument("--end", type=float, default=70.0, help="Benchmark clip end in seconds")
+    parser.add_argument("--ffmpeg", default=None, help="Path to ffmpeg executable")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        ffmpeg = args.ffmpeg or shutil.which("ffmpeg")
+        if not ffmpeg:
+            print("[FAIL] ffmpeg not found")
+            sys.exit(1)
+        with tempfile.TemporaryDirectory() as output_dir:
+            run_benchmark(args.benchmark, args.start, args.end, ffmpeg, output_dir)
+        return
+
+    cache = SourceCache(max_bytes=int(args.max_gb * 1024 ** 3))
+    if args.clear:
+        kept = cache.clear()
+        print(f"🧹 Cleared {cache.cache_dir}" + (f" ({kept} sources in use kept)" if kept else ""))
+        return
+    cache.evict()
+    st = cache.stats()
+    print(f"[CACHE] {st['cache_dir']}: {st['entries']} sources, "
+          f"{st['bytes'] / 1024 ** 3:.2f} / {st['max_bytes'] / 1024 ** 3:.0f} GB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Source Full-Text Index for VideoNut
+
+SQLite FTS5 index of every source document the readers ingest: PDF pages
+(pdf_reader.py), DOCX lines (doc_reader.py), YouTube transcripts in ~30 second
+windows (caption_reader.py) and web articles by paragraph (web_reader.py).
+Facts can then be looked up across all sources of a project at once, ranked by
+BM25, without re-downloading or re-extracting anything.
+
+Two layers are written: the project index (<project>/.cache/source_index.sqlite)
+and the global index (~/.cache/videonut/source_index.sqlite, or
+$VIDEONUT_CACHE_DIR/source_index.sqlite) shared by all projects. The global
+index is bounded: once its indexed text exceeds GLOBAL_INDEX_MAX_BYTES, the
+documents indexed least recently are dropped.
+
+Usage:
+    python source_index.py --project-dir "./Projects/my_project" --query "electoral bonds"
+    python source_index.py --project-dir "./Projects/my_project" --query "\"sold in tranches\"" --kind pdf
+    python source_index.py --global --query "RBI objection" --json
+    python source_index.py --project-dir "./Projects/my_project" --stats
+"""
+
+import sys
+import argparse
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+
+KINDS = ["pdf", "docx", "transcript", "web"]
+DB_TIMEOUT = 10.0
+DEFAULT_LIMIT = 10
+# Budget for the indexed text of the global layer; project indexes are not bounded
+GLOBAL_INDEX_MAX_BYTES = 500 * 1024 * 1024
+
+QUERY_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def global_index_path():
+    return global_cache_root() / "source_index.sqlite"
+
+
+def index_paths(project_dir=None, include_global=True):
+    """Index files to use, project layer first (only when a project is given)."""
+    paths = []
+    if project_dir:
+        paths.append(Path(project_dir) / ".cache" / "source_index.sqlite")
+    if include_global:
+        paths.append(global_index_path())
+    return paths
+
+
+def _connect(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=DB_TIMEOUT, isolation_level=None)
+    conn.executescript(
+        "CREATE TABLE IF NOT EXISTS documents ("
+        "  source TEXT PRIMARY KEY, kind TEXT, title TEXT, digest TEXT, indexed_at REAL);"
+        "CREATE TABLE IF NOT EXISTS chunk_meta ("
+        "  id INTEGER PRIMARY KEY, source TEXT, position INTEGER, locator TEXT, page INTEGER, start REAL,"
+        "  UNIQUE (source, position));"
+        "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(text, tokenize = 'porter unicode61');"
+    )
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+    if "size" not in columns:
+        # Indexes created before eviction existed: record each document's text size once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+            if "size" not in columns:
+                conn.execute("ALTER TABLE documents ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+                conn.execute(
+                    "UPDATE documents SET size = (SELECT COALESCE(SUM(length(c.text)), 0) "
+                    "FROM chunk_meta m JOIN chunks c ON c.rowid = m.id WHERE m.source = documents.source)"
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return conn
+
+
+def format_timestamp(seconds):
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def _remove_chunks(conn, source):
+    ids = [r[0] for r in conn.execute("SELECT id FROM chunk_meta WHERE source = ?", (source,))]
+    conn.executemany("DELETE FROM chunks WHERE rowid = ?", [(i,) for i in ids])
+    conn.execute("DELETE FROM chunk_meta WHERE source = ?", (source,))
+
+
+def _add_to_index(conn, source, kind, title, chunks, digest):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT digest, size FROM documents WHERE source = ?", (source,)).fetchone()
+        if row is None or digest is None or row[0] != digest:
+            # New or changed document: drop whatever was indexed for it before
+            _remove_chunks(conn, source)
+            known = set()
+            size = 0
+        else:
+            # Same document: only add chunks (e.g. PDF pages) not indexed yet
+            known = {r[0] for r in conn.execute("SELECT position FROM chunk_meta WHERE source = ?", (source,))}
+            size = row[1]
+
+        added = 0
+        for chunk in chunks:
+            if chunk["position"] in known or not chunk["text"].strip():
+                continue
+            cursor = conn.execute(
+                "INSERT INTO chunk_meta (source, position, locator, page, start) VALUES (?, ?, ?, ?, ?)",
+                (source, chunk["position"], chunk["locator"], chunk.get("page"), chunk.get("start"))
+            )
+            conn.execute("INSERT INTO chunks (rowid, text) VALUES (?, ?)", (cursor.lastrowid, chunk["text"]))
+            size += len(chunk["text"])
+            added += 1
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (source, kind, title, digest, indexed_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+            (source, kind, title, digest, time.time(), size)
+        )
+        conn.execute("COMMIT")
+        return added
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def evict(conn, max_bytes=GLOBAL_INDEX_MAX_BYTES, keep=None):
+    """
+    Drops the least recently indexed documents (re-reading a source refreshes it)
+    until the indexed text fits in max_bytes. Returns the number removed.
+    """
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for source, size in conn.execute("SELECT source, size FROM documents ORDER BY indexed_at").fetchall():
+            if total <= max_bytes:
+                break
+            if source == keep:
+                continue
+            _remove_chunks(conn, source)
+            conn.execute("DELETE FROM documents WHERE source = ?", (source,))
+            total -= size
+            removed += 1
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return removed
+
+
+def add_document(source, kind, chunks, title="", digest=None, project_dir=None):
+    """
+    Indexes a document in the project and global layers (the global one is kept
+    within GLOBAL_INDEX_MAX_BYTES). Failures are reported but never interrupt the
+    reader that called this.
+
+    Args:
+        source: URL or path identifying the document
+        kind: One of KINDS
+        chunks: [{"position": int, "text": str, "locator": str, "page": int|None, "start": float|None}]
+        digest: Content digest; when unchanged, only chunks with new positions are added
+    """
+    global_path = global_index_path()
+    for path in index_paths(project_dir):
+        try:
+            conn = _connect(path)
+            try:
+                _add_to_index(conn, source, kind, title, chunks, digest)
+                if path == global_path:
+                    evict(conn, keep=source)
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Could not update source index {path}: {e}", file=sys.stderr)
+
+
+def pdf_page_chunks(pages):
+    """Chunks for {page_index: text}."""
+    return [
+        {"position": idx, "text": text, "locator": f"page {idx + 1}", "page": idx + 1}
+        for idx, text in sorted(pages.items())
+    ]
+
+
+def line_chunks(text, label="line"):
+    """One chunk per non-empty line (DOCX paragraphs, article paragraphs)."""
+    return [
+        {"position": idx, "text": line, "locator": f"{label} {idx + 1}"}
+        for idx, line in enumerate(text.split("\n")) if line.strip()
+    ]
+
+
+def transcript_chunks(entries, window_seconds=30):
+    """Transcript entries grouped into windows of about window_seconds, located by start time."""
+    chunks = []
+    current = []
+    for entry in entries:
+        if current and entry.start - current[0].start >= window_seconds:
+            chunks.append(current)
+            current = []
+        current.append(entry)
+    if current:
+        chunks.append(current)
+    return [
+        {
+            "position": idx,
+            "text": " ".join(e.text for e in group),
+            "locator": format_timestamp(group[0].start),
+            "start": float(group[0].start),
+        }
+        for idx, group in enumerate(chunks)
+    ]
+
+
+def build_match_expression(query, any_term=False):
+    """
+    Turns free text into an FTS5 expression. A query wrapped in double quotes is
+    a phrase; otherwise every word must appear (or any word, with any_term).
+    """
+    query = query.strip()
+    if len(query) > 1 and query.startswith('"') and query.endswith('"'):
+        words = QUERY_TOKEN.findall(query[1:-1])
+        return '"' + " ".join(words) + '"' if words else None
+    words = QUERY_TOKEN.findall(query)
+    if not words:
+        return None
+    return (" OR " if any_term else " ").join(f'"{w}"' for w in words)
+
+
+def _search_index(path, expression, kind, limit):
+    conn = sqlite3.connect(str(path), timeout=DB_TIMEOUT)
+    try:
+        sql = (
+            "SELECT m.source, d.kind, d.title, m.locator, m.page, m.start, "
+            "snippet(chunks, 0, '[', ']', '…', 16), bm25(chunks) "
+            "FROM chunks JOIN chunk_meta m ON m.id = chunks.rowid JOIN documents d ON d.source = m.source "
+            "WHERE chunks MATCH ?"
+        )
+        params = [expression]
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY bm25(chunks) LIMIT ?"
+        params.append(limit)
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def search(query, project_dir=None, include_global=False, kind=None, limit=DEFAULT_LIMIT):
+    """
+    Ranked hits for a query across the selected index layers.
+
+    Returns:
+        list: [{"source", "kind", "title", "locator", "page", "start", "snippet", "score"}]
+    """
+    paths = [p for p in index_paths(project_dir, include_global or not project_dir) if p.exists()]
+    hits = []
+    # All words first; if nothing matches, fall back to any word (phrases have no fallback)
+    expressions = [build_match_expression(query), build_match_expression(query, any_term=True)]
+    for expression in dict.fromkeys(e for e in expressions if e):
+        seen = set()
+        for path in paths:
+            try:
+                rows = _search_index(path, expression, kind, limit)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not search {path}: {e}", file=sys.stderr)
+                continue
+            for source, doc_kind, title, locator, page, start, snippet, score in rows:
+                if (source, locator) in seen:
+                    continue
+                seen.add((source, locator))
+                hits.append({
+                    "source": source,
+                    "kind": doc_kind,
+                    "title": title,
+                    "locator": locator,
+                    "page": page,
+                    "start": start,
+                    "snippet": snippet,
+                    # bm25() is lower-is-better; report higher-is-better
+                    "score": round(-score, 3),
+                })
+        if hits:
+            break
+    hits.sort(key=lambda h: h["score"], reverse=True)
+    return hits[:limit]
+
+
+def stats(project_dir=None, include_global=True):
+    results = []
+    for path in index_paths(project_dir, include_global):
+        if not path.exists():
+            continue
+        conn = sqlite3.connect(str(path), timeout=DB_TIMEOUT)
+        try:
+            kinds = dict(conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall())
+            chunk_count = conn.execute("SELECT COUNT(*) FROM chunk_meta").fetchone()[0]
+        finally:
+            conn.close()
+        results.append({"index": str(path), "documents": kinds, "chunks": chunk_count,
+                        "bytes": path.stat().st_size})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search every source document VideoNut readers have ingested.")
+    parser.add_argument("--query", "-q", help="Words to find (wrap in double quotes for an exact phrase)")
+    parser.add_argument("--project-dir", help="Project directory (searches its index)")
+    parser.add_argument("--global", dest="include_global", action="store_true",
+                        help="Also search the cross-project index (default when no project is given)")
+    parser.add_argument("--kind", choices=KINDS, help="Only return hits from one kind of source")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"Max hits (default: {DEFAULT_LIMIT})")
+    parser.add_argument("--json", action="store_true", help="Print hits as JSON")
+    parser.add_argument("--stats", action="store_true", help="Show index sizes")
+    args = parser.parse_args()
+
+    if args.stats:
+        for st in stats(args.project_dir, args.include_global or not args.project_dir):
+            kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(st["documents"].items())) or "empty"
+            print(f"[INDEX] {st['index']}: {kinds}; {st['chunks']} chunks, {st['bytes'] / 1024 / 1024:.1f} MB")
+        return
+
+    if not args.query:
+        parser.error("--query is required unless --stats is given")
+
+    started = time.monotonic()
+    hits = search(args.query, args.project_dir, args.include_global, args.kind, args.limit)
+    elapsed = time.monotonic() - started
+
+    if args.json:
+        print(json.dumps(hits, indent=2, ensure_ascii=False))
+        return
+
+    if not hits:
+        print(f"[FAIL] No indexed source mentions '{args.query}'")
+        sys.exit(1)
+
+    print(f"\n[SCAN] {len(hits)} hits for '{args.query}' ({elapsed * 1000:.0f} ms):\n")
+    for rank, hit in enumerate(hits, 1):
+        print(f"{'='*60}")
+        print(f"[{rank}] {hit['kind']} | {hit['locator']} | score {hit['score']}")
+        print(f"    {hit['title'] or hit['source']}")
+        if hit['title']:
+            print(f"    {hit['source']}")
+        print(f"{'='*60}")
+        print(hit['snippet'])
+        print()
+
+
+if __name__ == "__main__":
+    main()
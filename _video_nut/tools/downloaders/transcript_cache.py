@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Transcript Cache for VideoNut
+
+On-disk cache of YouTube transcripts used by caption_reader.py, so repeated
+--search / --find-quote lookups on the same video skip the YouTube API and the
+local Whisper fallback. Entries are keyed by video id + language + source
+("youtube-transcript-api" or "local-whisper-fallback"), expire after a TTL, and
+each cache directory is bounded in size with least-recently-used eviction.
+
+Two layers are consulted in order: the project cache (<project>/.cache/transcripts)
+and the global cache (~/.cache/videonut/transcripts, or $VIDEONUT_CACHE_DIR/transcripts).
+
+Usage:
+    python transcript_cache.py --stats
+    python transcript_cache.py --clear --project-dir "./Projects/my_project"
+"""
+
+import sys
+import os
+import argparse
+import json
+import re
+import secrets
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+PROJECT_CACHE_MAX_BYTES = 100 * 1024 * 1024
+GLOBAL_CACHE_MAX_BYTES = 500 * 1024 * 1024
+# Eviction walks the whole cache directory, so each process runs it at most this often per directory
+EVICT_INTERVAL_SECONDS = 300
+
+API_SOURCE = "youtube-transcript-api"
+# Local transcription does not depend on caption languages
+WHISPER_SOURCE = "local-whisper-fallback"
+
+
+# Cache directory -> time of this process's last eviction pass
+_last_evicted = {}
+
+
+def _safe_name(value):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(value)) or "_"
+
+
+class CachedEntry:
+    """Transcript line restored from the cache (same shape as caption_reader.TranscriptEntry)."""
+    __slots__ = ("text", "start", "duration")
+
+    def __init__(self, text, start, duration):
+        self.text = text
+        self.start = start
+        self.duration = duration
+
+
+class TranscriptCache:
+    """One cache directory holding <video_id>/<source>__<language>.json files."""
+    def __init__(self, cache_dir, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=GLOBAL_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, video_id, language, source):
+        return self.cache_dir / _safe_name(video_id) / f"{_safe_name(source)}__{_safe_name(language)}.json"
+
+    def _load(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get("fetched_at", 0) > self.ttl_seconds:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        # Bump mtime so eviction treats this entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def get(self, video_id, languages=None):
+        """
+        Looks up a transcript, preferring API captions in the requested language
+        order, then any local Whisper transcription of the video.
+
+        Returns:
+            tuple: (entries, source, language) or None on a miss
+        """
+        video_dir = self.cache_dir / _safe_name(video_id)
+        if not video_dir.is_dir():
+            return None
+
+        candidates = []
+        for lang in languages or []:
+            candidates.extend(video_dir.glob(f"{API_SOURCE}__{_safe_name(lang)}.json"))
+        if not languages:
+            candidates.extend(video_dir.glob(f"{API_SOURCE}__*.json"))
+        candidates.extend(video_dir.glob(f"{WHISPER_SOURCE}__*.json"))
+
+        for path in candidates:
+            data = self._load(path)
+            if data:
+                entries = [CachedEntry(text, start, duration) for text, start, duration in data["entries"]]
+                return entries, data["source"], data["language"]
+        return None
+
+    def put(self, video_id, language, source, entries):
+        """Stores a transcript atomically, evicting old entries at most every EVICT_INTERVAL_SECONDS."""
+        path = self._entry_path(video_id, language, source)
+        data = {
+            "video_id": video_id,
+            "language": language,
+            "source": source,
+            "fetched_at": time.time(),
+            "entries": [
+                [entry.text, float(entry.start), float(getattr(entry, 'duration', 0) or 0)]
+                for entry in entries
+            ],
+        }
+        # Unique per writer: threads and processes may store the same video concurrently
+        temp_path = path.with_suffix(f".{os.getpid()}.{secrets.token_hex(4)}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            temp_path.replace(path)
+        except OSError as e:
+            print(f"⚠️ Could not write transcript cache {path}: {e}", file=sys.stderr)
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        now = time.monotonic()
+        last = _last_evicted.get(self.cache_dir)
+        if last is None or now - last >= EVICT_INTERVAL_SECONDS:
+            _last_evicted[self.cache_dir] = now
+            self.evict()
+
+    def _files(self):
+        if not self.cache_dir.is_dir():
+            return []
+        return [p for p in self.cache_dir.glob("*/*.json") if p.is_file()]
+
+    def evict(self):
+        """Removes least-recently-used entries until the cache fits in max_bytes."""
+        files = []
+        for path in self._files():
+            try:
+                st = path.stat()
+                files.append((st.st_mtime, st.st_size, path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                if not any(path.parent.iterdir()):
+                    path.parent.rmdir()
+            except OSError:
+                continue
+
+    def stats(self):
+        files = self._files()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "entries": len(files),
+            "bytes": sum(p.stat().st_size for p in files),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        for path in self._files():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def cache_layers(project_dir=None):
+    """Returns the caches to consult, project layer first (only when a project is given)."""
+    layers = []
+    if project_dir:
+        layers.append(TranscriptCache(Path(project_dir) / ".cache" / "transcripts", max_bytes=PROJECT_CACHE_MAX_BYTES))
+    layers.append(TranscriptCache(global_cache_root() / "transcripts", max_bytes=GLOBAL_CACHE_MAX_BYTES))
+    return layers
+
+
+def lookup(video_id, languages=None, project_dir=None):
+    """
+    Checks every cache layer for a transcript. A global hit is copied into the
+    project layer so the project keeps its own record of the sources it used.
+
+    Returns:
+        tuple: (entries, source, language) or None on a miss
+    """
+    layers = cache_layers(project_dir)
+    for idx, cache in enumerate(layers):
+        hit = cache.get(video_id, languages)
+        if hit:
+            entries, source, language = hit
+            for upper in layers[:idx]:
+                upper.put(video_id, language, source, entries)
+            return hit
+    return None
+
+
+def store(video_id, language, source, entries, project_dir=None):
+    """Writes a freshly fetched transcript to every cache layer."""
+    for cache in cache_layers(project_dir):
+        cache.put(video_id, language, source, entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the VideoNut transcript cache.")
+    parser.add_argument("--project-dir", help="Project directory (adds the project cache layer)")
+    parser.add_argument("--stats", action="store_true", help="Show cache size and entry counts")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached transcripts")
+    args = parser.parse_args()
+
+    for cache in cache_layers(args.project_dir):
+        if args.clear:
+            cache.clear()
+            print(f"🧹 Cleared {cache.cache_dir}")
+        else:
+            st = cache.stats()
+            print(f"[CACHE] {st['cache_dir']}: {st['entries']} transcripts, "
+                  f"{st['bytes'] / 1024 / 1024:.1f} / {st['max_bytes'] / 1024 / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Transcript Token Index for VideoNut
+
+Inverted index over a video's transcript used by caption_reader.py to locate
+quotes. The transcript is tokenized once (lowercased words, punctuation
+dropped) into one token stream covering every caption entry, so quotes that
+span two entries are found, and each token position maps back to its entry.
+Lookups intersect posting lists instead of lowercasing every entry per quote,
+and can tolerate a bounded number of word-level edits (misheard or
+auto-caption words).
+
+Usage:
+    from tools.downloaders.transcript_index import TranscriptIndex
+    index = TranscriptIndex(entries)
+    match = index.find("we will not back down", max_edits=1)
+    matches = index.find_many(["quote one", "quote two"])
+"""
+
+import bisect
+import re
+import threading
+from collections import defaultdict, OrderedDict
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)?", re.UNICODE)
+
+# Indexes kept in memory per video id, so repeated lookups in one process reuse them
+MAX_CACHED_INDEXES = 32
+
+
+def tokenize(text):
+    """Lowercased word tokens of a string (apostrophes kept inside words)."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class QuoteMatch:
+    """A quote located in the transcript, spanning entries first_entry..last_entry."""
+    def __init__(self, quote, first_entry, last_entry, edits):
+        self.quote = quote
+        self.first_entry = first_entry
+        self.last_entry = last_entry
+        self.edits = edits
+
+    @property
+    def exact(self):
+        return self.edits == 0
+
+
+class TranscriptIndex:
+    """Token stream plus postings (token -> positions) over a list of transcript entries."""
+    def __init__(self, entries):
+        self.entries = entries
+        self.tokens = []
+        # token position -> index of the entry it came from
+        self.token_entry = []
+        self.postings = defaultdict(list)
+
+        for entry_idx, entry in enumerate(entries):
+            for token in tokenize(entry.text):
+                self.postings[token].append(len(self.tokens))
+                self.tokens.append(token)
+                self.token_entry.append(entry_idx)
+
+        # Built on first use by _find_substring
+        self._joined = None
+        self._token_starts = None
+
+    def _match(self, quote, start, end, edits):
+        return QuoteMatch(quote, self.token_entry[start], self.token_entry[end - 1], edits)
+
+    def find_exact(self, quote):
+        """
+        Returns the first exact occurrence of a quote, or None. Whole-word matches
+        come from the postings; otherwise partial words at either end of the quote
+        ("electoral bond" in "electoral bonds") are found by a substring scan.
+        """
+        words = tokenize(quote)
+        if not words:
+            return None
+        # Anchor on the rarest word and verify the rest of the phrase around it
+        anchor = min(range(len(words)), key=lambda i: len(self.postings.get(words[i], ())))
+        n = len(words)
+        for pos in self.postings.get(words[anchor], ()):
+            start = pos - anchor
+            if start >= 0 and self.tokens[start:start + n] == words:
+                return self._match(quote, start, start + n, 0)
+        return self._find_substring(quote, words)
+
+    def _find_substring(self, quote, words):
+        if self._joined is None:
+            # Built into locals first: cached indexes can be shared between threads
+            starts = []
+            offset = 0
+            for token in self.tokens:
+                starts.append(offset)
+                offset += len(token) + 1
+            self._token_starts = starts
+            self._joined = " ".join(self.tokens)
+        at = self._joined.find(" ".join(words))
+        if at < 0:
+            return None
+        start = bisect.bisect_right(self._token_starts, at) - 1
+        end = bisect.bisect_right(self._token_starts, at + len(" ".join(words)) - 1)
+        return self._match(quote, start, end, 0)
+
+    def find_fuzzy(self, quote, max_edits):
+        """
+        Returns the closest occurrence within max_edits word insertions, deletions or
+        substitutions, or None. Candidate start positions come from the postings of
+        the quote's words; each is verified with a banded edit-distance alignment.
+        """
+        words = tokenize(quote)
+        n = len(words)
+        if not words or max_edits >= n:
+            return None
+
+        # Vote for start positions implied by each word's postings
+        votes = defaultdict(int)
+        for word in set(words):
+            for offset in (j for j, w in enumerate(words) if w == word):
+                for pos in self.postings.get(word, ()):
+                    votes[pos - offset] += 1
+        min_votes = n - max_edits
+
+        best = None
+        checked = set()
+        for candidate in sorted(votes):
+            # Insertions/deletions shift alignment, so pool votes over nearby starts
+            pooled = sum(votes.get(candidate + d, 0) for d in range(-max_edits, max_edits + 1))
+            if pooled < min_votes:
+                continue
+            lo = max(0, candidate - max_edits)
+            if lo in checked:
+                continue
+            checked.add(lo)
+            hi = min(len(self.tokens), candidate + n + max_edits)
+            result = self._align(words, lo, hi, max_edits)
+            if result and (best is None or result[2] < best[2]):
+                best = result
+                if best[2] == 0:
+                    break
+
+        if best is None:
+            return None
+        start, end, edits = best
+        return self._match(quote, start, end, edits)
+
+    def _align(self, words, lo, hi, max_edits):
+        """
+        Semi-global alignment of the quote against tokens[lo:hi]: the quote must be
+        matched in full, the window may be entered and left anywhere.
+
+        Returns:
+            tuple: (start, end, edits) of the best span, or None if over max_edits
+        """
+        window = self.tokens[lo:hi]
+        # prev[j] = (edits, span start) aligning words[:i] to a span ending at window[j]
+        prev = [(0, j) for j in range(len(window) + 1)]
+        for i, word in enumerate(words, 1):
+            cur = [(i, 0)]
+            for j in range(1, len(window) + 1):
+                sub_cost, sub_start = prev[j - 1]
+                options = [
+                    (sub_cost + (window[j - 1] != word), sub_start),
+                    (prev[j][0] + 1, prev[j][1]),       # quote word missing in transcript
+                    (cur[j - 1][0] + 1, cur[j - 1][1]),  # extra word in transcript
+                ]
+                cur.append(min(options))
+            prev = cur
+
+        edits, end = min((cost, j) for j, (cost, _) in enumerate(prev) if j > 0)
+        if edits > max_edits:
+            return None
+        start = prev[end][1]
+        if start >= end:
+            return None
+        return lo + start, lo + end, edits
+
+    def find(self, quote, max_edits=0):
+        """Exact lookup first, then fuzzy if max_edits allows it."""
+        match = self.find_exact(quote)
+        if match is None and max_edits > 0:
+            match = self.find_fuzzy(quote, max_edits)
+        return match
+
+    def find_many(self, quotes, max_edits=0):
+        """Looks up a batch of quotes against the same index. Returns {quote: QuoteMatch or None}."""
+        return {quote: self.find(quote, max_edits) for quote in quotes}
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_index(video_id, entries):
+    """Returns the index for a video, building it once per process per transcript."""
+    # Transcripts reloaded from the cache are new objects, so compare a cheap fingerprint
+    fingerprint = (len(entries), entries[-1].start if entries else None, entries[-1].text if entries else None)
+    with _index_lock:
+        cached = _index_cache.get(video_id)
+        if cached is not None and cached[0] == fingerprint:
+            _index_cache.move_to_end(video_id)
+            return cached[1]
+
+    index = TranscriptIndex(entries)
+    with _index_lock:
+        _index_cache[video_id] = (fingerprint, index)
+        _index_cache.move_to_end(video_id)
+        while len(_index_cache) > MAX_CACHED_INDEXES:
+            _index_cache.popitem(last=False)
+    return index
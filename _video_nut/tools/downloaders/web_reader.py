@@ -13,8 +13,7 @@ Usage:
 
 import sys
 import argparse
-import time
-from random import uniform
+import hashlib
 from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
@@ -33,6 +32,15 @@ try:
 except ImportError:
     has_audit_logger = False
 
+try:
+    from tools.downloaders import source_index
+    has_source_index = True
+except ImportError:
+    has_source_index = False
+
+from tools.net import http_cache, rate_limiter
+from tools.downloaders import browser_service
+
 # Try to import trafilatura
 try:
     import trafilatura
@@ -59,11 +67,6 @@ def read_webpage(url, project_path=None):
     if not project_path:
         project_path = "."
         
-    # Add random delay to implement rate limiting
-    delay = uniform(1, 2)
-    print(f"Rate limiting: Waiting {delay:.2f} seconds before accessing {url}")
-    time.sleep(delay)
-
     clean_text = None
     engine_used = ""
     error_msg = ""
@@ -72,7 +75,15 @@ def read_webpage(url, project_path=None):
     if has_trafilatura:
         try:
             print("[CRAWL] Crawling webpage with Trafilatura...")
-            downloaded = trafilatura.fetch_url(url)
+            # Fetch through the shared HTTP cache; trafilatura only extracts
+            try:
+                response = http_cache.get(url, timeout=30)
+                response.raise_for_status()
+                # Raw bytes: trafilatura detects the charset, including one declared only in <meta>
+                downloaded = response.content
+            except Exception as fetch_err:
+                print(f"⚠️ Fetch error: {fetch_err}")
+                downloaded = None
             if downloaded:
                 # Extract text with metadata and basic formatting preserved
                 clean_text = trafilatura.extract(downloaded, include_links=True, include_images=False)
@@ -93,11 +104,12 @@ def read_webpage(url, project_path=None):
     if not clean_text:
         try:
             print("[BROWSER] Launching Playwright headless browser fallback...")
+            rate_limiter.wait_for(url)
             from playwright.sync_api import sync_playwright
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch()
-                page = browser.new_page()
+            # Uses the warm shared browser when browser_service.py is running
+            with sync_playwright() as p, browser_service.browser_context(p) as context:
+                page = context.new_page()
                 
                 # Set realistic user agent headers
                 page.set_extra_http_headers({
@@ -115,7 +127,6 @@ def read_webpage(url, project_path=None):
                 # Extract innerText to get text as seen by a browser user
                 text = page.evaluate("document.body.innerText")
                 clean_text = '\n'.join([line.strip() for line in text.splitlines() if line.strip()])
-                browser.close()
                 
                 if clean_text:
                     engine_used = "playwright-fallback"
@@ -134,6 +145,13 @@ def read_webpage(url, project_path=None):
             )
             sys.exit(1)
 
+    # Feed the project's full-text index (replaced if the article changed)
+    if has_source_index:
+        source_index.add_document(
+            url, "web", source_index.line_chunks(clean_text, label="paragraph"),
+            digest=hashlib.sha256(clean_text.encode('utf-8')).hexdigest(), project_dir=project_path
+        )
+
     # 3. Output text with smart truncation if needed
     MAX_TOTAL = 40000
     INTRO_SIZE = 8000
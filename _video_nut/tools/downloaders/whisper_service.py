@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Local Whisper Transcription Service for VideoNut
+
+Keeps a Whisper model resident in memory and transcribes queued audio files for
+caption_reader.py, so repeated local transcriptions no longer pay the model load
+on every call. The service listens on 127.0.0.1 (a TCP socket rather than a unix
+socket so it also works on Windows) and advertises its port in
+~/.cache/videonut/whisper_service.json. caption_reader uses it automatically
+whenever it is running and falls back to loading a model in-process otherwise.
+The state file is readable by its owner only and holds a random token that every
+request must carry, so other local users cannot drive the service.
+
+Protocol: one JSON request line per connection, one JSON response line back.
+    {"cmd": "transcribe", "token": "...", "audio_path": "/abs/path.mp3", "beam_size": 5}
+    -> {"ok": true, "engine": "faster-whisper", "entries": [[text, start, duration], ...]}
+
+Usage:
+    python whisper_service.py --serve --model tiny --threads 4 --workers 2
+    python whisper_service.py --status
+    python whisper_service.py --stop
+"""
+
+import sys
+import os
+import argparse
+import hmac
+import json
+import secrets
+import shutil
+import socket
+import socketserver
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+
+# Seconds to wait for a connection; transcription itself may take much longer
+CONNECT_TIMEOUT = 2.0
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Read timeout for a transcription: a fixed allowance for queueing behind other
+# requests plus a multiple of the audio length, so a wedged service fails the
+# request instead of hanging the caller
+TRANSCRIBE_BASE_TIMEOUT = 120.0
+TRANSCRIBE_TIMEOUT_PER_AUDIO_SECOND = 3.0
+# Lowest bitrate assumed when the duration must be estimated from the file size
+MIN_AUDIO_BYTES_PER_SECOND = 32000 // 8
+
+
+def state_file_path():
+    return global_cache_root() / "whisper_service.json"
+
+
+def _write_state(state_path, state):
+    """Writes the state file with owner-only permissions, since it holds the auth token."""
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = state_path.with_suffix(".tmp")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(temp_path, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_path, state_path)
+
+
+def audio_duration(audio_path):
+    """Audio length in seconds from ffprobe, or a generous estimate from the file size."""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        try:
+            result = subprocess.run(
+                [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", audio_path],
+                capture_output=True, encoding='utf-8', errors='replace', timeout=30
+            )
+            return float(result.stdout.strip())
+        except (OSError, ValueError, subprocess.SubprocessError):
+            pass
+    try:
+        return os.path.getsize(audio_path) / MIN_AUDIO_BYTES_PER_SECOND
+    except OSError:
+        return 0.0
+
+
+def transcribe_timeout(duration):
+    return TRANSCRIBE_BASE_TIMEOUT + duration * TRANSCRIBE_TIMEOUT_PER_AUDIO_SECOND
+
+
+class WhisperEngine:
+    """Loads a Whisper model once and bounds how many transcriptions run at a time."""
+    def __init__(self, model_size="tiny", cpu_threads=0, workers=1):
+        self.model_size = model_size
+        self.workers = max(1, workers)
+        self.engine = None
+        self.model = None
+
+        try:
+            from faster_whisper import WhisperModel
+            print(f"🎙️ Loading faster-whisper '{model_size}' model (threads={cpu_threads or 'auto'}, workers={self.workers})...")
+            self.model = WhisperModel(
+                model_size, device="cpu", compute_type="int8",
+                cpu_threads=cpu_threads, num_workers=self.workers
+            )
+            self.engine = "faster-whisper"
+        except Exception as e:
+            print(f"⚠️ faster-whisper unavailable: {e}. Trying OpenAI whisper...")
+            import whisper
+            if cpu_threads:
+                try:
+                    import torch
+                    torch.set_num_threads(cpu_threads)
+                except ImportError:
+                    pass
+            self.model = whisper.load_model(model_size)
+            self.engine = "whisper"
+            # OpenAI whisper models are not safe to share across threads
+            self.workers = 1
+
+        self._slots = threading.BoundedSemaphore(self.workers)
+
+    def transcribe(self, audio_path, beam_size=5):
+        """Returns [[text, start, duration], ...] for an audio file."""
+        with self._slots:
+            if self.engine == "faster-whisper":
+                segments, _ = self.model.transcribe(audio_path, beam_size=beam_size)
+                return [[seg.text, seg.start, seg.end - seg.start] for seg in segments]
+            result = self.model.transcribe(audio_path)
+            return [
+                [seg['text'], seg['start'], seg['end'] - seg['start']]
+                for seg in result.get('segments', [])
+            ]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline(MAX_REQUEST_BYTES).decode('utf-8'))
+        except ValueError as e:
+            self._reply({"ok": False, "error": f"Bad request: {e}"})
+            return
+
+        if not hmac.compare_digest(str(request.get("token", "")), self.server.token):
+            self._reply({"ok": False, "error": "Invalid token"})
+            return
+
+        cmd = request.get("cmd", "transcribe")
+        engine = self.server.engine
+        if cmd == "ping":
+            self._reply({"ok": True, "engine": engine.engine, "model": engine.model_size, "workers": engine.workers})
+        elif cmd == "shutdown":
+            self._reply({"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif cmd == "transcribe":
+            audio_path = request.get("audio_path", "")
+            if not os.path.isfile(audio_path):
+                self._reply({"ok": False, "error": f"Audio file not found: {audio_path}"})
+                return
+            started = time.time()
+            try:
+                entries = engine.transcribe(audio_path, beam_size=request.get("beam_size", 5))
+            except Exception as e:
+                self._reply({"ok": False, "error": str(e)})
+                return
+            print(f"[OK] Transcribed {os.path.basename(audio_path)} in {time.time() - started:.1f}s ({len(entries)} segments)")
+            self._reply({"ok": True, "engine": engine.engine, "entries": entries})
+        else:
+            self._reply({"ok": False, "error": f"Unknown command: {cmd}"})
+
+    def _reply(self, payload):
+        self.wfile.write((json.dumps(payload, ensure_ascii=False) + "\n").encode('utf-8'))
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(model_size="tiny", cpu_threads=0, workers=1, port=0):
+    """Loads the model and serves transcription requests until stopped."""
+    engine = WhisperEngine(model_size, cpu_threads, workers)
+    server = _ThreadingServer(("127.0.0.1", port), _RequestHandler)
+    server.engine = engine
+    server.token = secrets.token_hex(16)
+    bound_port = server.server_address[1]
+
+    state_path = state_file_path()
+    _write_state(state_path, {"pid": os.getpid(), "port": bound_port, "token": server.token,
+                              "model": model_size, "engine": engine.engine})
+
+    print(f"[RUN] Whisper service ready on 127.0.0.1:{bound_port} ({engine.engine}, model '{model_size}', {engine.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                if json.load(f).get("pid") == os.getpid():
+                    state_path.unlink()
+        except (OSError, ValueError):
+            pass
+        print("[STOP] Whisper service stopped.")
+
+
+def _request(payload, timeout=CONNECT_TIMEOUT):
+    """
+    Sends one request to the running service. Returns the response dict, or None
+    if no service is reachable.
+
+    Raises:
+        TimeoutError: If the service accepted the request but did not answer within timeout
+    """
+    try:
+        with open(state_file_path(), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        port, token = state["port"], state["token"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=CONNECT_TIMEOUT)
+    except OSError:
+        return None
+    try:
+        with sock:
+            sock.settimeout(timeout)
+            sock.sendall((json.dumps(dict(payload, token=token)) + "\n").encode('utf-8'))
+            with sock.makefile('rb') as stream:
+                line = stream.readline()
+    except socket.timeout:
+        raise TimeoutError(f"Whisper service did not answer within {timeout:.0f}s")
+    except OSError:
+        return None
+    if not line:
+        return None
+    return json.loads(line.decode('utf-8'))
+
+
+def is_running():
+    try:
+        response = _request({"cmd": "ping"})
+    except TimeoutError:
+        return False
+    return bool(response and response.get("ok"))
+
+
+def transcribe_via_service(audio_path, beam_size=5, duration=None, timeout=None):
+    """
+    Transcribes an audio file with the running service. The read timeout defaults
+    to one scaled by the audio duration (probed when not given).
+
+    Returns:
+        list: [[text, start, duration], ...] or None if the service is not running
+    Raises:
+        RuntimeError: If the service is running but the transcription failed
+        TimeoutError: If the service did not answer in time
+    """
+    if timeout is None:
+        timeout = transcribe_timeout(audio_duration(audio_path) if duration is None else duration)
+    response = _request(
+        {"cmd": "transcribe", "audio_path": os.path.abspath(audio_path), "beam_size": beam_size},
+        timeout=timeout
+    )
+    if response is None:
+        return None
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "Unknown whisper service error"))
+    return response["entries"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived local Whisper transcription service.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--serve", action="store_true", help="Load the model and start serving")
+    group.add_argument("--status", action="store_true", help="Check whether the service is running")
+    group.add_argument("--stop", action="store_true", help="Stop the running service")
+    parser.add_argument("--model", default="tiny", help="Whisper model size (default: tiny)")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads per transcription (0 = auto)")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent transcriptions (default: 1)")
+    parser.add_argument("--port", type=int, default=0, help="TCP port on 127.0.0.1 (default: any free port)")
+
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.model, args.threads, args.workers, args.port)
+    elif args.status:
+        try:
+            response = _request({"cmd": "ping"})
+        except TimeoutError:
+            response = None
+        if response and response.get("ok"):
+            print(f"[OK] Whisper service running ({response['engine']}, model '{response['model']}', {response['workers']} workers)")
+        else:
+            print("[FAIL] Whisper service is not running")
+            sys.exit(1)
+    elif args.stop:
+        try:
+            response = _request({"cmd": "shutdown"})
+        except TimeoutError:
+            response = None
+        if response and response.get("ok"):
+            print("[OK] Whisper service is shutting down")
+        else:
+            print("[FAIL] Whisper service is not running")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
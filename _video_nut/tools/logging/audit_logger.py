@@ -4,7 +4,12 @@ Audit Logger for VideoNut
 
 Logs all tool actions (search, download, screenshot, validation, read) to both
 a machine-readable JSONL log and a beautifully formatted human-readable markdown log
-in the project directory.
+in the project directory. Logging an action is a single append to the JSONL log;
+a background thread fsyncs new entries about once a second, and the markdown log
+is updated incrementally shortly after, at process exit, at the end of each
+workflow stage, or on demand with --report. Every downloader runs as its own
+process, so appends and report updates are serialized across processes by a
+per-project lock (<project>/.cache/audit_log.lock).
 
 Usage:
     # Python import
@@ -13,13 +18,19 @@ Usage:
 
     # Command line usage
     python audit_logger.py --project "projects/my_project" --category "download" --action "Downloaded video" --url "..." --status "ok"
+    python audit_logger.py --project "projects/my_project" --report
 """
 
 import sys
 import os
 import argparse
+import atexit
+import contextlib
 import json
+import shutil
+import sqlite3
 import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -32,11 +43,67 @@ if hasattr(sys.stderr, 'reconfigure'):
 # Thread lock for in-process thread safety
 _log_lock = threading.Lock()
 
+CATEGORIES = ["search", "download", "screenshot", "validate", "read"]
+STATUSES = ["ok", "failed", "skipped", "fallback"]
+
+# Define emojis for each category
+CATEGORY_EMOJIS = {
+    "search": "[SCAN]",
+    "download": "📥",
+    "screenshot": "[SCREENSHOT]",
+    "validate": "[OK]",
+    "read": "📖",
+    "other": "[CONFIG]"
+}
+
+STATUS_EMOJIS = {
+    "ok": "🟢",
+    "failed": "🔴",
+    "skipped": "🟡",
+    "fallback": "🟠"
+}
+
+# Written entries are fsynced in the background at most this long after they are appended
+SYNC_INTERVAL_SECONDS = 1.0
+# audit_log.md is refreshed in the background at most this long after an action is written
+FLUSH_DELAY_SECONDS = 2.0
+# Seconds to wait for another process holding a project's log lock
+LOCK_TIMEOUT = 10.0
+
+# Projects with appended but not yet fsynced entries
+_unsynced = set()
+# Projects whose report is behind the log: str(project dir) -> time of the first unreported write
+_reports_due = {}
+_queue_cond = threading.Condition()
+_writer = None
+
+
+@contextlib.contextmanager
+def _project_lock(proj_dir):
+    """
+    Exclusive lock shared by every process logging to this project. SQLite's write
+    lock serves as a portable cross-process mutex: it behaves the same on Windows
+    and POSIX, and is released automatically if the holding process dies.
+    """
+    lock_path = proj_dir / ".cache" / "audit_log.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(lock_path), timeout=LOCK_TIMEOUT, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        finally:
+            conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
 
 def log_action(project_path: str, category: str, action: str, url: str = "", 
                local_path: str = "", status: str = "ok", details: str = "") -> None:
     """
-    Logs an action to both project_path/audit_log.json and project_path/audit_log.md.
+    Logs an action to project_path/audit_log.json (one append under the project
+    lock). project_path/audit_log.md is brought up to date shortly after in the
+    background, and before the process exits (see update_report).
     
     Args:
         project_path: The root directory of the current project (e.g. project folder)
@@ -50,16 +117,6 @@ def log_action(project_path: str, category: str, action: str, url: str = "",
     if not project_path:
         # Fallback if no project path is specified
         project_path = "."
-        
-    proj_dir = Path(project_path)
-    try:
-        proj_dir.mkdir(parents=True, exist_ok=True)
-    except Exception as e:
-        print(f"[AuditLogger Error] Could not create directory {project_path}: {e}", file=sys.stderr)
-        return
-
-    json_path = proj_dir / "audit_log.json"
-    md_path = proj_dir / "audit_log.md"
 
     timestamp = datetime.now().isoformat()
     
@@ -75,155 +132,283 @@ def log_action(project_path: str, category: str, action: str, url: str = "",
         "status": status,
         "details": details
     }
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
 
-    # Thread safety for appending to JSON and writing to MD
+    # Written through right away, so the entry survives the tool being killed;
+    # only the fsync and the report refresh are left to the background writer
+    proj_dir = Path(project_path)
     with _log_lock:
-        # 1. Write to JSONL (append-only)
         try:
-            # Simple file lock mechanism using dynamic lock file could be added, 
-            # but standard append is atomic for small writes on most systems.
-            with open(json_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            _append_lines(proj_dir, [line])
         except Exception as e:
-            print(f"[AuditLogger Error] Could not write to {json_path}: {e}", file=sys.stderr)
+            print(f"[AuditLogger Error] Could not write to {proj_dir / 'audit_log.json'}: {e}", file=sys.stderr)
+            return
+
+    global _writer
+    key = str(proj_dir)
+    with _queue_cond:
+        _unsynced.add(key)
+        _reports_due.setdefault(key, time.monotonic())
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="audit-log-writer", daemon=True)
+            _writer.start()
+        _queue_cond.notify()
+
+
+def _append_lines(proj_dir, lines):
+    """Appends entries to audit_log.json under the project lock."""
+    proj_dir.mkdir(parents=True, exist_ok=True)
+    with _project_lock(proj_dir):
+        with open(proj_dir / "audit_log.json", "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+
+def _sync_written():
+    """fsyncs the logs of every project written since the last sync."""
+    with _queue_cond:
+        keys = list(_unsynced)
+        _unsynced.clear()
+    for key in keys:
+        try:
+            with open(Path(key) / "audit_log.json", "ab") as f:
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"[AuditLogger Error] Could not sync {Path(key) / 'audit_log.json'}: {e}", file=sys.stderr)
+
+
+def _update_due_reports(force=False):
+    now = time.monotonic()
+    with _queue_cond:
+        due = [key for key, since in _reports_due.items() if force or now - since >= FLUSH_DELAY_SECONDS]
+        for key in due:
+            del _reports_due[key]
+    for key in due:
+        update_report(key)
+
+
+def _writer_loop():
+    while True:
+        with _queue_cond:
+            # Idle until something is logged, then let writes accumulate for one
+            # interval so a burst of actions costs a single fsync
+            while not (_unsynced or _reports_due):
+                _queue_cond.wait()
+            _queue_cond.wait(SYNC_INTERVAL_SECONDS)
+        _sync_written()
+        _update_due_reports()
+
+
+def flush_pending():
+    """Syncs written entries and refreshes the affected reports right away (runs at exit)."""
+    _sync_written()
+    _update_due_reports(force=True)
+
+
+atexit.register(flush_pending)
+
+
+def _format_timestamp(ts):
+    if not ts:
+        return "N/A"
+    # Reformat timestamp for readability
+    try:
+        return datetime.fromisoformat(ts).strftime("%H:%M:%S")
+    except ValueError:
+        return ts[:19]
+
+
+def _format_row(ent, proj_dir):
+    """One markdown table row for a log entry."""
+    st_emoji = STATUS_EMOJIS.get(ent.get("status", "ok").lower(), "⚪")
+    ts_str = _format_timestamp(ent.get("timestamp", ""))
+        
+    act = ent.get("action", "")
+    res_url = ent.get("url", "")
+    if res_url:
+        # Shorten URL for table readability
+        short_url = res_url
+        if len(short_url) > 40:
+            short_url = short_url[:37] + "..."
+        res_str = f"[{short_url}]({res_url})"
+    else:
+        res_str = "-"
+        
+    asset = ent.get("local_path", "")
+    if asset:
+        # Make a relative link if possible
+        try:
+            # Path(asset) can be absolute or relative. Make relative to project directory if possible
+            asset_path = Path(asset)
+            if asset_path.is_absolute():
+                try:
+                    rel_path = asset_path.relative_to(proj_dir.resolve())
+                    asset_str = f"[{rel_path.name}](file:///{asset_path.as_posix()})"
+                except ValueError:
+                    asset_str = f"[{asset_path.name}](file:///{asset_path.as_posix()})"
+            else:
+                # It's already relative
+                asset_str = f"[{asset_path.name}](file:///{proj_dir.resolve().joinpath(asset_path).as_posix()})"
+        except Exception:
+            asset_str = f"`{asset}`"
+    else:
+        asset_str = "-"
+        
+    # Handle markdown character escaping
+    act_escaped = act.replace("|", "\\|")
+    return f"| {st_emoji} | {ts_str} | {act_escaped} | {res_str} | {asset_str} |"
+
+
+def _empty_state():
+    return {
+        "offset": 0,
+        # Byte length of each <group>.rows file as of this state
+        "row_bytes": {},
+        "total": 0,
+        "status_counts": {st: 0 for st in STATUSES},
+        "category_counts": {},
+        "last_timestamp": "",
+    }
+
+
+def _load_state(state_dir):
+    try:
+        with open(state_dir / "state.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _truncate_rows(state_dir, state):
+    """
+    Cuts each rows file back to the length recorded in state, dropping rows an
+    interrupted update appended before it could save its state.
+
+    Returns:
+        bool: False if a rows file is shorter than recorded (the state is unusable)
+    """
+    for group in CATEGORIES + ["other"]:
+        rows_path = state_dir / f"{group}.rows"
+        length = state["row_bytes"].get(group, 0)
+        size = rows_path.stat().st_size if rows_path.exists() else 0
+        if size < length:
+            return False
+        if size > length:
+            with open(rows_path, "r+b") as f:
+                f.truncate(length)
+    return True
+
+
+def _write_atomic(path, text):
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    temp_path.replace(path)
+
+
+def _render_markdown(proj_dir, state, state_dir):
+    md_content = []
+    md_content.append(f"# 📋 VideoNut Audit Log")
+    md_content.append(f"> **Project**: `{proj_dir.resolve().name}`  ")
+    last = state["last_timestamp"]
+    try:
+        last = datetime.fromisoformat(last).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        pass
+    md_content.append(f"> **Last Activity**: `{last or 'N/A'}`  ")
+    md_content.append("\n---\n")
+    
+    # Summary Metrics
+    md_content.append("## 📈 Pipeline Summary")
+    md_content.append(f"- **Total Actions Logged**: {state['total']}")
+    md_content.append("- **Status Breakdown**: " + ", ".join([f"`{k.upper()}`: {v}" for k, v in state["status_counts"].items() if v > 0]))
+    md_content.append("- **Category Breakdown**: " + ", ".join([f"`{k.capitalize()}`: {v}" for k, v in state["category_counts"].items() if v > 0]))
+    md_content.append("\n---\n")
+
+    md_content.append("## 🗂️ Audit Details by Category\n")
 
-        # 2. Update/Write to MD (regenerated or appended intelligently)
-        # To maintain a nice grouped-by-category UI, we will read all entries from the JSONL
-        # and rebuild the markdown summary report.
+    group_counts = {cat: state["category_counts"].get(cat, 0) for cat in CATEGORIES}
+    group_counts["other"] = state["total"] - sum(group_counts.values())
+    for cat in CATEGORIES + ["other"]:
+        if not group_counts[cat]:
+            continue
+        
+        emoji = CATEGORY_EMOJIS.get(cat, "[CONFIG]")
+        md_content.append(f"### {emoji} {cat.capitalize()} ({group_counts[cat]})")
+        
+        # Write table for this category
+        md_content.append("| Status | Timestamp | Action Description | Resource / URL | Saved Asset |")
+        md_content.append("| :---: | :--- | :--- | :--- | :--- |")
+        md_content.append((state_dir / f"{cat}.rows").read_text(encoding="utf-8").rstrip("\n"))
+        md_content.append("") # Spacer
+
+    return "\n".join(md_content)
+
+
+def update_report(project_path: str, rebuild: bool = False) -> None:
+    """
+    Brings project_path/audit_log.md up to date with audit_log.json. Only entries
+    added since the last update are parsed: running totals and the rendered table
+    rows of each category are kept in project_path/.cache/audit_log/, and the
+    report is assembled from them.
+    
+    Args:
+        rebuild: Discard the incremental state and re-render every entry
+    """
+    proj_dir = Path(project_path or ".")
+    json_path = proj_dir / "audit_log.json"
+    md_path = proj_dir / "audit_log.md"
+    state_dir = proj_dir / ".cache" / "audit_log"
+
+    with _log_lock:
         try:
-            all_entries = []
-            if json_path.exists():
-                with open(json_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            try:
-                                all_entries.append(json.loads(line))
-                            except json.JSONDecodeError:
-                                continue
-            
-            # Rebuild MD content
-            md_content = []
-            md_content.append(f"# 📋 VideoNut Audit Log")
-            md_content.append(f"> **Project**: `{proj_dir.resolve().name}`  ")
-            md_content.append(f"> **Last Activity**: `{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}`  ")
-            md_content.append("\n---\n")
-            
-            # Summary Metrics
-            status_counts = {"ok": 0, "failed": 0, "skipped": 0, "fallback": 0}
-            cat_counts = {}
-            for ent in all_entries:
-                st = ent.get("status", "ok").lower()
-                status_counts[st] = status_counts.get(st, 0) + 1
-                cat = ent.get("category", "other").lower()
-                cat_counts[cat] = cat_counts.get(cat, 0) + 1
-            
-            md_content.append("## 📈 Pipeline Summary")
-            md_content.append(f"- **Total Actions Logged**: {len(all_entries)}")
-            md_content.append("- **Status Breakdown**: " + ", ".join([f"`{k.upper()}`: {v}" for k, v in status_counts.items() if v > 0]))
-            md_content.append("- **Category Breakdown**: " + ", ".join([f"`{k.capitalize()}`: {v}" for k, v in cat_counts.items() if v > 0]))
-            md_content.append("\n---\n")
-
-            # Group entries by category
-            categories = ["search", "download", "screenshot", "validate", "read"]
-            grouped = {cat: [] for cat in categories}
-            grouped["other"] = []
-            
-            for ent in all_entries:
-                cat = ent.get("category", "other").lower()
-                if cat in grouped:
-                    grouped[cat].append(ent)
-                else:
-                    grouped["other"].append(ent)
-
-            # Define emojis for each category
-            emojis = {
-                "search": "[SCAN]",
-                "download": "📥",
-                "screenshot": "[SCREENSHOT]",
-                "validate": "[OK]",
-                "read": "📖",
-                "other": "[CONFIG]"
-            }
-
-            status_emojis = {
-                "ok": "🟢",
-                "failed": "🔴",
-                "skipped": "🟡",
-                "fallback": "🟠"
-            }
-
-            md_content.append("## 🗂️ Audit Details by Category\n")
-            
-            for cat in categories + ["other"]:
-                ents = grouped[cat]
-                if not ents:
-                    continue
-                
-                emoji = emojis.get(cat, "[CONFIG]")
-                md_content.append(f"### {emoji} {cat.capitalize()} ({len(ents)})")
-                
-                # Write table for this category
-                md_content.append("| Status | Timestamp | Action Description | Resource / URL | Saved Asset |")
-                md_content.append("| :---: | :--- | :--- | :--- | :--- |")
-                
-                for ent in ents:
-                    st_emoji = status_emojis.get(ent.get("status", "ok").lower(), "⚪")
-                    ts = ent.get("timestamp", "")
-                    if ts:
-                        # Reformat timestamp for readability
-                        try:
-                            ts_dt = datetime.fromisoformat(ts)
-                            ts_str = ts_dt.strftime("%H:%M:%S")
-                        except ValueError:
-                            ts_str = ts[:19]
-                    else:
-                        ts_str = "N/A"
-                        
-                    act = ent.get("action", "")
-                    res_url = ent.get("url", "")
-                    if res_url:
-                        # Shorten URL for table readability
-                        short_url = res_url
-                        if len(short_url) > 40:
-                            short_url = short_url[:37] + "..."
-                        res_str = f"[{short_url}]({res_url})"
-                    else:
-                        res_str = "-"
-                        
-                    asset = ent.get("local_path", "")
-                    if asset:
-                        # Make a relative link if possible
-                        try:
-                            # Path(asset) can be absolute or relative. Make relative to project directory if possible
-                            asset_path = Path(asset)
-                            if asset_path.is_absolute():
-                                try:
-                                    rel_path = asset_path.relative_to(proj_dir.resolve())
-                                    asset_str = f"[{rel_path.name}](file:///{asset_path.as_posix()})"
-                                except ValueError:
-                                    asset_str = f"[{asset_path.name}](file:///{asset_path.as_posix()})"
-                            else:
-                                # It's already relative
-                                asset_str = f"[{asset_path.name}](file:///{proj_dir.resolve().joinpath(asset_path).as_posix()})"
-                        except Exception:
-                            asset_str = f"`{asset}`"
-                    else:
-                        asset_str = "-"
-                        
-                    # Handle markdown character escaping
-                    act_escaped = act.replace("|", "\\|")
-                    md_content.append(f"| {st_emoji} | {ts_str} | {act_escaped} | {res_str} | {asset_str} |")
-                    
-                    # If there are details, add them as a sub-bullet under the table or inside details?
-                    # Since markdown tables can't easily have multi-line, we just omit detail logs from the table 
-                    # but we can list details or errors at the end of the section if failed
-                    
-                md_content.append("") # Spacer
-                
-            with open(md_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(md_content))
-                
+            with _project_lock(proj_dir):
+                size = json_path.stat().st_size if json_path.exists() else 0
+                state = None if rebuild else _load_state(state_dir)
+                if (state is None or "row_bytes" not in state or state["offset"] > size
+                        or not _truncate_rows(state_dir, state)):
+                    # No usable state, or the log was truncated: start over
+                    shutil.rmtree(state_dir, ignore_errors=True)
+                    state = _empty_state()
+                elif state["offset"] == size and md_path.exists():
+                    return
+
+                state_dir.mkdir(parents=True, exist_ok=True)
+                data = b""
+                if size > state["offset"]:
+                    with open(json_path, "rb") as f:
+                        f.seek(state["offset"])
+                        data = f.read(size - state["offset"])
+                # An incomplete last line is left for the next update
+                data = data[:data.rfind(b"\n") + 1]
+
+                new_rows = {}
+                for line in data.decode("utf-8", errors="replace").splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        ent = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    st = ent.get("status", "ok").lower()
+                    state["status_counts"][st] = state["status_counts"].get(st, 0) + 1
+                    cat = ent.get("category", "other").lower()
+                    state["category_counts"][cat] = state["category_counts"].get(cat, 0) + 1
+                    state["total"] += 1
+                    state["last_timestamp"] = ent.get("timestamp", "") or state["last_timestamp"]
+                    group = cat if cat in CATEGORIES else "other"
+                    new_rows.setdefault(group, []).append(_format_row(ent, proj_dir))
+
+                # Rows go in before state.json; a crash in between is undone by _truncate_rows
+                for group, rows in new_rows.items():
+                    encoded = "".join(row + "\n" for row in rows).encode("utf-8")
+                    with open(state_dir / f"{group}.rows", "ab") as f:
+                        f.write(encoded)
+                    state["row_bytes"][group] = state["row_bytes"].get(group, 0) + len(encoded)
+                state["offset"] += len(data)
+                _write_atomic(state_dir / "state.json", json.dumps(state, ensure_ascii=False))
+
+                _write_atomic(md_path, _render_markdown(proj_dir, state, state_dir))
         except Exception as e:
             print(f"[AuditLogger Error] Could not write to {md_path}: {e}", file=sys.stderr)
 
@@ -231,19 +416,29 @@ def log_action(project_path: str, category: str, action: str, url: str = "",
 def main():
     parser = argparse.ArgumentParser(description="Log actions to the VideoNut audit log.")
     parser.add_argument("--project", "-p", required=True, help="Path to the project directory")
-    parser.add_argument("--category", "-c", required=True, 
-                        choices=["search", "download", "screenshot", "validate", "read"], 
+    parser.add_argument("--category", "-c", 
+                        choices=CATEGORIES, 
                         help="Action category")
-    parser.add_argument("--action", "-a", required=True, help="Description of the action")
+    parser.add_argument("--action", "-a", help="Description of the action")
     parser.add_argument("--url", "-u", default="", help="Resource URL involved")
     parser.add_argument("--local-path", "-l", default="", help="Local path of the downloaded/saved file")
     parser.add_argument("--status", "-s", default="ok", 
-                        choices=["ok", "failed", "skipped", "fallback"], 
+                        choices=STATUSES, 
                         help="Status of the action")
     parser.add_argument("--details", "-d", default="", help="Extra details or error messages")
+    parser.add_argument("--report", action="store_true", help="Update audit_log.md now instead of logging an action")
+    parser.add_argument("--rebuild", action="store_true", help="With --report, re-render every entry from scratch")
 
     args = parser.parse_args()
 
+    if args.report:
+        update_report(args.project, rebuild=args.rebuild)
+        print(f"Report updated: {Path(args.project) / 'audit_log.md'}")
+        return
+
+    if not (args.category and args.action):
+        parser.error("--category and --action are required unless --report is given")
+
     log_action(
         project_path=args.project,
         category=args.category,
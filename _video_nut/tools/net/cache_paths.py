@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Cache Locations for VideoNut
+
+Single definition of the cross-project cache root shared by the downloaders,
+the network layer (HTTP cache, rate limiter) and the local services. Defaults to
+~/.cache/videonut; set $VIDEONUT_CACHE_DIR to move it.
+
+Usage:
+    from tools.net.cache_paths import global_cache_root
+    sources_dir = global_cache_root() / "sources"
+"""
+
+import os
+from pathlib import Path
+
+CACHE_DIR_ENV = "VIDEONUT_CACHE_DIR"
+
+
+def global_cache_root():
+    """Root of the cross-project VideoNut cache."""
+    env_dir = os.environ.get(CACHE_DIR_ENV)
+    if env_dir:
+        return Path(env_dir)
+    return Path.home() / ".cache" / "videonut"
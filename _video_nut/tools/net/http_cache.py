@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+HTTP Response Cache for VideoNut
+
+Shared on-disk cache for GET requests made by web_reader.py, pdf_reader.py and
+doc_reader.py, so the same source read by several agents (or several projects)
+is only downloaded once. Responses are stored under the VideoNut cache dir
+(~/.cache/videonut/http, or $VIDEONUT_CACHE_DIR/http) and honour the server's
+validators:
+
+  - still fresh (Cache-Control max-age / Expires, or a short default) -> served
+    from disk without touching the network
+  - stale with an ETag / Last-Modified -> revalidated with If-None-Match /
+    If-Modified-Since; a 304 reuses the stored body
+  - otherwise -> downloaded again
+
+Entries are keyed by URL plus any headers the caller passes (the session's own
+headers are the same for every request). Responses that vary on cookies or
+credentials (Vary: Cookie / Authorization / *) are not stored.
+
+Bodies live in one file per entry; metadata, LRU order and hit counters are kept
+in a small SQLite index so parallel processes can share the cache safely. The
+total size is capped and least-recently-used bodies are evicted.
+
+Usage:
+    from tools.net import http_cache
+    response = http_cache.get(url, timeout=30)   # same shape as requests.Response
+
+    python http_cache.py --stats
+    python http_cache.py --clear
+"""
+
+import sys
+import os
+import argparse
+import codecs
+import contextlib
+import hashlib
+import email.utils
+import re
+import secrets
+import sqlite3
+import time
+from pathlib import Path
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+from tools.net import http_client, rate_limiter
+
+MAX_CACHE_BYTES = 1024 * 1024 * 1024
+# Freshness when the server gives no max-age/Expires; after this the entry is revalidated
+DEFAULT_FRESH_SECONDS = 10 * 60
+# Responses larger than this are passed through without being stored
+MAX_ENTRY_BYTES = 200 * 1024 * 1024
+DB_TIMEOUT = 10.0
+
+# Response headers kept with the body (enough for callers to sniff the content)
+STORED_HEADERS = ("Content-Type", "Content-Disposition", "ETag", "Last-Modified", "Cache-Control")
+
+STAT_NAMES = ("hits", "revalidated", "misses", "bytes_saved")
+
+# Vary values that make a response specific to state outside the cache key
+UNCACHEABLE_VARY = {"*", "cookie", "authorization"}
+
+CHARSET_PARAM = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+# <meta charset="..."> / <meta http-equiv content="...; charset=..."> / <?xml encoding="..."?>
+DOCUMENT_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)|<\?xml[^>]+encoding\s*=\s*["\']([\w.:-]+)',
+                              re.IGNORECASE)
+
+
+def _known_codec(name):
+    try:
+        return codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+
+
+def detect_encoding(headers, content):
+    """
+    Charset of a text body: the Content-Type charset, else one declared in the
+    document itself, else UTF-8 (or Windows-1252 if the body is not valid UTF-8).
+    requests instead assumes ISO-8859-1 for any text/* response without a
+    charset parameter, which garbles UTF-8 pages that declare it only in <meta>.
+    """
+    match = CHARSET_PARAM.search(headers.get("Content-Type", "") or "")
+    encoding = _known_codec(match.group(1)) if match else None
+    if encoding:
+        return encoding
+    match = DOCUMENT_CHARSET.search(content[:4096])
+    if match:
+        encoding = _known_codec((match.group(1) or match.group(2)).decode('ascii', 'replace'))
+        if encoding:
+            return encoding
+    try:
+        content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'windows-1252'
+
+
+def _is_text(headers):
+    content_type = (headers.get("Content-Type", "") or "").lower()
+    return content_type.startswith("text/") or "xml" in content_type or "json" in content_type
+
+
+def cache_dir():
+    return global_cache_root() / "http"
+
+
+def _key(url, headers=None):
+    """Cache key for a URL fetched with the caller's extra request headers (Accept, Range, ...)."""
+    parts = [url]
+    for name, value in sorted((str(name).lower(), str(value)) for name, value in (headers or {}).items()):
+        parts.append(f"{name}: {value}")
+    return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+
+def _varies_outside_key(response_headers):
+    """True if the response depends on request state the key does not capture."""
+    vary = {name.strip().lower() for name in (response_headers.get("Vary") or "").split(",")}
+    return bool(vary & UNCACHEABLE_VARY)
+
+
+def _body_path(key):
+    return cache_dir() / key[:2] / f"{key}.body"
+
+
+def _connect():
+    path = cache_dir() / "index.sqlite"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=DB_TIMEOUT, isolation_level=None)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "key TEXT PRIMARY KEY, url TEXT, final_url TEXT, headers TEXT, encoding TEXT, "
+        "etag TEXT, last_modified TEXT, fresh_until REAL, size INTEGER, last_used REAL)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+    return conn
+
+
+class CachedResponse:
+    """Stored response with the subset of the requests.Response interface the readers use."""
+    def __init__(self, url, content, headers, encoding, cache_status):
+        self.url = url
+        self.status_code = 200
+        self.ok = True
+        self.content = content
+        self.headers = headers
+        # Re-detected rather than trusted: entries stored by older versions may
+        # carry requests' ISO-8859-1 default
+        self.encoding = detect_encoding(headers, content) if _is_text(headers) else encoding
+        # "hit" (no network), "revalidated" (304) or "stale" (network failed)
+        self.cache_status = cache_status
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        return None
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+
+def _fresh_until(headers, now):
+    """Absolute time until which a response may be served without revalidation."""
+    directives = _parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in directives:
+        return now
+    max_age = directives.get("s-maxage") or directives.get("max-age")
+    if max_age and re.fullmatch(r"\d+", max_age):
+        return now + int(max_age)
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            # Invalid Expires (e.g. "0") means already expired
+            return now
+    return now + DEFAULT_FRESH_SECONDS
+
+
+def _bump(conn, name, amount=1):
+    conn.execute("INSERT INTO stats (name, value) VALUES (?, ?) "
+                 "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, amount))
+
+
+def _load_entry(conn, key):
+    row = conn.execute(
+        "SELECT final_url, headers, encoding, etag, last_modified, fresh_until, size FROM entries WHERE key = ?",
+        (key,)
+    ).fetchone()
+    if not row:
+        return None
+    final_url, headers, encoding, etag, last_modified, fresh_until, size = row
+    try:
+        content = _body_path(key).read_bytes()
+    except OSError:
+        return None
+    if len(content) != size:
+        return None
+    stored_headers = {}
+    for line in (headers or "").splitlines():
+        name, _, value = line.partition(": ")
+        stored_headers[name] = value
+    return {
+        "final_url": final_url,
+        "headers": stored_headers,
+        "encoding": encoding,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fresh_until": fresh_until,
+        "content": content,
+    }
+
+
+def _store(conn, key, url, response, now):
+    content = response.content
+    body_path = _body_path(key)
+    # Write to temp file then rename (atomic)
+    temp_path = body_path.with_suffix(f".{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    try:
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        temp_path.replace(body_path)
+    except OSError as e:
+        print(f"⚠️ Could not write HTTP cache entry for {url}: {e}", file=sys.stderr)
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+        return
+    headers = "\n".join(f"{name}: {response.headers[name]}" for name in STORED_HEADERS if name in response.headers)
+    # Skipped for binary bodies like PDFs
+    encoding = detect_encoding(response.headers, content) if _is_text(response.headers) else None
+    conn.execute(
+        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, url, response.url, headers, encoding,
+         response.headers.get("ETag"), response.headers.get("Last-Modified"),
+         _fresh_until(response.headers, now), len(content), now)
+    )
+
+
+def evict(conn=None, max_bytes=MAX_CACHE_BYTES):
+    """Removes least-recently-used bodies until the cache fits in max_bytes."""
+    own = conn is None
+    conn = conn or _connect()
+    try:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if total <= max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            try:
+                _body_path(key).unlink()
+            except OSError:
+                pass
+            total -= size
+    finally:
+        if own:
+            conn.close()
+
+
+@contextlib.contextmanager
+def _best_effort(url):
+    """Cache bookkeeping that must never fail the request it belongs to."""
+    try:
+        yield
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️ Could not update HTTP cache for {url}: {e}", file=sys.stderr)
+
+
+def _with_detected_encoding(response):
+    """Makes response.text of a live requests.Response decode the way CachedResponse.text does."""
+    if response.status_code == 200 and _is_text(response.headers):
+        response.encoding = detect_encoding(response.headers, response.content)
+    return response
+
+
+def get(url, headers=None, timeout=30, max_age=None, **kwargs):
+    """
+    GET through the shared cache. Returns a CachedResponse for cache hits and
+    304 revalidations, otherwise the live requests.Response (which is stored
+    when it is a cacheable 200). Network requests wait on the per-host rate
+    limiter; cache hits do not.
+
+    Args:
+        max_age: Override freshness in seconds (0 forces revalidation)
+    """
+    key = _key(url, headers)
+    now = time.time()
+    conn = None
+    try:
+        # The cache dir may be unwritable (read-only home, bad VIDEONUT_CACHE_DIR)
+        conn = _connect()
+        entry = _load_entry(conn, key)
+    except (sqlite3.Error, OSError) as e:
+        if conn is not None:
+            conn.close()
+        print(f"⚠️ HTTP cache unavailable ({e}), fetching directly", file=sys.stderr)
+        rate_limiter.wait_for(url)
+        return _with_detected_encoding(http_client.get(url, headers=headers, timeout=timeout, **kwargs))
+
+    try:
+        if entry:
+            fresh_until = entry["fresh_until"] if max_age is None else now - 1 + max_age
+            if now < fresh_until:
+                with _best_effort(url):
+                    conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+                    _bump(conn, "hits")
+                    _bump(conn, "bytes_saved", len(entry["content"]))
+                print(f"[CACHE] HTTP cache hit for {url}", file=sys.stderr)
+                return CachedResponse(entry["final_url"], entry["content"], entry["headers"], entry["encoding"], "hit")
+
+        request_headers = dict(headers or {})
+        if entry and entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            # Only requests that reach the network count against the host's rate limit
+            rate_limiter.wait_for(url)
+            response = http_client.get(url, headers=request_headers, timeout=timeout, **kwargs)
+        except Exception as e:
+            if not entry:
+                raise
+            # Network failure: a stale copy is better than nothing for research reads
+            print(f"⚠️ Fetch failed ({e}); serving stale cached copy of {url}", file=sys.stderr)
+            with _best_effort(url):
+                _bump(conn, "hits")
+            return CachedResponse(entry["final_url"], entry["content"], entry["headers"], entry["encoding"], "stale")
+
+        now = time.time()
+        if response.status_code == 304 and entry:
+            # Servers may send updated validators/freshness with the 304
+            merged = dict(entry["headers"])
+            merged.update({name: response.headers[name] for name in STORED_HEADERS if name in response.headers})
+            with _best_effort(url):
+                conn.execute(
+                    "UPDATE entries SET fresh_until = ?, last_used = ?, etag = COALESCE(?, etag), "
+                    "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                    (_fresh_until(merged, now), now, response.headers.get("ETag"),
+                     response.headers.get("Last-Modified"), key)
+                )
+                _bump(conn, "revalidated")
+                _bump(conn, "bytes_saved", len(entry["content"]))
+            print(f"[CACHE] Revalidated (304) {url}", file=sys.stderr)
+            return CachedResponse(entry["final_url"], entry["content"], merged, entry["encoding"], "revalidated")
+
+        directives = _parse_cache_control(response.headers.get("Cache-Control"))
+        with _best_effort(url):
+            _bump(conn, "misses")
+            if (response.status_code == 200 and "no-store" not in directives
+                    and not _varies_outside_key(response.headers)
+                    and len(response.content) <= MAX_ENTRY_BYTES):
+                _store(conn, key, url, response, now)
+                evict(conn)
+        return _with_detected_encoding(response)
+    finally:
+        conn.close()
+
+
+def stats():
+    """Entry count, size and hit counters for the shared cache."""
+    conn = _connect()
+    try:
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+    finally:
+        conn.close()
+    result = {name: counters.get(name, 0) for name in STAT_NAMES}
+    requests_seen = result["hits"] + result["revalidated"] + result["misses"]
+    result.update({
+        "cache_dir": str(cache_dir()),
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": MAX_CACHE_BYTES,
+        "hit_rate": (result["hits"] + result["revalidated"]) / requests_seen if requests_seen else 0.0,
+    })
+    return result
+
+
+def clear():
+    conn = _connect()
+    try:
+        for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+            try:
+                _body_path(key).unlink()
+            except OSError:
+                pass
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM stats")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the shared VideoNut HTTP cache.")
+    parser.add_argument("--stats", action="store_true", help="Show cache size and hit rate")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached responses and counters")
+    args = parser.parse_args()
+
+    if args.clear:
+        clear()
+        print(f"🧹 Cleared {cache_dir()}")
+        return
+    st = stats()
+    print(f"[CACHE] {st['cache_dir']}: {st['entries']} responses, "
+          f"{st['bytes'] / 1024 / 1024:.1f} / {st['max_bytes'] / 1024 / 1024:.0f} MB")
+    print(f"  hits: {st['hits']}, revalidated (304): {st['revalidated']}, misses: {st['misses']} "
+          f"-> hit rate {st['hit_rate']:.0%}, {st['bytes_saved'] / 1024 / 1024:.1f} MB not downloaded")
+
+
+if __name__ == "__main__":
+    main()
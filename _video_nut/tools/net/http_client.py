@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client for VideoNut
+
+One process-wide requests.Session used by every downloader and validator, so
+repeated fetches from the same host reuse keep-alive connections instead of
+paying a fresh TCP+TLS handshake each time. Connection pools are kept per host,
+and the browser-like User-Agent/Accept headers the tools send are managed here
+instead of being copied into every module.
+
+Usage:
+    from tools.net import http_client
+    response = http_client.get("https://example.com/report.pdf", timeout=30)
+    response = http_client.head(url, allow_redirects=True)
+"""
+
+import sys
+import threading
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    has_requests = True
+except ImportError:
+    has_requests = False
+
+# Standard Chrome User-Agent (some hosts, e.g. Wikimedia, return 403 to library defaults)
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+DEFAULT_HEADERS = {
+    'User-Agent': DEFAULT_USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+DEFAULT_TIMEOUT = 15
+
+# Number of hosts with a live pool, and idle connections kept per host
+POOL_HOSTS = 32
+POOL_CONNECTIONS_PER_HOST = 8
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    # Retry only failed connection attempts; status codes are left to the callers
+    retry = Retry(total=2, connect=2, read=0, status=0, redirect=None, backoff_factor=0.5)
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_CONNECTIONS_PER_HOST, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """Returns the process-wide pooled session, creating it on first use."""
+    global _session
+    if not has_requests:
+        raise ImportError("requests not installed. Install with: pip install requests")
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def request(method, url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    Sends a request through the shared session. Headers passed here are merged
+    over the defaults for this request only.
+    """
+    return get_session().request(method, url, headers=headers, timeout=timeout, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def close():
+    """Closes every pooled connection (the next request opens a new session)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python http_client.py <url> [url ...]")
+        sys.exit(1)
+    for target in sys.argv[1:]:
+        response = head(target, allow_redirects=True)
+        print(f"{response.status_code} {response.url}")
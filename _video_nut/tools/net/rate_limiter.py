@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Per-Host Rate Limiter for VideoNut
+
+Token bucket per host, shared by every VideoNut process through a small SQLite
+file in the VideoNut cache dir. A request only waits when the same host has been
+hit faster than its rate allows; requests to different hosts go through
+immediately, and parallel tools (batch runs, concurrent agents) share one budget
+per host instead of each sleeping blindly.
+
+Each call reserves a token inside an exclusive transaction. If the bucket is
+empty the token is borrowed (the balance goes negative) and the caller sleeps
+until it would have refilled, so concurrent callers queue up in order.
+
+Usage:
+    from tools.net import rate_limiter
+    rate_limiter.wait_for(url)
+
+    python rate_limiter.py --status
+    python rate_limiter.py --reset
+"""
+
+import sys
+import argparse
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Enforce UTF-8 output encoding for Windows terminal safety
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# Set path for importing sibling tools
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net.cache_paths import global_cache_root
+
+# (requests per second, burst) per host; hosts not listed use DEFAULT_LIMIT
+DEFAULT_LIMIT = (0.5, 2)
+HOST_LIMITS = {
+    "archive.is": (0.25, 1),
+    "archive.ph": (0.25, 1),
+    "archive.today": (0.25, 1),
+    "web.archive.org": (0.5, 1),
+    "twitter.com": (0.5, 1),
+    "x.com": (0.5, 1),
+    # Pseudo-host for ntscraper, which picks its own Nitter mirror
+    "nitter": (0.5, 1),
+}
+# Seconds to wait for another process holding the database lock
+DB_TIMEOUT = 10.0
+
+_local_lock = threading.Lock()
+# Used when the shared database cannot be opened (read-only home, locked volume...)
+_local_buckets = {}
+
+
+def db_path():
+    return global_cache_root() / "rate_limits.sqlite"
+
+
+def host_of(url_or_host):
+    """Lowercased host of a URL (or the value itself if it is already a host), without www."""
+    host = urlparse(url_or_host).hostname if "://" in url_or_host else url_or_host
+    host = (host or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def limit_for(host):
+    """Rate and burst for a host, matching parent domains (e.g. docs.google.com -> google.com)."""
+    parts = host.split(".")
+    for i in range(len(parts)):
+        limit = HOST_LIMITS.get(".".join(parts[i:]))
+        if limit:
+            return limit
+    return DEFAULT_LIMIT
+
+
+def _take_token(tokens, updated, now, rate, burst):
+    """Refills a bucket and takes one token. Returns (new_tokens, seconds_to_wait)."""
+    tokens = min(float(burst), tokens + (now - updated) * rate)
+    tokens -= 1.0
+    wait = 0.0 if tokens >= 0 else -tokens / rate
+    return tokens, wait
+
+
+def _connect():
+    path = db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=DB_TIMEOUT, isolation_level=None)
+    conn.execute("CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+    return conn
+
+
+def reserve(url_or_host):
+    """
+    Takes a token for the host and returns how many seconds the caller must wait
+    before sending its request (0.0 if it may go immediately).
+    """
+    host = host_of(url_or_host)
+    if not host:
+        return 0.0
+    rate, burst = limit_for(host)
+
+    try:
+        conn = _connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock so read-modify-write is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (host,)).fetchone()
+            tokens, updated = row if row else (float(burst), now)
+            tokens, wait = _take_token(tokens, updated, now, rate, burst)
+            conn.execute("INSERT OR REPLACE INTO buckets (host, tokens, updated) VALUES (?, ?, ?)",
+                         (host, tokens, now))
+            conn.execute("COMMIT")
+            return wait
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        # Unwritable cache dir or database: fall back to a per-process bucket
+        with _local_lock:
+            now = time.time()
+            tokens, updated = _local_buckets.get(host, (float(burst), now))
+            tokens, wait = _take_token(tokens, updated, now, rate, burst)
+            _local_buckets[host] = (tokens, now)
+            return wait
+
+
+def wait_for(url_or_host, quiet=False):
+    """
+    Blocks until one request to this host is allowed and returns the seconds waited.
+    Returns at once unless the host's budget, shared by every VideoNut process, is
+    used up. Call it before each request, not once per batch of requests.
+    """
+    wait = reserve(url_or_host)
+    if wait > 0:
+        if not quiet:
+            print(f"Rate limiting: Waiting {wait:.2f} seconds before accessing {host_of(url_or_host)}", file=sys.stderr)
+        time.sleep(wait)
+    return wait
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or reset the shared per-host rate limiter.")
+    parser.add_argument("--status", action="store_true", help="Show current token balance per host")
+    parser.add_argument("--reset", action="store_true", help="Forget all bucket state")
+    args = parser.parse_args()
+
+    conn = _connect()
+    try:
+        if args.reset:
+            conn.execute("DELETE FROM buckets")
+            print(f"🧹 Reset rate limiter state in {db_path()}")
+            return
+        now = time.time()
+        rows = conn.execute("SELECT host, tokens, updated FROM buckets ORDER BY host").fetchall()
+        if not rows:
+            print("[OK] No hosts rate-limited yet")
+        for host, tokens, updated in rows:
+            rate, burst = limit_for(host)
+            current = min(float(burst), tokens + (now - updated) * rate)
+            print(f"  {host}: {current:.2f}/{burst} tokens ({rate} req/s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
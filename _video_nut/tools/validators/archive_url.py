@@ -13,9 +13,8 @@ Usage:
 
 import sys
 import argparse
-import time
 import json
-from random import uniform
+from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
@@ -29,6 +28,12 @@ except ImportError:
     print("Error: requests not installed. Install with: pip install requests")
     sys.exit(1)
 
+# Set path for importing the shared HTTP client
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net import http_client, rate_limiter
+
 
 def check_existing_archive(url):
     """
@@ -38,7 +43,8 @@ def check_existing_archive(url):
     check_url = f"https://archive.is/{url}"
     
     try:
-        response = requests.get(check_url, timeout=10, allow_redirects=True)
+        rate_limiter.wait_for(check_url)
+        response = http_client.get(check_url, timeout=10, allow_redirects=True)
         
         # If we get redirected to an archived page, it exists
         if response.status_code == 200 and "archive.is" in response.url:
@@ -67,11 +73,6 @@ def archive_url(url, wait_for_complete=True):
         'message': ''
     }
     
-    # Rate limiting
-    delay = uniform(2, 4)
-    print(f"Rate limiting: Waiting {delay:.2f} seconds...")
-    time.sleep(delay)
-    
     # First, check if already archived
     print(f"Checking if {url} is already archived...")
     existing = check_existing_archive(url)
@@ -87,7 +88,6 @@ def archive_url(url, wait_for_complete=True):
     archive_submit_url = "https://archive.is/submit/"
     
     headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'Content-Type': 'application/x-www-form-urlencoded',
     }
     
@@ -97,7 +97,8 @@ def archive_url(url, wait_for_complete=True):
     }
     
     try:
-        response = requests.post(
+        rate_limiter.wait_for(archive_submit_url)
+        response = http_client.post(
             archive_submit_url, 
             data=data, 
             headers=headers, 
@@ -1,7 +1,25 @@
+"""
+Link Checker for VideoNut
+
+Validates a single URL, or every URL referenced by a project's markdown files
+(truth_dossier.md, asset_manifest.md, ...) in bulk. Bulk mode de-duplicates the
+URLs, checks them concurrently under per-host limits, writes a JSON report and
+keeps a cache of recent results so unchanged links are not re-checked on every run.
+
+Usage:
+    python link_checker.py "https://example.com/article"
+    python link_checker.py --project "./Projects/my_project"
+    python link_checker.py --files truth_dossier.md asset_manifest.md --report links.json
+"""
+
 import requests
 import sys
+import argparse
+import asyncio
+import json
+import re
 import time
-from random import uniform
+from pathlib import Path
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
@@ -9,43 +27,256 @@ if hasattr(sys.stdout, 'reconfigure'):
 if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8')
 
-def check_link(url):
-    # Add random delay to implement rate limiting
-    delay = uniform(1, 3)  # Random delay between 1-3 seconds
-    print(f"Rate limiting: Waiting {delay:.2f} seconds before checking {url}", file=sys.stderr)
-    time.sleep(delay)
+# Set path for importing the shared HTTP client
+vn_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(vn_root))
+
+from tools.net import http_client, rate_limiter
+
+# Parentheses are allowed (Wikipedia-style Foo_(bar)); an unbalanced closing one is trimmed later
+URL_PATTERN = re.compile(r'https?://[^\s<>"\'|\]`]+')
+TRAILING_PUNCTUATION = '.,;:!?'
 
+# Results younger than this are reused; failures are re-checked sooner
+DEFAULT_TTL_HOURS = 24
+FAILED_TTL_SECONDS = 3600
+CACHE_FILE = Path(".cache") / "link_checks.json"
+REPORT_FILE = "link_check_report.json"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST = 2
+
+
+def probe_link(url):
+    """
+    HEAD then GET fallback for one URL. Returns (valid, message). The caller
+    rate-limits the HEAD request; the GET fallback waits for its own turn.
+    """
     try:
-        # More realistic User-Agent to appear like a regular browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        # Browser-like headers come from the shared client
+        headers = {'Upgrade-Insecure-Requests': '1'}
 
-        response = requests.head(url, headers=headers, timeout=15, allow_redirects=True)
+        response = http_client.head(url, headers=headers, timeout=15, allow_redirects=True)
 
         if response.status_code == 200:
             return True, "OK"
         else:
             # Retry with GET if HEAD fails (some servers block HEAD)
-            response = requests.get(url, headers=headers, timeout=15, stream=True)
-            if response.status_code == 200:
-                return True, "OK"
-            return False, f"Status Code: {response.status_code}"
+            # Only the status is needed, so the body is never downloaded
+            rate_limiter.wait_for(url)
+            with http_client.get(url, headers=headers, timeout=15, stream=True) as response:
+                if response.status_code == 200:
+                    return True, "OK"
+                return False, f"Status Code: {response.status_code}"
 
     except requests.exceptions.RequestException as e:
         return False, f"Request error: {str(e)}"
     except Exception as e:
         return False, f"General error: {str(e)}"
 
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        url = sys.argv[1]
-        success, msg = check_link(url)
+
+def check_link(url):
+    rate_limiter.wait_for(url)
+    return probe_link(url)
+
+
+def clean_url(url, opener=""):
+    """
+    Trims sentence punctuation and a closing parenthesis that is not part of the
+    URL ([x](url), (see url)). Trailing * or _ is only trimmed when the same
+    markdown emphasis (opener, the text just before the URL) wraps it.
+    """
+    emphasis = re.search(r"[*_]+$", opener)
+    while True:
+        trimmed = url.rstrip(TRAILING_PUNCTUATION)
+        if emphasis and trimmed.endswith(emphasis.group(0)):
+            trimmed = trimmed[:-len(emphasis.group(0))]
+            emphasis = None
+        if trimmed.endswith(")") and trimmed.count(")") > trimmed.count("("):
+            trimmed = trimmed[:-1]
+        if trimmed == url:
+            return url
+        url = trimmed
+
+
+def extract_urls(files):
+    """
+    Collects every http(s) URL from the given markdown files, de-duplicated in
+    first-seen order.
+
+    Returns:
+        dict: url -> list of files that reference it
+    """
+    found = {}
+    for path in files:
+        try:
+            text = Path(path).read_text(encoding='utf-8', errors='replace')
+        except OSError as e:
+            print(f"⚠️ Could not read {path}: {e}", file=sys.stderr)
+            continue
+        for match in URL_PATTERN.finditer(text):
+            url = clean_url(match.group(0), text[max(0, match.start() - 3):match.start()])
+            refs = found.setdefault(url, [])
+            if str(path) not in refs:
+                refs.append(str(path))
+    return found
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache_path, cache):
+    cache_path = Path(cache_path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+        temp_path.replace(cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not save link cache: {e}", file=sys.stderr)
+
+
+def _cached_result(cache, url, ttl_seconds, now):
+    entry = cache.get(url)
+    if not entry:
+        return None
+    max_age = ttl_seconds if entry.get("valid") else min(ttl_seconds, FAILED_TTL_SECONDS)
+    if now - entry.get("checked_at", 0) > max_age:
+        return None
+    return entry
+
+
+async def _check_all(urls, concurrency, per_host):
+    """Checks URLs concurrently: at most `concurrency` in flight, `per_host` per host."""
+    global_slots = asyncio.Semaphore(concurrency)
+    host_slots = {}
+    results = {}
+
+    async def check_one(url):
+        host = rate_limiter.host_of(url)
+        slots = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+        async with slots:
+            # Shared token bucket: same-host requests are spaced, other hosts are not delayed
+            wait = await asyncio.to_thread(rate_limiter.reserve, url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with global_slots:
+                started = time.monotonic()
+                valid, message = await asyncio.to_thread(probe_link, url)
+        results[url] = {
+            "valid": valid,
+            "message": message,
+            "checked_at": time.time(),
+            "elapsed": round(time.monotonic() - started, 2),
+        }
+        print(f"  {'[OK]' if valid else '[FAIL]'} {url} ({message})", file=sys.stderr)
+
+    await asyncio.gather(*(check_one(url) for url in urls))
+    return results
+
+
+def check_links_bulk(files, cache_path=None, ttl_hours=DEFAULT_TTL_HOURS, use_cache=True,
+                     concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST):
+    """
+    Validates every URL found in the given files.
+
+    Returns:
+        dict: Report with a summary and one entry per unique URL
+    """
+    url_refs = extract_urls(files)
+    now = time.time()
+    cache = load_cache(cache_path) if (use_cache and cache_path) else {}
+
+    results = {}
+    to_check = []
+    for url in url_refs:
+        cached = _cached_result(cache, url, ttl_hours * 3600, now) if use_cache else None
+        if cached:
+            results[url] = dict(cached, cached=True)
+        else:
+            to_check.append(url)
+
+    hosts = {rate_limiter.host_of(url) for url in to_check}
+    print(f"[SCAN] {len(url_refs)} unique URLs in {len(files)} files: "
+          f"{len(results)} cached, {len(to_check)} to check across {len(hosts)} hosts", file=sys.stderr)
+
+    if to_check:
+        fresh = asyncio.run(_check_all(to_check, max(1, concurrency), max(1, per_host)))
+        for url, result in fresh.items():
+            results[url] = dict(result, cached=False)
+            cache[url] = result
+        if use_cache and cache_path:
+            save_cache(cache_path, cache)
+
+    links = [
+        dict(results[url], url=url, referenced_in=url_refs[url])
+        for url in url_refs
+    ]
+    invalid = [link for link in links if not link["valid"]]
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": [str(f) for f in files],
+        "summary": {
+            "total": len(links),
+            "valid": len(links) - len(invalid),
+            "invalid": len(invalid),
+            "cached": sum(1 for link in links if link["cached"]),
+        },
+        "links": links,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate one URL, or every URL in a project's markdown files.")
+    parser.add_argument("url", nargs="?", help="Single URL to check")
+    parser.add_argument("--project", help="Check every URL in the project's *.md files")
+    parser.add_argument("--files", nargs="+", help="Markdown files to scan for URLs")
+    parser.add_argument("--report", help=f"JSON report path (default: <project>/{REPORT_FILE})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Max checks in flight")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Max concurrent checks per host")
+    parser.add_argument("--ttl-hours", type=float, default=DEFAULT_TTL_HOURS, help="Reuse results younger than this")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every URL")
+    args = parser.parse_args()
+
+    if args.url and not (args.project or args.files):
+        success, msg = check_link(args.url)
         print(f"{'VALID' if success else 'INVALID'}: {msg}")
-    else:
-        print("Usage: python link_checker.py [URL]")
+        return
+
+    if not (args.project or args.files):
+        parser.print_usage()
+        sys.exit(1)
+
+    project = Path(args.project) if args.project else None
+    files = [Path(f) for f in args.files] if args.files else sorted(project.glob("*.md"))
+    cache_path = (project or Path(files[0]).parent) / CACHE_FILE if files else None
+    report = check_links_bulk(
+        files,
+        cache_path=cache_path,
+        ttl_hours=args.ttl_hours,
+        use_cache=not args.no_cache,
+        concurrency=args.concurrency,
+        per_host=args.per_host
+    )
+
+    report_path = Path(args.report) if args.report else (project or Path(".")) / REPORT_FILE
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    summary = report["summary"]
+    print(f"\n📋 Link Check: {summary['valid']}/{summary['total']} valid "
+          f"({summary['invalid']} invalid, {summary['cached']} from cache)")
+    for link in report["links"]:
+        if not link["valid"]:
+            print(f"  INVALID: {link['url']} - {link['message']}")
+    print(f"[SAVE] Report written to {report_path}")
+    sys.exit(1 if summary["invalid"] else 0)
+
+
+if __name__ == "__main__":
+    main()
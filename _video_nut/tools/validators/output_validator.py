@@ -117,31 +117,72 @@ def validate_manifest(manifest_path):
         
     return True, f"Valid asset manifest (found {len(urls)} verified URLs)"
 
+class GateResult:
+    """Structured outcome of a validation gate."""
+    def __init__(self, gate, file_path, passed, message):
+        self.gate = gate
+        self.file_path = file_path
+        self.passed = passed
+        self.message = message
+
+    def __bool__(self):
+        return self.passed
+
+    def summary(self):
+        if self.passed:
+            return f"[OK] Validation PASSED: {self.message}"
+        return f"[FAIL] Validation FAILED: {self.message}"
+
+    def to_dict(self):
+        return {
+            "gate": self.gate,
+            "file_path": self.file_path,
+            "passed": self.passed,
+            "message": self.message
+        }
+
+
+# Gate registry: validation type -> validator returning (success, message)
+GATES = {
+    "dossier": validate_dossier,
+    "script": validate_script,
+    "manifest": validate_manifest,
+}
+
+
+def run_gate(val_type, file_path):
+    """
+    Runs a registered validation gate in-process.
+
+    Returns:
+        GateResult: The gate outcome (truthy if the gate passed)
+    """
+    validator = GATES.get(val_type.lower())
+    if validator is None:
+        return GateResult(val_type, file_path, False, f"Unknown validation type: {val_type}")
+    try:
+        success, msg = validator(file_path)
+    except Exception as e:
+        success, msg = False, f"Validator crashed: {str(e)}"
+    return GateResult(val_type.lower(), file_path, success, msg)
+
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: python output_validator.py <type> <file_path>")
-        print("Types: dossier, script, manifest")
+        print(f"Types: {', '.join(GATES)}")
         sys.exit(1)
         
     val_type = sys.argv[1].lower()
     file_path = sys.argv[2]
     
-    if val_type == "dossier":
-        success, msg = validate_dossier(file_path)
-    elif val_type == "script":
-        success, msg = validate_script(file_path)
-    elif val_type == "manifest":
-        success, msg = validate_manifest(file_path)
-    else:
+    if val_type not in GATES:
         print(f"Unknown validation type: {val_type}")
         sys.exit(1)
         
-    if success:
-        print(f"[OK] Validation PASSED: {msg}")
-        sys.exit(0)
-    else:
-        print(f"[FAIL] Validation FAILED: {msg}")
-        sys.exit(1)
+    result = run_gate(val_type, file_path)
+    print(result.summary())
+    sys.exit(0 if result.passed else 1)
 
 if __name__ == "__main__":
     main()
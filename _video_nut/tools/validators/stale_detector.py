@@ -1,5 +1,7 @@
 import os
 import sys
+import json
+import hashlib
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
@@ -7,70 +9,164 @@ if hasattr(sys.stdout, 'reconfigure'):
 if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8')
 
-def detect_stale_stages(project_path):
+# Stored next to .workflow_checkpoint.json in the project folder
+DIGEST_MANIFEST = ".stage_digests.json"
+
+# Pipeline wiring: stage -> (input files, output files). Mirrors STAGE_GRAPH in workflow_orchestrator.py
+STAGE_FILES = {
+    "investigation": (["topic_brief.md"], ["truth_dossier.md"]),
+    "scriptwriting": (["truth_dossier.md"], ["narrative_script.md"]),
+    "direction": (["narrative_script.md"], ["master_script.md"]),
+    "scavenging": (["master_script.md"], ["asset_manifest.md"]),
+    "visionary": (["master_script.md"], ["visual_prompts.md"]),
+    "archiving": (["asset_manifest.md"], ["assets/"]),
+}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def load_digest_manifest(project_path):
+    """Loads the stage digest manifest, returning an empty one if missing or unreadable."""
+    manifest_path = os.path.join(project_path, DIGEST_MANIFEST)
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data.setdefault("stages", {})
+            data.setdefault("files", {})
+            return data
+        except Exception:
+            pass
+    return {"stages": {}, "files": {}}
+
+
+def save_digest_manifest(project_path, manifest):
+    """Writes the digest manifest atomically (temp file then rename)."""
+    manifest_path = os.path.join(project_path, DIGEST_MANIFEST)
+    temp_path = manifest_path + ".tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, manifest_path)
+    except Exception as e:
+        print(f"⚠️  Failed to save digest manifest: {str(e)}")
+
+
+def file_digest(path, file_cache, cache_key):
     """
-    Checks modification times of pipeline deliverables to determine if any downstream files are stale.
-    Pipeline flow:
-    topic_brief.md -> truth_dossier.md -> narrative_script.md -> master_script.md -> (asset_manifest.md & visual_prompts.md) -> assets/
-    
-    Returns:
-        dict: A mapping of stage_name -> boolean (True if stale, False otherwise)
+    Returns the SHA-256 of a file. If inode, size and mtime match the cached
+    signature the stored digest is reused without reading the file.
+    """
+    st = os.stat(path)
+    signature = [st.st_ino, st.st_size, st.st_mtime_ns]
+    cached = file_cache.get(cache_key)
+    if cached and cached.get("sig") == signature:
+        return cached["sha256"]
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    file_cache[cache_key] = {"sig": signature, "sha256": digest}
+    return digest
+
+
+def path_digest(project_path, rel_path, file_cache):
+    """
+    Digest of a project-relative file or directory, or None if it does not exist.
+    Directories hash the sorted (relative path, file digest) pairs of their contents.
+    """
+    full_path = os.path.join(project_path, rel_path)
+    if os.path.isfile(full_path):
+        return file_digest(full_path, file_cache, rel_path.replace("\\", "/"))
+    if not os.path.isdir(full_path):
+        return None
+
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(full_path):
+        dirs.sort()
+        for name in sorted(files):
+            child = os.path.join(root, name)
+            child_rel = os.path.relpath(child, project_path).replace("\\", "/")
+            h.update(child_rel.encode('utf-8') + b"\0")
+            h.update(file_digest(child, file_cache, child_rel).encode('ascii') + b"\n")
+    return "dir:" + h.hexdigest()
+
+
+def record_stage_digests(project_path, stage, inputs=None, outputs=None):
+    """
+    Records the digests of a stage's inputs at completion time. A later
+    detect_stale_stages() only invalidates the stage if those bytes change.
+    """
+    default_inputs, default_outputs = STAGE_FILES.get(stage, ([], []))
+    inputs = default_inputs if inputs is None else inputs
+    outputs = default_outputs if outputs is None else outputs
+
+    manifest = load_digest_manifest(project_path)
+    manifest["stages"][stage] = {
+        "inputs": {rel: path_digest(project_path, rel, manifest["files"]) for rel in inputs},
+        "outputs": list(outputs),
+    }
+    save_digest_manifest(project_path, manifest)
+
+
+def detect_stale_by_mtime(project_path):
+    """
+    Legacy check for stages completed before digests were recorded: a stage is
+    directly stale if any of its inputs is newer than its outputs.
     """
-    brief_path = os.path.join(project_path, "topic_brief.md")
-    dossier_path = os.path.join(project_path, "truth_dossier.md")
-    script_path = os.path.join(project_path, "narrative_script.md")
-    master_path = os.path.join(project_path, "master_script.md")
-    manifest_path = os.path.join(project_path, "asset_manifest.md")
-    prompts_path = os.path.join(project_path, "visual_prompts.md")
-    assets_dir = os.path.join(project_path, "assets")
-
-    # Helper to get mtime, returns 0 if doesn't exist
     def get_mtime(path):
         if os.path.exists(path):
             return os.path.getmtime(path)
         return 0
 
-    t_brief = get_mtime(brief_path)
-    t_dossier = get_mtime(dossier_path)
-    t_script = get_mtime(script_path)
-    t_master = get_mtime(master_path)
-    t_manifest = get_mtime(manifest_path)
-    t_prompts = get_mtime(prompts_path)
-    
-    stale_stages = {
-        "investigation": False,
-        "scriptwriting": False,
-        "direction": False,
-        "scavenging": False,
-        "visionary": False,
-        "archiving": False
-    }
+    direct = {}
+    for stage, (inputs, outputs) in STAGE_FILES.items():
+        t_in = max([get_mtime(os.path.join(project_path, rel)) for rel in inputs] or [0])
+        t_out = min([get_mtime(os.path.join(project_path, rel)) for rel in outputs] or [0])
+        direct[stage] = t_in > 0 and t_out > 0 and t_in > t_out
+    return direct
 
-    # 1. Investigation is stale if topic_brief.md is newer than truth_dossier.md
-    if t_brief > 0 and t_dossier > 0 and t_brief > t_dossier:
-        stale_stages["investigation"] = True
-        
-    # 2. Scriptwriting is stale if truth_dossier.md is newer than narrative_script.md, or if investigation is stale
-    if (t_dossier > 0 and t_script > 0 and t_dossier > t_script) or stale_stages["investigation"]:
-        stale_stages["scriptwriting"] = True
 
-    # 3. Direction is stale if narrative_script.md is newer than master_script.md, or if scriptwriting is stale
-    if (t_script > 0 and t_master > 0 and t_script > t_master) or stale_stages["scriptwriting"]:
-        stale_stages["direction"] = True
+def detect_stale_stages(project_path):
+    """
+    Checks the recorded input digests of each pipeline stage to determine which stages are stale.
+    Pipeline flow:
+    topic_brief.md -> truth_dossier.md -> narrative_script.md -> master_script.md -> (asset_manifest.md & visual_prompts.md) -> assets/
+
+    A stage is stale when the content of one of its inputs differs from what it was
+    built from, or when an upstream stage is stale. Stages without recorded digests
+    fall back to the mtime comparison.
+
+    Returns:
+        dict: A mapping of stage_name -> boolean (True if stale, False otherwise)
+    """
+    manifest = load_digest_manifest(project_path)
+    recorded = manifest["stages"]
+    legacy = None
 
-    # 4. Scavenging is stale if master_script.md is newer than asset_manifest.md, or if direction is stale
-    if (t_master > 0 and t_manifest > 0 and t_master > t_manifest) or stale_stages["direction"]:
-        stale_stages["scavenging"] = True
+    stale_stages = {}
+    for stage in STAGE_FILES:
+        if stage in recorded:
+            stale_stages[stage] = any(
+                path_digest(project_path, rel, manifest["files"]) != digest
+                for rel, digest in recorded[stage]["inputs"].items()
+            )
+        else:
+            if legacy is None:
+                legacy = detect_stale_by_mtime(project_path)
+            stale_stages[stage] = legacy[stage]
 
-    # 5. Visionary is stale if master_script.md is newer than visual_prompts.md, or if direction is stale
-    if (t_master > 0 and t_prompts > 0 and t_master > t_prompts) or stale_stages["direction"]:
-        stale_stages["visionary"] = True
+    # Propagate downstream: a stage consuming an output of a stale stage is stale too
+    for stage, (inputs, _) in STAGE_FILES.items():
+        for upstream, (_, up_outputs) in STAGE_FILES.items():
+            if upstream != stage and stale_stages[upstream] and set(inputs) & set(up_outputs):
+                stale_stages[stage] = True
 
-    # 6. Archiving is stale if asset_manifest.md is newer than the assets directory (or if scavenging is stale)
-    # Since assets is a directory, we can check if its creation/modification is older than asset_manifest.md
-    t_assets = get_mtime(assets_dir)
-    if (t_manifest > 0 and t_assets > 0 and t_manifest > t_assets) or stale_stages["scavenging"]:
-        stale_stages["archiving"] = True
+    # Persist refreshed fast-path signatures so the next scan skips re-hashing
+    if recorded:
+        save_digest_manifest(project_path, manifest)
 
     return stale_stages
 
@@ -78,21 +174,22 @@ def main():
     if len(sys.argv) < 2:
         print("Usage: python stale_detector.py <project_path>")
         sys.exit(1)
-        
+
     project_path = sys.argv[1]
     if not os.path.exists(project_path):
         print(f"[FAIL] Project path '{project_path}' does not exist.")
         sys.exit(1)
-        
+
     stale = detect_stale_stages(project_path)
-    
+    recorded = load_digest_manifest(project_path)["stages"]
+
     print("📋 Stale Stages Report:")
     for stage, is_stale in stale.items():
         status = "⚠️  STALE (needs re-run)" if is_stale else "[OK] Up-to-date"
-        print(f"  - {stage}: {status}")
-        
+        mode = "content-hash" if stage in recorded else "mtime"
+        print(f"  - {stage}: {status} ({mode})")
+
     # Output JSON representation for orchestrator parsing
-    import json
     print("STALE_JSON:" + json.dumps(stale))
 
 if __name__ == "__main__":
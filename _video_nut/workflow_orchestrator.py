@@ -12,6 +12,10 @@ import json
 from datetime import datetime
 import shutil
 import concurrent.futures
+import glob
+import threading
+import time
+from contextlib import contextmanager
 
 # Enforce UTF-8 output encoding for Windows terminal safety
 if hasattr(sys.stdout, 'reconfigure'):
@@ -19,29 +23,192 @@ if hasattr(sys.stdout, 'reconfigure'):
 if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8')
 
-STAGE_ORDER = [
-    "investigation",
-    "scriptwriting",
-    "direction",
-    "scavenging",
-    "visionary",
-    "archiving"
-]
+try:
+    from tools.validators import stale_detector
+    has_stale_detector = True
+except ImportError:
+    has_stale_detector = False
+
+try:
+    from tools.validators import output_validator
+    has_output_validator = True
+except ImportError:
+    has_output_validator = False
+
+try:
+    from tools import agent_runner
+    has_agent_runner = True
+except ImportError:
+    has_agent_runner = False
+
+try:
+    from tools.logging import audit_logger
+    has_audit_logger = True
+except ImportError:
+    has_audit_logger = False
+
+GATE_MODES = ["inprocess", "subprocess"]
+
+# Wall-clock limits per agent run (seconds); --agent-timeout overrides all of them
+DEFAULT_AGENT_TIMEOUT = 1800
+AGENT_TIMEOUTS = {
+    "investigator": 3600,
+    "scavenger": 2700,
+    "archivist": 3600,
+}
+
+# Declarative stage graph. Each stage lists the project files it reads and
+# writes; a stage becomes runnable as soon as every stage producing one of its
+# inputs has completed. Inputs that no stage produces (e.g. topic_brief.md) are
+# external and never block scheduling. New stages only need an entry here.
+STAGE_GRAPH = {
+    "investigation": {
+        "agent": "investigator",
+        "label": "Investigation",
+        "banner": "[SCAN] --- Phase 1: Investigation ---",
+        "inputs": ["topic_brief.md"],
+        "outputs": ["truth_dossier.md"],
+        "gate": "dossier",
+        "task": "Create truth_dossier.md with research findings",
+    },
+    "scriptwriting": {
+        "agent": "scriptwriter",
+        "label": "Scriptwriting",
+        "banner": "[WRITE] --- Phase 2: Scriptwriting ---",
+        "inputs": ["truth_dossier.md"],
+        "outputs": ["narrative_script.md"],
+        "gate": "script",
+        "task": "Create narrative_script.md from the dossier",
+    },
+    "direction": {
+        "agent": "director",
+        "label": "Direction",
+        "banner": "[WORKFLOW] --- Phase 3: Direction ---",
+        "inputs": ["narrative_script.md"],
+        "outputs": ["master_script.md"],
+        "gate": None,
+        "task": "Create master_script.md with visual directions",
+    },
+    "scavenging": {
+        "agent": "scavenger",
+        "label": "Scavenging",
+        "banner": "[PARALLEL] --- Phase 4: Scavenging ---",
+        "inputs": ["master_script.md"],
+        "outputs": ["asset_manifest.md"],
+        "gate": "manifest",
+        "task": "Create asset_manifest.md",
+    },
+    "visionary": {
+        "agent": "visionary",
+        "label": "Visioning (AI Prompts)",
+        "banner": "[PARALLEL] --- Phase 5: Visionary ---",
+        "inputs": ["master_script.md"],
+        "outputs": ["visual_prompts.md"],
+        "gate": None,
+        "task": "Create visual_prompts.md",
+    },
+    "archiving": {
+        "agent": "archivist",
+        "label": "Archiving",
+        "banner": "[SAVE] --- Phase 6: Archiving ---",
+        "inputs": ["asset_manifest.md"],
+        "outputs": ["assets/"],
+        "gate": None,
+        "task": "Download all assets to assets/ folder",
+    },
+}
+
+STAGE_ORDER = list(STAGE_GRAPH)
+
+
+def stage_dependencies(graph=STAGE_GRAPH):
+    """
+    Derives the upstream stages of every stage from the declared inputs/outputs.
+
+    Returns:
+        dict: A mapping of stage_name -> set of stage names it must wait for
+    """
+    producers = {}
+    for stage, spec in graph.items():
+        for output in spec["outputs"]:
+            producers[output] = stage
+
+    deps = {}
+    for stage, spec in graph.items():
+        deps[stage] = {
+            producers[item] for item in spec["inputs"]
+            if item in producers and producers[item] != stage
+        }
+    return deps
+
+
+class AgentSlotPool:
+    """
+    Bounded pool of agent slots shared by the orchestrators of a batch run.
+    When slots are contended, a free slot goes to the waiting project that
+    currently holds the fewest slots (oldest request first), so a project with
+    several runnable stages cannot starve the others.
+    """
+    def __init__(self, size):
+        self.size = max(1, size)
+        self._cond = threading.Condition()
+        self._in_use = {}
+        self._waiting = []
+        self._tickets = 0
+
+    def _next_waiter(self):
+        return min(self._waiting, key=lambda t: (self._in_use.get(t[0], 0), t[1]))
+
+    def acquire(self, project):
+        with self._cond:
+            self._tickets += 1
+            ticket = (project, self._tickets)
+            self._waiting.append(ticket)
+            while sum(self._in_use.values()) >= self.size or self._next_waiter() != ticket:
+                self._cond.wait()
+            self._waiting.remove(ticket)
+            self._in_use[project] = self._in_use.get(project, 0) + 1
+            # Another slot may still be free for the next waiter in line
+            self._cond.notify_all()
+
+    def release(self, project):
+        with self._cond:
+            self._in_use[project] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, project):
+        self.acquire(project)
+        try:
+            yield
+        finally:
+            self.release(project)
+
 
 class VideoNutOrchestrator:
-    def __init__(self, project_path, cli_runner="auto", force=False, rework_limit=3):
+    def __init__(self, project_path, cli_runner="auto", force=False, rework_limit=3, max_workers=2,
+                 slot_pool=None, sync_config=True, gate_mode="inprocess", agent_timeout=None):
         self.project_path = os.path.abspath(project_path)
         self.project_name = os.path.basename(self.project_path)
         self.checkpoint_file = os.path.join(self.project_path, ".workflow_checkpoint.json")
         self.force = force
         self.rework_limit = rework_limit
+        self.max_workers = max(1, max_workers)
+        # Shared agent slots when running as part of a multi-project batch
+        self.slot_pool = slot_pool
+        # "inprocess" calls the gate registry directly; "subprocess" isolates each check
+        self.gate_mode = gate_mode
+        self.agent_timeout = agent_timeout
+        self.log_dir = os.path.join(self.project_path, "logs")
         
         # Determine CLI runner
         self.cli_runner = self.detect_cli_runner(cli_runner)
         self.checkpoints = self.load_checkpoints()
-        self.ensure_config_sync()
+        if sync_config:
+            self.ensure_config_sync()
         
-    def detect_cli_runner(self, requested):
+    @staticmethod
+    def detect_cli_runner(requested):
         if requested in ["claude", "gemini", "opencode", "qwen", "mock"]:
             return requested
             
@@ -111,34 +278,78 @@ class VideoNutOrchestrator:
 
     def run_agent_cli(self, agent_name):
         """
-        Executes an agent command using the designated CLI runner.
+        Executes an agent command using the designated CLI runner, holding one of
+        the shared agent slots for the duration when running in batch mode.
         """
+        if self.slot_pool is None:
+            return self._invoke_agent_cli(agent_name)
+        with self.slot_pool.slot(self.project_name):
+            return self._invoke_agent_cli(agent_name)
+
+    def _invoke_agent_cli(self, agent_name):
         if self.cli_runner == "mock":
             return self.run_mock_agent(agent_name)
             
+        # Every runner is told the project explicitly: in batch mode config.yaml's
+        # current_project is not synced and may name a different project
+        prompt = f"Run {agent_name} for project {self.project_name}"
         cmd_parts = []
         if self.cli_runner == "claude":
-            cmd_parts = ["claude", "-p", f"Run {agent_name} for project {self.project_name}"]
+            cmd_parts = ["claude", "-p", prompt]
         elif self.cli_runner == "gemini":
-            cmd_parts = ["gemini", "-p", f"Run {agent_name} for project {self.project_name}"]
+            cmd_parts = ["gemini", "-p", prompt]
         elif self.cli_runner == "opencode":
-            cmd_parts = ["opencode", "run", agent_name]
+            cmd_parts = ["opencode", "run", prompt]
         elif self.cli_runner == "qwen":
-            cmd_parts = ["qwen", agent_name]
+            cmd_parts = ["qwen", "-p", prompt]
             
         cmd_str = " ".join(cmd_parts)
         print(f"[AGENT] Programmatically invoking agent: '{agent_name}' using {self.cli_runner}...")
         print(f"   Command: {cmd_str}")
         
+        # We run relative to the workspace root directory
+        workspace_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        timeout = self.agent_timeout or AGENT_TIMEOUTS.get(agent_name, DEFAULT_AGENT_TIMEOUT)
+
+        if not has_agent_runner:
+            return self.run_agent_cli_blocking(agent_name, cmd_parts, workspace_root, timeout)
+
+        log_path = os.path.join(self.log_dir, f"{agent_name}.log")
+        print(f"   Streaming output to: {log_path} (timeout: {timeout}s)")
         try:
-            # We run relative to the workspace root directory
-            workspace_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            result = subprocess.run(
+            result = agent_runner.get_default_runner().run(
                 cmd_parts,
-                shell=True,
+                label=agent_name,
+                log_path=log_path,
+                cwd=workspace_root,
+                timeout=timeout
+            )
+        except Exception as e:
+            print(f"[FAIL] Subprocess execution error for agent '{agent_name}': {str(e)}")
+            return False
+
+        if result.success:
+            print(f"[OK] Agent '{agent_name}' completed execution successfully ({result.elapsed:.0f}s).")
+            return True
+        if result.timed_out:
+            print(f"[FAIL] Agent '{agent_name}' timed out after {timeout}s and was terminated.")
+        elif result.error:
+            print(f"[FAIL] Agent '{agent_name}' could not be started: {result.error}")
+        else:
+            print(f"[FAIL] Agent '{agent_name}' execution failed (exit code {result.returncode}).")
+        print(f"   See log: {log_path}")
+        return False
+
+    def run_agent_cli_blocking(self, agent_name, cmd_parts, workspace_root, timeout):
+        """Fallback runner used when tools/agent_runner.py is unavailable (buffers all output)."""
+        try:
+            executable = shutil.which(cmd_parts[0]) or cmd_parts[0]
+            result = subprocess.run(
+                [executable] + cmd_parts[1:],
                 capture_output=True,
                 encoding='utf-8',
-                cwd=workspace_root
+                cwd=workspace_root,
+                timeout=timeout
             )
             
             if result.returncode == 0:
@@ -149,6 +360,9 @@ class VideoNutOrchestrator:
                 print(f"STDOUT: {result.stdout}")
                 print(f"STDERR: {result.stderr}")
                 return False
+        except subprocess.TimeoutExpired:
+            print(f"[FAIL] Agent '{agent_name}' timed out after {timeout}s.")
+            return False
         except Exception as e:
             print(f"[FAIL] Subprocess execution error for agent '{agent_name}': {str(e)}")
             return False
@@ -300,13 +514,24 @@ We are specifying the URLs and time ranges for the clips to be trimmed by the Ar
         return True
 
     def run_validation_gate(self, val_type, file_path):
-        """Runs the output_validator.py script as a gate check."""
+        """Runs an output_validator gate check, in-process unless subprocess isolation is requested."""
+        print(f"[GATE]  Running validation gate for '{val_type}' on '{os.path.basename(file_path)}'...")
+        if self.gate_mode == "inprocess" and has_output_validator:
+            result = output_validator.run_gate(val_type, file_path)
+            if result.passed:
+                print(f"  {result.summary()}")
+            else:
+                print(f"[FAIL] Gate FAILED: {result.summary()}")
+            return result.passed
+        return self.run_validation_gate_subprocess(val_type, file_path)
+
+    def run_validation_gate_subprocess(self, val_type, file_path):
+        """Runs the output_validator.py script in a child interpreter as a gate check."""
         validator_script = os.path.join(os.path.dirname(__file__), "tools", "validators", "output_validator.py")
         if not os.path.exists(validator_script):
             print(f"⚠️  Validator script '{validator_script}' not found. Skipping gate.")
             return True
             
-        print(f"[GATE]  Running validation gate for '{val_type}' on '{os.path.basename(file_path)}'...")
         try:
             result = subprocess.run(
                 [sys.executable, validator_script, val_type, file_path],
@@ -325,160 +550,123 @@ We are specifying the URLs and time ranges for the clips to be trimmed by the Ar
             return False
 
     def run_stale_detection(self):
-        """Runs the stale_detector.py script to flag outdated files."""
-        detector_script = os.path.join(os.path.dirname(__file__), "tools", "validators", "stale_detector.py")
-        if not os.path.exists(detector_script):
-            return
-            
+        """Flags outdated stages via stale_detector, in-process unless subprocess isolation is requested."""
         print("[SCAN] Scanning for stale pipeline stages...")
         try:
-            result = subprocess.run(
-                [sys.executable, detector_script, self.project_path],
-                capture_output=True,
-                encoding='utf-8'
-            )
-            for line in result.stdout.splitlines():
-                if line.startswith("STALE_JSON:"):
-                    stale_data = json.loads(line.replace("STALE_JSON:", "").strip())
-                    for stage, is_stale in stale_data.items():
-                        if is_stale:
-                            key = f"{stage}_complete" if stage != "scavenging" else "scavenging_complete"
-                            if self.checkpoints.get(key, False):
-                                print(f"  - Resetting stale stage '{stage}' to incomplete.")
-                                self.checkpoints[key] = False
+            if self.gate_mode == "inprocess" and has_stale_detector:
+                stale_data = stale_detector.detect_stale_stages(self.project_path)
+            else:
+                stale_data = self.run_stale_detection_subprocess()
+            if stale_data is None:
+                return
+            for stage, is_stale in stale_data.items():
+                key = f"{stage}_complete"
+                if is_stale and self.checkpoints.get(key, False):
+                    print(f"  - Resetting stale stage '{stage}' to incomplete.")
+                    self.checkpoints[key] = False
             self.save_checkpoints()
         except Exception as e:
             print(f"⚠️  Failed to run stale detector: {str(e)}")
 
-    def run_investigation(self):
-        if self.checkpoints["investigation_complete"] and not self.force:
-            print("[SKIP] Investigation stage already completed, skipping...")
-            return True
-            
-        print("\n[SCAN] --- Phase 1: Investigation ---")
-        success = self.run_agent_cli("investigator")
-        if not success:
-            return False
-            
-        dossier_path = os.path.join(self.project_path, "truth_dossier.md")
-        if not self.run_validation_gate("dossier", dossier_path):
-            return False
-            
-        self.checkpoints["investigation_complete"] = True
-        self.checkpoints["last_step"] = "investigation"
-        self.save_checkpoints()
-        return True
-        
-    def run_scriptwriting(self):
-        if self.checkpoints["scriptwriting_complete"] and not self.force:
-            print("[SKIP] Scriptwriting stage already completed, skipping...")
-            return True
+    def run_stale_detection_subprocess(self):
+        """Runs the stale_detector.py script in a child interpreter and parses its STALE_JSON line."""
+        detector_script = os.path.join(os.path.dirname(__file__), "tools", "validators", "stale_detector.py")
+        if not os.path.exists(detector_script):
+            return None
             
-        print("\n[WRITE] --- Phase 2: Scriptwriting ---")
-        success = self.run_agent_cli("scriptwriter")
+        result = subprocess.run(
+            [sys.executable, detector_script, self.project_path],
+            capture_output=True,
+            encoding='utf-8'
+        )
+        for line in result.stdout.splitlines():
+            if line.startswith("STALE_JSON:"):
+                return json.loads(line.replace("STALE_JSON:", "").strip())
+        return None
+
+    def run_stage(self, stage):
+        """Runs a stage's agent followed by its validation gate, if it declares one."""
+        spec = STAGE_GRAPH[stage]
+        print(f"\n{spec['banner']}")
+        success = self.run_agent_cli(spec["agent"])
         if not success:
             return False
-            
-        script_path = os.path.join(self.project_path, "narrative_script.md")
-        if not self.run_validation_gate("script", script_path):
-            return False
-            
-        self.checkpoints["scriptwriting_complete"] = True
-        self.checkpoints["last_step"] = "scriptwriting"
-        self.save_checkpoints()
+
+        if spec.get("gate"):
+            output_path = os.path.join(self.project_path, spec["outputs"][0])
+            if not self.run_validation_gate(spec["gate"], output_path):
+                return False
         return True
 
-    def run_direction(self):
-        if self.checkpoints["direction_complete"] and not self.force:
-            print("[SKIP] Direction stage already completed, skipping...")
-            return True
-            
-        print("\n[WORKFLOW] --- Phase 3: Direction ---")
-        success = self.run_agent_cli("director")
-        if not success:
-            return False
-            
-        self.checkpoints["direction_complete"] = True
-        self.checkpoints["last_step"] = "direction"
+    def mark_stage_complete(self, stage):
+        """
+        Checkpoints a finished stage, records the content digests of its inputs for
+        stale detection, brings the project's audit_log.md up to date, and advances
+        last_step past every completed stage.
+        """
+        if has_stale_detector:
+            spec = STAGE_GRAPH[stage]
+            stale_detector.record_stage_digests(self.project_path, stage, spec["inputs"], spec["outputs"])
+        if has_audit_logger:
+            # Entries still queued for background sync must land before the report is rendered
+            audit_logger.flush_pending()
+            audit_logger.update_report(self.project_path)
+        self.checkpoints[f"{stage}_complete"] = True
+        for name in STAGE_ORDER:
+            if not self.checkpoints.get(f"{name}_complete", False):
+                break
+            self.checkpoints["last_step"] = name
         self.save_checkpoints()
-        return True
 
-    def run_visionary_stage(self):
-        if self.checkpoints.get("visionary_complete", False) and not self.force:
-            return True
-        success = self.run_agent_cli("visionary")
-        if success:
-            self.checkpoints["visionary_complete"] = True
-            self.save_checkpoints()
-            return True
-        return False
+    def run_stage_graph(self):
+        """
+        Runs every pending stage of STAGE_GRAPH, launching each one as soon as the
+        stages producing its inputs are complete, on up to max_workers threads.
+        """
+        deps = stage_dependencies()
+        pending = []
+        for stage in STAGE_ORDER:
+            if self.checkpoints.get(f"{stage}_complete", False) and not self.force:
+                print(f"[SKIP] {STAGE_GRAPH[stage]['label']} stage already completed, skipping...")
+            else:
+                pending.append(stage)
 
-    def run_scavenging_stage(self):
-        if self.checkpoints.get("scavenging_complete", False) and not self.force:
-            return True
-        success = self.run_agent_cli("scavenger")
-        if not success:
-            return False
-            
-        manifest_path = os.path.join(self.project_path, "asset_manifest.md")
-        if not self.run_validation_gate("manifest", manifest_path):
-            return False
-            
-        self.checkpoints["scavenging_complete"] = True
-        self.save_checkpoints()
-        return True
+        done = {stage for stage in STAGE_ORDER if stage not in pending}
+        running = {}
+        success = True
 
-    def run_parallel_visionary_and_scavenger(self):
-        run_vis = not self.checkpoints.get("visionary_complete", False) or self.force
-        run_scav = not self.checkpoints.get("scavenging_complete", False) or self.force
-        
-        if not run_vis and not run_scav:
-            print("[SKIP] Visionary and Scavenging stages already completed, skipping...")
-            return True
-            
-        print("\n[PARALLEL] --- Phase 4 & 5: Parallel Visionary & Scavenging ---")
-        
-        def run_one_agent(name, func):
-            print(f"[RUN] [Parallel Thread] Spawning {name}...")
-            return func()
-            
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {}
-            if run_vis:
-                futures[executor.submit(run_one_agent, "Visionary", self.run_visionary_stage)] = "Visionary"
-            if run_scav:
-                futures[executor.submit(run_one_agent, "Scavenger", self.run_scavenging_stage)] = "Scavenger"
-                
-            success = True
-            for future in concurrent.futures.as_completed(futures):
-                name = futures[future]
-                res = future.result()
-                if res:
-                    print(f"[OK] Parallel Thread '{name}' completed successfully!")
-                else:
-                    print(f"[FAIL] Parallel Thread '{name}' FAILED!")
-                    success = False
-                    
-        if success:
-            self.checkpoints["last_step"] = "scavenging" # sets checkpoint pointer
-            self.save_checkpoints()
-            return True
-        return False
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if success:
+                    for stage in [s for s in pending if deps[s] <= done]:
+                        pending.remove(stage)
+                        print(f"[RUN] [Scheduler] Launching stage '{stage}' (inputs ready)")
+                        running[executor.submit(self.run_stage, stage)] = stage
 
-    def run_archiving(self):
-        if self.checkpoints["archiving_complete"] and not self.force:
-            print("[SKIP] Archiving stage already completed, skipping...")
-            return True
-            
-        print("\n[SAVE] --- Phase 6: Archiving ---")
-        success = self.run_agent_cli("archivist")
-        if not success:
-            return False
-            
-        self.checkpoints["archiving_complete"] = True
-        self.checkpoints["last_step"] = "archiving"
-        self.save_checkpoints()
-        return True
+                if not running:
+                    if success and pending:
+                        print(f"[FAIL] Stages {pending} have unsatisfiable inputs in STAGE_GRAPH.")
+                        success = False
+                    break
+
+                finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    try:
+                        res = future.result()
+                    except Exception as e:
+                        print(f"[FAIL] Stage '{stage}' raised an error: {str(e)}")
+                        res = False
+
+                    if res:
+                        print(f"[OK] Stage '{stage}' completed successfully!")
+                        done.add(stage)
+                        self.mark_stage_complete(stage)
+                    else:
+                        print(f"[FAIL] Stage '{stage}' FAILED! Waiting for running stages to finish...")
+                        success = False
+
+        return success
 
     def run_eic_review_and_rework(self):
         """Runs the EIC quality audit and loops if rework is required."""
@@ -538,6 +726,7 @@ We are specifying the URLs and time ranges for the clips to be trimmed by the Ar
         print("[WORKFLOW] Starting VideoNut Programmatic Video Production Workflow")
         print(f"Project Path: {self.project_path}")
         print(f"Selected Runner: '{self.cli_runner}'")
+        print(f"Stage Workers: {self.max_workers}")
         
         # 1. Stale detection and reset
         self.run_stale_detection()
@@ -548,24 +737,8 @@ We are specifying the URLs and time ranges for the clips to be trimmed by the Ar
             # Reload checkpoints to get any resets from auto_rework
             self.checkpoints = self.load_checkpoints()
             
-            # Stage 1: Investigation
-            if not self.run_investigation():
-                return False
-                
-            # Stage 2: Scriptwriting
-            if not self.run_scriptwriting():
-                return False
-                
-            # Stage 3: Direction
-            if not self.run_direction():
-                return False
-                
-            # Stage 4 & 5: Parallel Visionary and Scavenging
-            if not self.run_parallel_visionary_and_scavenger():
-                return False
-                
-            # Stage 6: Archiving
-            if not self.run_archiving():
+            # Stages 1-6: run the stage graph, each stage as soon as its inputs are ready
+            if not self.run_stage_graph():
                 return False
                 
             # Stage 7: EIC Audit and Rework Loop check
@@ -584,18 +757,131 @@ We are specifying the URLs and time ranges for the clips to be trimmed by the Ar
         print("\n[SUCCESS] Complete video production pipeline finished successfully!")
         return True
 
+def resolve_batch_projects(projects_glob=None, projects_folder=None):
+    """Expands --projects / --projects-folder into a sorted list of project directories."""
+    if projects_folder:
+        candidates = [os.path.join(projects_folder, name) for name in os.listdir(projects_folder)]
+    else:
+        candidates = glob.glob(projects_glob)
+    return sorted(
+        os.path.abspath(path) for path in candidates
+        if os.path.isdir(path) and not os.path.basename(path).startswith(('.', '_'))
+    )
+
+
+def print_batch_report(orchestrators, results):
+    """Prints one aggregated status table for a batch of projects."""
+    print("\n📊 VideoNut Batch Status")
+    print("=" * 70)
+    print(f"{'Project':<30} {'Result':<10} {'Last step':<15} {'Rework':<7} {'Time':>6}")
+    print("-" * 70)
+    for orch in orchestrators:
+        res = results.get(orch.project_path)
+        if res is None:
+            result_str, elapsed = "-", "-"
+        else:
+            result_str = "[OK]" if res["success"] else "[FAIL]"
+            elapsed = f"{res['elapsed']:.0f}s"
+        print(f"{orch.project_name[:30]:<30} {result_str:<10} {orch.checkpoints.get('last_step', 'none'):<15} "
+              f"{orch.checkpoints.get('rework_iterations', 0):<7} {elapsed:>6}")
+    print("-" * 70)
+    if results:
+        passed = sum(1 for res in results.values() if res["success"])
+        print(f"{passed}/{len(results)} projects completed successfully")
+
+
+def run_batch(project_paths, cli_runner="auto", force=False, rework_limit=3, max_workers=2,
+              agent_slots=4, status_only=False, gate_mode="inprocess", agent_timeout=None):
+    """
+    Runs the workflow of many projects at once. The CLI runner is detected once,
+    config.yaml is left untouched, and every agent invocation across all
+    projects draws from a single pool of agent_slots.
+    """
+    runner = VideoNutOrchestrator.detect_cli_runner(cli_runner)
+    pool = AgentSlotPool(agent_slots)
+    orchestrators = [
+        VideoNutOrchestrator(
+            project_path=path,
+            cli_runner=runner,
+            force=force,
+            rework_limit=rework_limit,
+            max_workers=max_workers,
+            slot_pool=pool,
+            sync_config=False,
+            gate_mode=gate_mode,
+            agent_timeout=agent_timeout
+        )
+        for path in project_paths
+    ]
+
+    if status_only:
+        print_batch_report(orchestrators, {})
+        return True
+
+    print(f"[WORKFLOW] Batch mode: {len(orchestrators)} projects sharing {pool.size} agent slots (runner: '{runner}')")
+
+    def run_one(orch):
+        started = time.time()
+        try:
+            success = orch.run_full_workflow()
+        except Exception as e:
+            print(f"[FAIL] Project '{orch.project_name}' crashed: {str(e)}")
+            success = False
+        return {"success": bool(success), "elapsed": time.time() - started}
+
+    results = {}
+    # Project threads mostly wait on agent slots, so one thread per project is cheap
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(orchestrators)) as executor:
+        futures = {executor.submit(run_one, orch): orch for orch in orchestrators}
+        for future in concurrent.futures.as_completed(futures):
+            results[futures[future].project_path] = future.result()
+
+    print_batch_report(orchestrators, results)
+    return all(res["success"] for res in results.values())
+
+
 def main():
     parser = argparse.ArgumentParser(description="VideoNut Workflow Orchestrator")
-    parser.add_argument("--project", required=True, help="Path to project directory")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--project", help="Path to project directory")
+    target.add_argument("--projects", help="Glob of project directories to run as one batch (e.g. 'Projects/*')")
+    target.add_argument("--projects-folder", help="Run every project directory inside this folder as one batch")
     parser.add_argument("--cli", default="auto", choices=["claude", "gemini", "opencode", "qwen", "auto", "mock"], help="CLI runner to use")
     parser.add_argument("--force", action="store_true", help="Force running stages even if complete")
     parser.add_argument("--rework-limit", type=int, default=3, help="Max EIC rework iterations")
+    parser.add_argument("--workers", type=int, default=2, help="Max number of stages to run concurrently")
+    parser.add_argument("--gate-mode", default="inprocess", choices=GATE_MODES, help="Run validation gates in-process or isolated in subprocesses")
+    parser.add_argument("--agent-timeout", type=int, default=None, help="Wall-clock timeout in seconds for every agent run (default: per-agent)")
+    parser.add_argument("--agent-slots", type=int, default=4, help="Batch mode: max agents running at once across all projects")
     parser.add_argument("--resume", action="store_true", help="Resume from last checkpoint")
     parser.add_argument("--status", action="store_true", help="Show current workflow status")
     parser.add_argument("--next", action="store_true", help="Show what to do next")
     
     args = parser.parse_args()
     
+    if args.projects or args.projects_folder:
+        if args.projects_folder and not os.path.isdir(args.projects_folder):
+            print(f"[FAIL] Projects folder does not exist: {args.projects_folder}")
+            sys.exit(1)
+        project_paths = resolve_batch_projects(args.projects, args.projects_folder)
+        if not project_paths:
+            print("[FAIL] No project directories matched.")
+            sys.exit(1)
+        if args.next:
+            print("⚠️  --next is only available for a single --project; showing batch status instead.")
+        success = run_batch(
+            project_paths,
+            cli_runner=args.cli,
+            force=args.force,
+            rework_limit=args.rework_limit,
+            max_workers=args.workers,
+            agent_slots=args.agent_slots,
+            status_only=args.status or args.next,
+            gate_mode=args.gate_mode,
+            agent_timeout=args.agent_timeout
+        )
+        sys.exit(0 if success else 1)
+    
     if not os.path.exists(args.project):
         print(f"[FAIL] Project directory does not exist: {args.project}")
         sys.exit(1)
@@ -604,7 +890,10 @@ def main():
         project_path=args.project,
         cli_runner=args.cli,
         force=args.force,
-        rework_limit=args.rework_limit
+        rework_limit=args.rework_limit,
+        max_workers=args.workers,
+        gate_mode=args.gate_mode,
+        agent_timeout=args.agent_timeout
     )
     
     # Status command - show current progress
@@ -618,12 +907,8 @@ def main():
         
         status_icons = {True: "[OK]", False: "[WAIT]"}
         steps = [
-            ("Investigation", "investigation_complete", "truth_dossier.md"),
-            ("Scriptwriting", "scriptwriting_complete", "narrative_script.md"),
-            ("Direction", "direction_complete", "master_script.md"),
-            ("Visioning (AI Prompts)", "visionary_complete", "visual_prompts.md"),
-            ("Scavenging", "scavenging_complete", "asset_manifest.md"),
-            ("Archiving", "archiving_complete", "assets/"),
+            (spec["label"], f"{stage}_complete", ", ".join(spec["outputs"]))
+            for stage, spec in STAGE_GRAPH.items()
         ]
         
         for step_name, checkpoint_key, output_file in steps:
@@ -640,18 +925,19 @@ def main():
         print("🎯 What to Do Next")
         print("=" * 50)
         
-        next_steps = {
-            "none": ("Investigation", "investigator", "Create truth_dossier.md with research findings"),
-            "investigation": ("Scriptwriting", "scriptwriter", "Create narrative_script.md from the dossier"),
-            "scriptwriting": ("Direction", "director", "Create master_script.md with visual directions"),
-            "direction": ("Visioning (AI Prompts) & Scavenging", "visionary / scavenger", "Create visual_prompts.md & asset_manifest.md"),
-            "scavenging": ("Archiving", "archivist", "Download all assets to assets/ folder"),
-            "archiving": ("EIC Review", "eic", "Audit all assets and scripts"),
-            "eic": ("Complete", None, "[SUCCESS] All done! Your video assets are ready for editing."),
-        }
-        
         last_step = orchestrator.checkpoints['last_step']
-        step_name, command, description = next_steps.get(last_step, next_steps["none"])
+        done = {stage for stage in STAGE_ORDER if orchestrator.checkpoints.get(f"{stage}_complete", False)}
+        deps = stage_dependencies()
+        # Every pending stage whose inputs are ready can run now (possibly in parallel)
+        ready = [stage for stage in STAGE_ORDER if stage not in done and deps[stage] <= done]
+        if ready:
+            step_name = " & ".join(STAGE_GRAPH[stage]["label"] for stage in ready)
+            command = " / ".join(STAGE_GRAPH[stage]["agent"] for stage in ready)
+            description = " & ".join(STAGE_GRAPH[stage]["task"] for stage in ready)
+        elif last_step == "eic":
+            step_name, command, description = ("Complete", None, "[SUCCESS] All done! Your video assets are ready for editing.")
+        else:
+            step_name, command, description = ("EIC Review", "eic", "Audit all assets and scripts")
         
         print(f"[MATCH] Current position: After '{last_step}'")
         print(f"👉 Next step: {step_name}")